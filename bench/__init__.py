@@ -0,0 +1 @@
+# benchmarks of vbfilter ( run.py, corpus.py, scanner.py )
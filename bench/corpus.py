@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Generator of a synthetic VB6 corpus for the benchmarks: Modules (.bas),
+# Classes (.cls) and Forms (.frm) with deep control trees, large Enums and
+# Types, long " _" continuations, heavy doxygen comment blocks and string
+# heavy lines. The same seed always gives the same files.
+#
+# usage: corpus.py [--lines=n] [--files=n] [--seed=n] outdir
+#
+#  --lines : about how many lines each file has (default 5000)
+#  --files : files of each kind (default 3)
+#  --seed  : seed of the generator (default 1)
+
+import getopt
+import os
+import random
+import sys
+
+kinds = ( "bas", "cls", "frm" )
+
+types = [ "Long", "Integer", "String", "Boolean", "Double", "Variant", "Object", "Collection", "Date", "Currency" ]
+access = [ "Public ", "Private ", "Friend ", "", "Global " ]
+words = [ "count", "name", "item", "value", "index", "data", "result", "buffer", "key", "total", "handle", "flag", "顧客", "伝票" ]
+controls = [ "VB.CommandButton", "VB.TextBox", "VB.Label", "VB.ComboBox", "VB.ListBox", "VB.CheckBox", "VB.OptionButton", "VB.Image", "VB.Timer", "MSComctlLib.ListView" ]
+containers = [ "VB.Frame", "VB.PictureBox", "TabDlg.SSTab" ]
+
+class Generator(object):
+
+	def __init__(self, seed):
+		self.r = random.Random( seed )
+		self.lines = []
+		self.serial = 0
+		self.limit = None	# lines the control tree may take
+
+	def emit(self, s):
+		self.lines.append( s + "\n" )
+
+	def name(self, prefix = ""):
+		self.serial += 1
+		return prefix + self.r.choice(words).capitalize() + str(self.serial)
+
+	def choice(self, seq):
+		return self.r.choice(seq)
+
+	# a string constant with "" and apostrophes in it
+	def literal(self):
+		parts = [ "SELECT * FROM T WHERE A = ''x''", "it's", '""quoted""', "C:\\path\\file.txt", "日本語の文字列", "a ' b" ]
+		return '"' + " ".join( self.r.choice(parts) for i in range(self.r.randint(1, 6)) ).replace('"', '""').replace('""""', '""') + '"'
+
+	def docBlock(self, lines):
+		self.emit( "'/** " + self.sentence() )
+		for i in range(lines): self.emit( "' " + self.sentence() )
+		self.emit( "' @param x " + self.sentence() + " */" )
+
+	def sentence(self):
+		return " ".join( self.r.choice(words) for i in range(self.r.randint(3, 12)) )
+
+	def arglist(self, count):
+		args = []
+		for i in range(count):
+			a = self.choice([ "", "ByVal ", "ByRef ", "Optional ", "Optional ByVal " ]) + self.name("a") + self.choice([ "", "()" ]) + " As " + self.choice(types)
+			if a.startswith("Optional") and not a.endswith("()") and self.r.random() < .5: a += " = " + self.choice([ "0", "-1", self.literal(), "Nothing" ])
+			args.append(a)
+		return args
+
+	# a declaration whose arguments are continued over many lines
+	def continued(self, head, args, tail):
+		if len(args) < 4:
+			self.emit( head + "(" + ", ".join(args) + ")" + tail )
+			return
+		self.emit( head + "( _" )
+		for a in args[:-1]: self.emit( "    " + a + ", _" )
+		self.emit( "    " + args[-1] + ")" + tail )
+
+	def members(self, count):
+		for i in range(count):
+			kind = self.r.random()
+			if kind < .3: self.emit( self.choice(access) + "Const " + self.name("C_") + " As String = " + self.literal() + self.backComment() )
+			elif kind < .5: self.emit( self.choice(access) + "Const " + self.name("N_") + " = " + str(self.r.randint(0, 99999)) + self.backComment() )
+			elif kind < .7: self.emit( self.choice([ "Private ", "Public ", "Dim " ]) + self.name("m_") + "(1 To " + str(self.r.randint(2, 99)) + ") As " + self.choice(types) + self.backComment() )
+			else: self.emit( self.choice([ "Private ", "Public ", "Dim " ]) + self.name("m_") + " As " + self.choice(types) + self.backComment() )
+
+	def backComment(self):
+		return self.choice([ "", "", " '< " + self.sentence(), " ' " + self.sentence() ])
+
+	def enum(self, size):
+		self.emit( "'' " + self.sentence() )
+		self.emit( self.choice([ "Public ", "Private ", "" ]) + "Enum " + self.name("E") )
+		for i in range(size):
+			self.emit( "    " + self.name("e") + self.choice([ "", " = " + str(i), " = &H" + "%X" % (1 << (i % 31)) ]) + self.backComment() )
+		self.emit( "End Enum" )
+
+	def type(self, size):
+		self.emit( "'' " + self.sentence() )
+		self.emit( self.choice([ "Public ", "Private ", "" ]) + "Type " + self.name("T") )
+		for i in range(size):
+			self.emit( "    " + self.name() + self.choice([ "", "(0 To 15)" ]) + " As " + self.choice(types + [ "String * 32" ]) + self.backComment() )
+		self.emit( "End Type" )
+
+	# a procedure with a body of the given number of lines
+	def procedure(self, body):
+		if self.r.random() < .5: self.docBlock( self.r.randint(1, 8) )
+		else:
+			for i in range(self.r.randint(0, 3)): self.emit( "'' " + self.sentence() )
+		kind = self.choice([ "Sub", "Function", "Property Get", "Property Let" ])
+		args = self.arglist( self.r.randint(0, 9) )
+		tail = kind in ("Function", "Property Get") and " As " + self.choice(types) or ""
+		self.continued( self.choice(access[:4]) + kind + " " + self.name("P"), args, tail )
+		for i in range(body): self.statement( self.r.randint(1, 3) )
+		self.emit( "End " + kind.split()[0] )
+		self.emit( "" )
+
+	def statement(self, depth):
+		indent = "    " * depth
+		kind = self.r.random()
+		if kind < .15: self.emit( indent + "sql = sql & " + self.literal() + " & " + self.name() + " & " + self.literal() )
+		elif kind < .25:
+			self.emit( indent + "msg = " + self.literal() + " & _" )
+			for i in range(self.r.randint(1, 6)): self.emit( indent + "    " + self.literal() + " & _" )
+			self.emit( indent + "    " + self.literal() )
+		elif kind < .35: self.emit( indent + "' " + self.sentence() )
+		elif kind < .40: self.emit( indent + "'' " + self.sentence() )
+		elif kind < .45: self.emit( "" )
+		elif kind < .55: self.emit( indent + "If " + self.name() + " > " + str(self.r.randint(0, 9)) + " Then" )
+		elif kind < .65: self.emit( indent + "End If" )
+		elif kind < .75: self.emit( indent + "Call " + self.name("Do") + "(" + ", ".join( self.name() for i in range(self.r.randint(0, 4)) ) + ")" )
+		else: self.emit( indent + self.name() + " = " + self.name() + " + " + str(self.r.randint(0, 999)) )
+
+	# declarations and procedures up to about size lines
+	def code(self, size):
+		if self.r.random() < .5: self.emit( "'! " + self.sentence() )
+		self.emit( "Option Explicit" )
+		self.emit( "" )
+		self.members( self.r.randint(5, 30) )
+		while len(self.lines) < size:
+			kind = self.r.random()
+			if kind < .08: self.enum( self.r.randint(10, 200) )
+			elif kind < .14: self.type( self.r.randint(5, 60) )
+			elif kind < .2: self.members( self.r.randint(1, 10) )
+			elif kind < .24:
+				self.continued( self.choice(access[:2]) + "Declare Function " + self.name("Api") + ' Lib "kernel32" Alias "' + self.name("Api") + 'A" ', self.arglist( self.r.randint(2, 12) ), " As Long" )
+			elif kind < .27: self.emit( self.choice(access[:2]) + "Event " + self.name("On") + "(" + ", ".join( self.arglist(self.r.randint(0, 3)) ) + ")" )
+			else: self.procedure( self.r.randint(2, 60) )
+
+	# a control and, down to depth, the controls inside of it
+	def control(self, depth, indent, width):
+		container = 0 < depth
+		kind = container and self.choice(containers) or self.choice(controls)
+		name = self.name( kind.split(".")[-1][:3] )
+		self.emit( indent + "Begin " + kind + " " + name + " " )
+		array = not container and self.r.random() < .3
+		for i in range( array and self.r.randint(2, 8) or 1 ):
+			if i:
+				self.emit( indent + "End" )
+				self.emit( indent + "Begin " + kind + " " + name + " " )
+			self.properties( indent + "   " )
+			if array: self.emit( indent + "   Index           =   " + str(i) )
+			if container:
+				for j in range(self.r.randint(1, width)):
+					if self.limit < len(self.lines): break
+					self.control( depth - 1 - (self.r.random() < .5), indent + "   ", width )
+		self.emit( indent + "End" )
+
+	def properties(self, indent):
+		self.emit( indent + "Caption         =   " + self.literal() )
+		self.emit( indent + "Height          =   " + str(self.r.randint(100, 9000)) )
+		self.emit( indent + "Left            =   " + str(self.r.randint(0, 9000)) )
+		self.emit( indent + "TabIndex        =   " + str(self.r.randint(0, 99)) )
+		self.emit( indent + "Top             =   " + str(self.r.randint(0, 9000)) )
+		self.emit( indent + "Width           =   " + str(self.r.randint(100, 9000)) )
+		if self.r.random() < .3:
+			self.emit( indent + "BeginProperty Font " )
+			self.emit( indent + '   Name            =   "ＭＳ ゴシック"' )
+			self.emit( indent + "   Size            =   9" )
+			self.emit( indent + "EndProperty" )
+
+# text of a generated file of the given kind and name
+def generate( kind, name, size = 5000, seed = 1 ):
+
+	g = Generator( "%s %s %d" % (kind, name, seed) )
+	if "frm" == kind:
+		g.emit( "VERSION 5.00" )
+		g.emit( "Begin VB.Form " + name + " " )
+		g.properties( "   " )
+		g.limit = size // 2
+		for i in range(g.r.randint(3, 8)): g.control( g.r.randint(0, 5), "   ", 4 )
+		g.emit( "End" )
+	elif "cls" == kind:
+		g.emit( "VERSION 1.0 CLASS" )
+		g.emit( "BEGIN" )
+		g.emit( "  MultiUse = -1  'True" )
+		g.emit( "END" )
+	g.emit( 'Attribute VB_Name = "' + name + '"' )
+	if "bas" != kind:
+		for attribute in ( "VB_GlobalNameSpace = False", "VB_Creatable = False", "VB_PredeclaredId = True", "VB_Exposed = False" ):
+			g.emit( "Attribute " + attribute )
+	g.code( size )
+	return "".join( g.lines )
+
+# yields ( file name, kind, text ) of a corpus
+def corpus( size = 5000, files = 3, seed = 1 ):
+	for kind in kinds:
+		for i in range(files):
+			name = "%s%d" % ( { "bas": "Module", "cls": "Class", "frm": "Form" }[kind], i + 1 )
+			yield name + "." + kind, kind, generate( kind, name, size, seed )
+
+# writes the files of a corpus into outdir as the VB IDE does ( cp932 and
+# CRLF ), returns their ( file name, kind, path )
+def write( outdir, size = 5000, files = 3, seed = 1 ):
+	os.makedirs( outdir, exist_ok = True )
+	written = []
+	for name, kind, text in corpus( size, files, seed ):
+		path = os.path.join( outdir, name )
+		with open( path, "w", encoding = "cp932", newline = "\r\n" ) as f:
+			f.write( text )
+		written.append( ( name, kind, path ) )
+	return written
+
+def main( argv ):
+	opts, args = getopt.getopt( argv, "", ["lines=", "files=", "seed="] )
+	if len(args) != 1:
+		sys.stderr.write( "usage: corpus.py [--lines=n] [--files=n] [--seed=n] outdir\n" )
+		return 1
+	opts = dict( opts )
+
+	write( args[0], int(opts.get("--lines", 5000)), int(opts.get("--files", 3)), int(opts.get("--seed", 1)) )
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Throughput benchmark of vbfilter on a synthetic corpus (see corpus.py) or on
+# a directory of real sources. Reports lines/sec and MB/sec of each kind of
+# file, the time spent in filterBAS / filterCLS / filterFRM and the peak of
+# the memory allocated while filtering (tracemalloc).
+# Each file is filtered by filter_file from the disk, so the reading and the
+# decoding are measured too: the generated corpus is written to a temporary
+# directory in cp932 with CRLF, as the VB IDE writes its sources.
+#
+# usage: run.py [option]...
+#
+#  --corpus=dir    : filters the sources of dir instead of a generated corpus
+#  --lines=n       : lines of each generated file (default 20000)
+#  --files=n       : generated files of each kind (default 3)
+#  --seed=n        : seed of the generated corpus (default 1)
+#  --repeat=n      : runs of each file, the best is taken (default 3)
+#  --json=file     : writes the results to file as JSON
+#  --baseline=file : compares with the results of an earlier --json run
+#  --threshold=x   : allowed loss of throughput and growth of memory against
+#                    the baseline, as a fraction (default 0.1); exits with 1
+#                    when it is exceeded
+
+import getopt
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert( 0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir) )
+import vbfilter
+
+try:
+	from . import corpus
+except ImportError:
+	import corpus
+
+# yields ( name, kind, path ) of the sources below directory
+def readCorpus( directory, opts ):
+	for path, root in vbfilter.find_sources( directory, opts ):
+		yield os.path.relpath( path, root ), vbfilter.fileKind(path), path
+
+# filters the file at path once, returns the seconds taken
+def filterOnce( path, kind, opts ):
+	t = time.perf_counter()
+	with vbfilter.OutputSink( io.BytesIO() ) as out:
+		vbfilter.filter_file( path, out, opts, kind )
+	return time.perf_counter() - t
+
+# peak of the memory allocated while filtering the file at path
+def filterPeak( path, kind, opts ):
+	tracemalloc.start()
+	try:
+		tracemalloc.reset_peak()
+		base = tracemalloc.get_traced_memory()[0]
+		with vbfilter.OutputSink( io.BytesIO() ) as out:
+			vbfilter.filter_file( path, out, opts, kind )
+		return tracemalloc.get_traced_memory()[1] - base
+	finally:
+		tracemalloc.stop()
+
+# time spent in each function of vbfilter.filters, while filtering
+class FilterTimes(object):
+
+	def __init__(self):
+		self.seconds = {}
+
+	def __enter__(self):
+		self.saved = dict( vbfilter.filters )
+		for kind, func in self.saved.items(): vbfilter.filters[kind] = self.timed( func )
+		return self
+
+	def __exit__(self, *exc):
+		vbfilter.filters.update( self.saved )
+
+	def timed(self, func):
+		def run( inFR, outFile, opts ):
+			t = time.perf_counter()
+			try:
+				func( inFR, outFile, opts )
+			finally:
+				self.seconds[func.__name__] = self.seconds.get( func.__name__, 0.0 ) + time.perf_counter() - t
+		return run
+
+def measure( sources, repeat, opts ):
+
+	kinds = {}
+	times = FilterTimes()
+	for name, kind, path in sources:
+		with open( path, "rb" ) as f:
+			data = f.read()
+		size = len(data)
+
+		best = min( filterOnce( path, kind, opts ) for i in range(repeat) )
+		with times: filterOnce( path, kind, opts )
+		peak = filterPeak( path, kind, opts )
+
+		k = kinds.setdefault( kind, { "files": 0, "lines": 0, "bytes": 0, "seconds": 0.0, "peak_bytes": 0 } )
+		k["files"] += 1
+		k["lines"] += len( data.splitlines() )
+		k["bytes"] += size
+		k["seconds"] += best
+		k["peak_bytes"] = max( k["peak_bytes"], peak )
+
+	total = { "files": 0, "lines": 0, "bytes": 0, "seconds": 0.0, "peak_bytes": 0 }
+	for k in kinds.values():
+		for key in ( "files", "lines", "bytes", "seconds" ): total[key] += k[key]
+		total["peak_bytes"] = max( total["peak_bytes"], k["peak_bytes"] )
+	for k in list(kinds.values()) + [ total ]:
+		k["lines_per_sec"] = k["seconds"] and k["lines"] / k["seconds"]
+		k["mb_per_sec"] = k["seconds"] and k["bytes"] / k["seconds"] / 1e6
+
+	return { "kinds": kinds, "total": total, "filters": times.seconds }
+
+def report( results ):
+	print( "%-6s %6s %9s %9s %9s %12s %9s %10s" % ("kind", "files", "lines", "MB", "seconds", "lines/sec", "MB/sec", "peak MB") )
+	rows = sorted( results["kinds"].items() ) + [ ("total", results["total"]) ]
+	for kind, k in rows:
+		print( "%-6s %6d %9d %9.2f %9.3f %12.0f %9.2f %10.2f" % (kind, k["files"], k["lines"], k["bytes"] / 1e6, k["seconds"], k["lines_per_sec"], k["mb_per_sec"], k["peak_bytes"] / 1e6) )
+	for name, seconds in sorted( results["filters"].items() ):
+		print( "%-10s %9.3f seconds" % (name, seconds) )
+
+# returns the regressions against baseline
+def compare( results, baseline, threshold ):
+	regressions = []
+	for kind, k in sorted( results["kinds"].items() ) + [ ("total", results["total"]) ]:
+		old = baseline["total"] if "total" == kind else baseline["kinds"].get( kind )
+		if not old: continue
+		if k["lines_per_sec"] < old["lines_per_sec"] * (1 - threshold):
+			regressions.append( "%s: %.0f lines/sec, was %.0f" % (kind, k["lines_per_sec"], old["lines_per_sec"]) )
+		if old["peak_bytes"] * (1 + threshold) < k["peak_bytes"]:
+			regressions.append( "%s: peak %.2f MB, was %.2f MB" % (kind, k["peak_bytes"] / 1e6, old["peak_bytes"] / 1e6) )
+	return regressions
+
+def main( argv ):
+	opts, args = getopt.getopt( argv, "", ["corpus=", "lines=", "files=", "seed=", "repeat=", "json=", "baseline=", "threshold="] )
+	opts = dict( opts )
+	options = vbfilter.FilterOptions()
+
+	repeat = int(opts.get("--repeat", 3))
+	if "--corpus" in opts:
+		setup = { "corpus": os.path.abspath(opts["--corpus"]) }
+		results = measure( list( readCorpus(opts["--corpus"], options) ), repeat, options )
+	else:
+		setup = { "lines": int(opts.get("--lines", 20000)), "files": int(opts.get("--files", 3)), "seed": int(opts.get("--seed", 1)) }
+		with tempfile.TemporaryDirectory() as tmp:
+			results = measure( corpus.write( tmp, setup["lines"], setup["files"], setup["seed"] ), repeat, options )
+	results["setup"] = setup
+	results["version"] = vbfilter.__version__
+	results["python"] = platform.python_version()
+	report( results )
+
+	if "--json" in opts:
+		with open( opts["--json"], "w", encoding = "utf-8" ) as f:
+			json.dump( results, f, indent = 1, sort_keys = True )
+
+	if "--baseline" in opts:
+		with open( opts["--baseline"], encoding = "utf-8" ) as f:
+			baseline = json.load(f)
+		if baseline.get("setup") != setup: print( "warning: the baseline was run on another corpus" )
+		regressions = compare( results, baseline, float(opts.get("--threshold", 0.1)) )
+		for r in regressions: print( "regression: " + r )
+		if regressions: return 1
+
+	return 0
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Benchmark of the comment / string literal scanner of vbfilter (Line and
+# scanComment) on adversarial lines: long string constants full of "",
+# unbalanced quotes and many quotes inside of literals.
+#
+# usage: scanner.py [--check] [--size=chars] [--budget=seconds]
+#
+#  --check  : also compares the splits with the old regular expression on
+#             random short lines, and exits with 1 when a line takes more
+#             than the budget or the run time does not grow linearly
+#  --size   : length of the adversarial lines (default 1000000)
+#  --budget : time allowed to split one line of --size chars (default 0.5)
+
+import getopt
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert( 0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir) )
+import vbfilter
+
+# the regex the scanner replaces; it backtracks exponentially on some lines,
+# so it is only run on short ones
+re_comments = re.compile(r"((?:\"(?:[^\"]|\"\")*\"|[^\"'])*)'.*")
+
+# adversarial lines of about n chars
+def adversarial( n ):
+	return [
+		( "doubled quotes", 'sql = "' + '""' * (n // 2) + '" \' done\n' ),
+		( "unterminated doubled quotes", 'sql = "' + '""' * (n // 2) + "' no comment\n" ),
+		( "unterminated literal", 's = "' + "a" * n + "' no comment\n" ),
+		( "only quotes", '"' * n + "\n" ),
+		( "many literals", '"a" & ' * (n // 6) + "' comment\n" ),
+		( "quotes in literals", '"\'" & ' * (n // 6) + "x\n" ),
+		( "apostrophes", "x = 1 " + "'" * n + "\n" ),
+		( "continued fragment", 'sql = "' + '""a' * (n // 3) + ' _\n' ),
+	]
+
+# seconds to split s ( best of a few runs )
+def timeLine( s, repeat = 3 ):
+	best = None
+	for i in range(repeat):
+		t = time.perf_counter()
+		vbfilter.Line( s )
+		t = time.perf_counter() - t
+		if best is None or t < best: best = t
+	return best
+
+# compares Line with re_comments on random short lines, returns the mismatches
+def compareRegex( count = 20000, seed = 1 ):
+	r = random.Random( seed )
+	alphabet = ['"', '"', "'", "a", " ", '""', "_", "\t"]
+	bad = []
+	for i in range(count):
+		s = "".join( r.choice(alphabet) for j in range(r.randint(0, 12)) ) + "\n"
+		m = re_comments.match( s )
+		expected = s if m is None else m.group(1)
+		if vbfilter.Line( s ).code != expected: bad.append( s )
+	return bad
+
+def main( argv ):
+	opts, args = getopt.getopt( argv, "", ["check", "size=", "budget="] )
+	opts = dict( opts )
+	check = "--check" in opts
+	size = int( opts.get("--size", 1000000) )
+	budget = float( opts.get("--budget", 0.5) )
+	
+	failed = False
+	print( "%-30s %10s %10s %8s" % ("line", "seconds", "MB/s", "growth") )
+	for (name, s), (small_name, small) in zip( adversarial(size), adversarial(size // 10) ):
+		t = timeLine( s )
+		growth = t / max( timeLine(small), 1e-6 )
+		note = ""
+		# ten times the chars should cost about ten times the time
+		if t > budget: note = "  over budget"
+		elif t > 0.01 and growth > 30: note = "  not linear"
+		if note: failed = True
+		print( "%-30s %10.4f %10.1f %8.1f%s" % (name, t, len(s) / t / 1e6 if t else 0, growth, note) )
+	
+	if check:
+		bad = compareRegex()
+		for s in bad[:5]: print( "differs from re_comments: %r" % s )
+		if bad: failed = True
+		print( "%d random lines differ from re_comments" % len(bad) )
+	
+	return check and failed and 1 or 0
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
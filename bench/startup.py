@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Cold start benchmark of vbfilter: the time of new interpreters importing
+# vbfilter and filtering a small file, against the interpreter doing nothing,
+# and the slowest imports as "python -X importtime" tells them.
+#
+# usage: startup.py [--check] [--runs=n] [--budget=file] [--baseline=script]
+#
+#  --check    : exits with 1 when a time over the floor of the interpreter
+#               is over its budget, or the script is not faster than the
+#               baseline
+#  --runs     : runs of each command, the best is taken (default 20)
+#  --budget   : budget file (default startup_budget.json next to this script)
+#  --baseline : an older vbfilter.py run as a script in the same turns
+#
+# the budgets are times over the floor in floors ( 0.5: half the time of the
+# interpreter doing nothing ), so they hold on slower and faster machines.
+# the bytecode is cached in a temporary directory first, as it is in an
+# installed copy ( the script run as "vbfilter.py" is compiled each time, it
+# only imports vbfilter_core ).
+
+import getopt
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+top = os.path.dirname(here)
+
+sample = '''Attribute VB_Name = "Sample"
+'' a member
+Public Count As Long
+'' a function
+Public Function Twice(ByVal x As Long) As Long
+    Twice = x * 2
+End Function
+'''
+
+def commands( path, baseline = None ):
+	filter = os.path.join( top, "vbfilter.py" )
+	client = os.path.join( top, "vbfilter_client.py" )
+	cmds = [
+		( "floor", [ sys.executable, "-c", "pass" ] ),
+		( "import", [ sys.executable, "-c", "import vbfilter" ] ),
+		( "module", [ sys.executable, "-m", "vbfilter", path ] ),
+		( "client", [ sys.executable, client, path ] ),
+		( "script", [ sys.executable, filter, path ] ),
+	]
+	if baseline is not None: cmds.append( ( "baseline", [ sys.executable, "-W", "ignore", os.path.abspath(baseline), path ] ) )
+	return cmds
+
+# best seconds of each command, run in turns
+def measure( cmds, runs, env ):
+	best = dict( ( name, None ) for name, cmd in cmds )
+	for i in range(runs):
+		for name, cmd in cmds:
+			t = time.perf_counter()
+			subprocess.run( cmd, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL, cwd = top, env = env )
+			t = time.perf_counter() - t
+			if best[name] is None or t < best[name]: best[name] = t
+	return best
+
+# the slowest imports ( cumulative microseconds, module ) of "import vbfilter"
+def importTimes( env, count = 8 ):
+	p = subprocess.run( [ sys.executable, "-X", "importtime", "-c", "import vbfilter" ], stderr = subprocess.PIPE, cwd = top, env = env, universal_newlines = True )
+	times = []
+	for s in p.stderr.splitlines():
+		fields = s.split("|")
+		if 3 == len(fields) and fields[1].strip().isdigit():
+			times.append( ( int(fields[1]), fields[2].rstrip() ) )
+	return sorted( times, reverse = True )[:count]
+
+def main( argv ):
+	opts, args = getopt.getopt( argv, "", ["check", "runs=", "budget=", "baseline="] )
+	opts = dict( opts )
+	budget_path = opts.get( "--budget", os.path.join(here, "startup_budget.json") )
+
+	with tempfile.TemporaryDirectory() as tmp:
+		env = dict( os.environ, PYTHONPYCACHEPREFIX = os.path.join(tmp, "pycache"), VBFILTER_SOCKET = os.path.join(tmp, "none.sock") )
+		env.pop( "PYTHONDONTWRITEBYTECODE", None )
+		env.pop( "VBFILTER_CACHE", None )
+		env.pop( "VBFILTER_STATS", None )
+		path = os.path.join( tmp, "Sample.bas" )
+		with open( path, "w", encoding = "ascii" ) as f: f.write( sample )
+
+		cmds = commands( path, opts.get("--baseline") )
+		subprocess.run( cmds[1][1], cwd = top, env = env )	# caches the bytecode
+		best = measure( cmds, int(opts.get("--runs", 20)), env )
+		imports = importTimes( env )
+
+	floor = best["floor"]
+	print( "%-8s %9s %11s %7s" % ("command", "ms", "over floor", "floors") )
+	over = {}
+	for name, cmd in cmds:
+		over[name] = ( best[name] - floor ) / floor
+		print( "%-8s %9.1f %11.1f %7.2f" % (name, best[name] * 1000, ( best[name] - floor ) * 1000, over[name]) )
+	print( "slowest imports (cumulative us):" )
+	for us, name in imports: print( "%9d %s" % (us, name) )
+
+	failed = False
+	if "--check" in opts:
+		with open( budget_path, encoding = "utf-8" ) as f:
+			budget = json.load(f)
+		for name, floors in sorted( budget.items() ):
+			if name in over and floors < over[name]:
+				print( "over budget: %s %.2f floors, budget %.2f" % (name, over[name], floors) )
+				failed = True
+		if "baseline" in over and over["baseline"] <= over["script"]:
+			print( "not faster than the baseline: script %.2f floors, baseline %.2f" % (over["script"], over["baseline"]) )
+			failed = True
+	return failed and 1 or 0
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
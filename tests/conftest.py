@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+#
+# the tests import vbfilter, its modules and bench from the top of the
+# repository. the fixtures give small sources using most of what the
+# filter reads, and write them as the VB IDE does ( cp932 and CRLF ).
+
+import os
+import sys
+
+import pytest
+
+top = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if top not in sys.path: sys.path.insert( 0, top )
+
+module_source = '''Attribute VB_Name = "Module1"
+'! utilities of the samples
+'' the number of calls
+Public Count As Long
+'' colors
+Public Enum EColor
+    Red = 1 '< red
+    Green
+End Enum
+'' a point
+Private Type TPoint
+    X As Long
+    Y As Long
+End Type
+'' adds a and b
+'' @param a first
+Public Function Add(ByVal a As Long, _
+        Optional ByRef b As Long = 1) As Long
+    Add = a + b ' the sum
+End Function
+'' says hello
+Sub Hello(name As String)
+    MsgBox "it's " & name
+End Sub
+'' the name
+Property Get Name() As String
+    Name = "名前"
+End Property
+'''
+
+class_source = '''VERSION 1.0 CLASS
+BEGIN
+  MultiUse = -1  'True
+END
+Attribute VB_Name = "Class1"
+Attribute VB_GlobalNameSpace = False
+Attribute VB_Creatable = True
+'! a counter
+'' the value
+Private mValue As Long
+'' raised on change
+Public Event Changed(ByVal value As Long)
+'' adds one
+Public Sub Increment()
+    mValue = mValue + 1
+    RaiseEvent Changed(mValue)
+End Sub
+'' the value
+Public Property Get Value() As Long
+    Value = mValue
+End Property
+'''
+
+form_source = '''VERSION 5.00
+Begin VB.Form Form1
+   Caption         =   "Form1"
+   ClientHeight    =   3195
+   Begin VB.Frame fraMain
+      Caption         =   "Main"
+      Begin VB.CommandButton cmdX
+         Caption         =   "A"
+         Index           =   0
+      End
+      Begin VB.CommandButton cmdX
+         Caption         =   "B"
+         Index           =   1
+      End
+   End
+   Begin VB.TextBox txtName
+      Text            =   "name"
+      TabIndex        =   2
+   End
+End
+Attribute VB_Name = "Form1"
+Attribute VB_GlobalNameSpace = False
+'' raised on change
+Public Event Changed(ByVal value As Long)
+Private Sub cmdX_Click(Index As Integer)
+    RaiseEvent Changed(Index)
+End Sub
+'''
+
+samples = { "Module1.bas": module_source, "Class1.cls": class_source, "Form1.frm": form_source }
+
+# writes text to path as the VB IDE does
+def writeSource( path, text ):
+	os.makedirs( os.path.dirname(path), exist_ok = True )
+	with open( path, "w", encoding = "cp932", newline = "\r\n" ) as f:
+		f.write( text )
+	return path
+
+@pytest.fixture
+def write_source():
+	return writeSource
+
+# a directory of the three samples and a project naming them
+@pytest.fixture
+def source_dir( tmp_path ):
+	src = tmp_path / "src"
+	for name, text in samples.items(): writeSource( str(src / name), text )
+	writeSource( str(src / "Project1.vbp"), "Type=Exe\nForm=Form1.frm\nModule=Module1; Module1.bas\nClass=Class1; Class1.cls\n" )
+	return src
@@ -0,0 +1,30 @@
+Attribute VB_Name = "EndComments"
+'! End lines with comments
+'' the first
+Public Sub First()
+    If True Then
+        x = 1
+    End If ' the if
+End Sub ' the end of First
+Public Third As Long
+'' the name
+Property Get Name() As String
+    Name = "n"
+End Property 'name
+'' a type
+Public Type TItem
+    Key As String
+End Type ' of the items
+'' an enum
+Public Enum EKind
+    KindA
+End Enum ' of the kinds
+'' the last
+Sub Last()
+End Sub	' with a tab
+Public Fourth As Long
+'' the second
+Public Function Second() As Long
+    Second = 2
+End Function '' a doc comment ends no procedure
+Public Fifth As Long
@@ -0,0 +1,13 @@
+Attribute VB_Name = "Folded"
+'! letters which re.I folds onto ascii ones
+'' a sub
+Public ſub Run()
+    x = 1
+End Sub
+'' a member
+Public Count As Long
+ſub Walk()
+End Sub
+Public Enum Kind
+    KA
+End Enum
@@ -0,0 +1,37 @@
+Attribute VB_Name = "Japanese"
+'! {̖O
+'' O
+Public O As String
+'' 
+Dim  As Long
+Private l(3) As Integer '< l̔z
+Public Const 萔 = "萔̒l"
+Global S As Long
+O2 As Long '< 擪{
+@Public Sp As Long
+'' 擪{̗
+F2 As F
+@Sub ()
+End Sub
+'' s
+Public Sub s()
+    O = "s"
+End Sub
+'' vZ
+'' @param l vZl
+Public Function vZ(ByVal l As Long) As Long
+    vZ = l * 2
+End Function
+'' F
+Public Enum F
+     = 1 '< Ԃ
+    
+End Enum
+'' _
+Private Type _
+     As Long
+    c As Long
+End Type
+Public Property Get () As String
+     = O
+End Property
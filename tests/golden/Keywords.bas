@@ -0,0 +1,43 @@
+Attribute VB_Name = "Keywords"
+'! identifiers which start with a keyword
+'' the count of enums
+Public EnumCount As Long
+'' a type of one
+Dim Type1 As Long
+'' the sub total
+Public SubTotal As Currency
+Private FunctionName As String '< the name of a function
+Public PropertyBag1 As Object
+Public EventCount As Integer
+Private Const ConstValue = 1
+Global GlobalCount As Long
+Dim DimSum As Double
+Public EndDate As Date
+Public Enumerator As Collection
+Private Typed As Boolean
+Public Subs(10) As String
+'' a sub named after a keyword
+Public Sub SubMain()
+    EnumCount = EnumCount + 1
+End Sub
+'' a function named after a keyword
+Private Function TypeName2(ByVal EnumValue As Long) As String
+    TypeName2 = CStr(EnumValue)
+End Function
+Function EndOfFile() As Boolean
+End Function
+Public Property Get PropertyName() As String
+    PropertyName = FunctionName
+End Property
+Sub EventRaise()
+End Sub
+'' an enum named after a keyword
+Public Enum EnumKind
+    EnumFirst
+    SubSecond = 2
+End Enum
+'' a type named after a keyword
+Private Type TypeInfo
+    EndMark As Long
+    Type2 As Integer
+End Type
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+#
+# the amalgamation ( vbfilter_amalgamate, --amalgamate ): the sources filtered
+# into one file, or shards, and the files of an earlier run removed
+
+import os
+
+import pytest
+
+import vbfilter
+import vbfilter_amalgamate
+from conftest import samples
+
+order = [ "Form1.frm", "Module1.bas", "Class1.cls" ]
+
+# the text of the files written
+def read( paths ):
+	text = ""
+	for path in paths:
+		with open( path, encoding = "utf-8", newline = None ) as f:
+			text += f.read()
+	return text
+
+def expected( source_dir ):
+	return "".join( "\n// -- vbfilter: " + str( source_dir / name ) + " --\n" + vbfilter.filter_text( samples[name], name ) for name in order )
+
+def test_one_file( source_dir, tmp_path ):
+	out = str( tmp_path / "all.cpp" )
+	written, failures = vbfilter_amalgamate.amalgamate( [ str( source_dir / "Project1.vbp" ) ], out, jobs = 2, out_encoding = "utf-8" )
+	assert ( [ out ], [] ) == ( written, failures )
+	assert expected( source_dir ) == read( written )
+	with open( out, "rb" ) as f:
+		assert ( "\n" != os.linesep ) == ( b"\r\n" in f.read() )
+
+def test_shards( source_dir, tmp_path ):
+	out = str( tmp_path / "all.cpp" )
+	written, failures = vbfilter_amalgamate.amalgamate( [ str( source_dir / "Project1.vbp" ) ], out, jobs = 1, shard_size = 1, out_encoding = "utf-8" )
+	assert [ str( tmp_path / ( "all.%d.cpp" % n ) ) for n in ( 1, 2, 3 ) ] == written
+	assert expected( source_dir ) == read( written )
+	# a file is never cut between shards
+	for path, name in zip( written, order ):
+		text = read( [ path ] )
+		assert text.startswith( "\n// -- vbfilter: " + str( source_dir / name ) + " --\n" )
+		assert 1 == text.count( "// -- vbfilter: " )
+
+# the outputs of an earlier run which are not written again are removed
+def test_stale_outputs_are_removed( source_dir, tmp_path ):
+	out = str( tmp_path / "all.cpp" )
+	project = [ str( source_dir / "Project1.vbp" ) ]
+	vbfilter_amalgamate.amalgamate( project, out, jobs = 1, shard_size = 1, out_encoding = "utf-8" )
+	written, failures = vbfilter_amalgamate.amalgamate( project, out, jobs = 1, out_encoding = "utf-8" )
+	assert [ out ] == written
+	assert [ "all.cpp", "src" ] == sorted( os.listdir( tmp_path ) )
+	
+	os.unlink( source_dir / "Class1.cls" )
+	vbfilter_amalgamate.amalgamate( project, out, jobs = 1, shard_size = 1, out_encoding = "utf-8" )
+	assert [ "all.1.cpp", "all.2.cpp", "src" ] == sorted( os.listdir( tmp_path ) )
+
+def test_failures( source_dir, tmp_path ):
+	os.unlink( source_dir / "Class1.cls" )
+	out = str( tmp_path / "all.cpp" )
+	written, failures = vbfilter_amalgamate.amalgamate( [ str( source_dir / "Project1.vbp" ) ], out, jobs = 1, out_encoding = "utf-8" )
+	assert [ str( source_dir / "Class1.cls" ) ] == [ path for path, message in failures ]
+	assert "FileNotFoundError" in failures[0][1]
+	assert 2 == read( written ).count( "// -- vbfilter: " )
+
+# a file whose output cannot be encoded fails alone, no temporary file is left
+def test_encoding_failure( source_dir, tmp_path, write_source ):
+	write_source( str( source_dir / "Module1.bas" ), samples["Module1.bas"].replace( "'' the number of calls", "'' 呼び出しの数" ) )
+	out = str( tmp_path / "all.cpp" )
+	written, failures = vbfilter_amalgamate.amalgamate( [ str( source_dir / "Project1.vbp" ) ], out, jobs = 1, out_encoding = "ascii" )
+	assert [ str( source_dir / "Module1.bas" ) ] == [ path for path, message in failures ]
+	assert "UnicodeEncodeError" in failures[0][1]
+	assert [ out ] == written
+	assert 2 == read( written ).count( "// -- vbfilter: " )
+	assert [ "all.cpp", "src" ] == sorted( os.listdir( tmp_path ) )
+
+# a run which stops keeps the out file of the last one whole
+def test_interrupted_run( source_dir, tmp_path, monkeypatch ):
+	out = str( tmp_path / "all.cpp" )
+	project = [ str( source_dir / "Project1.vbp" ) ]
+	vbfilter_amalgamate.amalgamate( project, out, jobs = 1, out_encoding = "utf-8" )
+	
+	outputs = vbfilter_amalgamate.amalgamateOutputs
+	def interrupted( paths, options, jobs ):
+		for i, result in enumerate( outputs( paths, options, jobs ) ):
+			if 2 == i: raise KeyboardInterrupt
+			yield result
+	monkeypatch.setattr( vbfilter_amalgamate, "amalgamateOutputs", interrupted )
+	with pytest.raises( KeyboardInterrupt ):
+		vbfilter_amalgamate.amalgamate( project, out, jobs = 1, out_encoding = "utf-8" )
+	assert expected( source_dir ) == read( [ out ] )
+	assert [ "all.cpp", "src" ] == sorted( os.listdir( tmp_path ) )
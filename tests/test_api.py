@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+#
+# the library API: FilterOptions, filter_text, filter_file, filter_files, filter
+
+import io
+import os
+
+import vbfilter
+from conftest import form_source, module_source, samples
+
+def test_filter_text():
+	out = vbfilter.filter_text( module_source, "bas" )
+	assert "\n// -- processed by [filterBAS] --\n" == out[:35]
+	assert "namespace Module1\n" in out
+	assert "public:  Long Count;" in out
+	assert "public: Long Add( ByVal  Long a ,Optional  ByRef  Long b  = 1){\n}\n" in out
+	assert out.endswith( "// -- [/filterBAS] --\n" )
+
+def test_kind_is_an_extension_or_a_path():
+	assert vbfilter.filter_text( module_source, "bas" ) == vbfilter.filter_text( module_source, "Module1.BAS" )
+
+def test_unknown_kind_is_dumped():
+	assert ".a\n.b" == vbfilter.filter_text( "a\nb", "txt" )
+
+def test_filter_file_reads_cp932_crlf( source_dir ):
+	for name, text in samples.items():
+		out = io.StringIO()
+		vbfilter.filter_file( str(source_dir / name), out )
+		assert vbfilter.filter_text( text, name ) == out.getvalue()
+
+def test_filter_files( source_dir ):
+	paths = [ str(source_dir / name) for name in sorted(samples) ]
+	result = list( vbfilter.filter_files( paths ) )
+	assert paths == [ path for path, text in result ]
+	for path, text in result:
+		assert vbfilter.filter_text( samples[os.path.basename(path)], path ) == text
+
+def test_controls_option():
+	plain = vbfilter.filter_text( form_source, "frm" )
+	controls = vbfilter.filter_text( form_source, "frm", vbfilter.FilterOptions( controls = True ) )
+	assert "Form Controls" not in plain
+	assert "public:VB.TextBox	txtName;" in controls
+
+def test_options_copy_and_key():
+	opts = vbfilter.FilterOptions( encoding = "utf-8" )
+	copy = opts.copy( controls = True )
+	assert ( False, "utf-8" ) == ( opts.controls, opts.encoding )
+	assert ( True, "utf-8" ) == ( copy.controls, copy.encoding )
+	assert opts.key() != copy.key()
+	assert opts.key() == opts.copy( verbose = True, jobs = 4 ).key()
+
+def test_filter_writes_the_output_file( source_dir, tmp_path ):
+	out = str( tmp_path / "Module1.txt" )
+	vbfilter.filter( str(source_dir / "Module1.bas"), out )
+	with open( out, encoding = "cp932", newline = None ) as f:
+		assert vbfilter.filter_text( module_source, "bas" ) == f.read()
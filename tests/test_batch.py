@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+#
+# the batch mode ( vbfilter_batch ): finding the sources of directories and
+# .vbp projects, and filtering them in a pool of processes
+
+import io
+import os
+
+import vbfilter
+import vbfilter_batch
+from conftest import samples
+
+# the bytes filter_file writes for the sample name
+def expected( name, encoding = "utf-8" ):
+	raw = io.BytesIO()
+	with vbfilter.OutputSink( raw, encoding ) as out:
+		out.write( vbfilter.filter_text( samples[name], name ) )
+	return raw.getvalue()
+
+def test_find_sources_of_a_directory( source_dir ):
+	found = list( vbfilter_batch.find_sources( str(source_dir) ) )
+	assert [ str(source_dir / name) for name in sorted(samples) ] == [ path for path, root in found ]
+	assert set( [ str(source_dir) ] ) == set( root for path, root in found )
+
+def test_find_sources_of_a_project( source_dir ):
+	found = list( vbfilter_batch.find_sources( str(source_dir / "Project1.vbp") ) )
+	assert [ ( str(source_dir / name), str(source_dir) ) for name in ( "Form1.frm", "Module1.bas", "Class1.cls" ) ] == found
+
+def test_filter_batch( source_dir, tmp_path, write_source ):
+	write_source( str(source_dir / "sub" / "Module2.bas"), samples["Module1.bas"].replace( "Module1", "Module2" ) )
+	outdir = tmp_path / "out"
+	failures = vbfilter_batch.filter_batch( [ str(source_dir) ], str(outdir), jobs = 2, out_encoding = "utf-8" )
+	assert [] == failures
+	for name in samples:
+		assert expected( name ) == ( outdir / name ).read_bytes()
+	assert expected( "Module1.bas" ).replace( b"Module1", b"Module2" ) == ( outdir / "sub" / "Module2.bas" ).read_bytes()
+
+def test_filter_batch_of_a_project( source_dir, tmp_path ):
+	outdir = tmp_path / "out"
+	assert [] == vbfilter.filter_batch( [ str(source_dir / "Project1.vbp") ], str(outdir), jobs = 1, out_encoding = "cp932" )
+	assert sorted(samples) == sorted( os.listdir(outdir) )
+	assert expected( "Form1.frm", "cp932" ) == ( outdir / "Form1.frm" ).read_bytes()
+
+def test_failed_file_leaves_no_output( source_dir, tmp_path ):
+	( source_dir / "Bad.bas" ).write_bytes( b'Attribute VB_Name = "Bad"\r\nPublic A As Long \x82\r\n' )
+	outdir = tmp_path / "out"
+	failures = vbfilter_batch.filter_batch( [ str(source_dir) ], str(outdir), jobs = 1, out_encoding = "utf-8" )
+	assert [ str(source_dir / "Bad.bas") ] == [ path for path, message in failures ]
+	assert "UnicodeDecodeError" in failures[0][1]
+	assert not ( outdir / "Bad.bas" ).exists()
+	assert ( outdir / "Module1.bas" ).exists()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+#
+# the output cache ( vbfilter_cache, --cache ): outputs and IR stored under
+# the hash of the source, the options and the filter
+
+import io
+import os
+
+import pytest
+
+import vbfilter
+import vbfilter_cache
+from conftest import form_source, module_source
+
+def filtered( path, opts ):
+	out = io.StringIO()
+	vbfilter.filter_file( path, out, opts )
+	return out.getvalue()
+
+def entries( directory ):
+	return [ path for path in directory.rglob( "*" ) if path.is_file() ]
+
+# calling it makes filtering or parsing again fail, so what follows must
+# come from the cache
+@pytest.fixture
+def no_filter( monkeypatch ):
+	def fail( *args ): raise AssertionError( "filtered again" )
+	def stop():
+		monkeypatch.setattr( vbfilter_cache, "filterLines", fail )
+		monkeypatch.setattr( vbfilter_cache, "parseLines", fail )
+	return stop
+
+def test_output_is_cached( source_dir, tmp_path, no_filter ):
+	opts = vbfilter.FilterOptions( cache = str( tmp_path / "cache" ) )
+	path = str( source_dir / "Module1.bas" )
+	assert vbfilter.filter_text( module_source, "bas" ) == filtered( path, opts )
+	no_filter()
+	assert vbfilter.filter_text( module_source, "bas" ) == filtered( path, opts )
+
+# a file written a while ago gets a manifest entry, which skips its
+# hashing, one written just now could change again in the same tick
+def test_manifest( source_dir, tmp_path ):
+	cache = tmp_path / "cache"
+	opts = vbfilter.FilterOptions( cache = str(cache) )
+	filtered( str( source_dir / "Module1.bas" ), opts )
+	assert [] == entries( cache / "manifest" )
+	os.utime( source_dir / "Module1.bas", ( 1000000000, 1000000000 ) )
+	filtered( str( source_dir / "Module1.bas" ), opts )
+	assert 1 == len( entries( cache / "manifest" ) )
+
+def test_changed_source_and_options_miss( source_dir, tmp_path, write_source ):
+	opts = vbfilter.FilterOptions( cache = str( tmp_path / "cache" ) )
+	path = str( source_dir / "Form1.frm" )
+	assert vbfilter.filter_text( form_source, "frm" ) == filtered( path, opts )
+	controls = opts.copy( controls = True )
+	assert vbfilter.filter_text( form_source, "frm", controls ) == filtered( path, controls )
+	changed = form_source.replace( "Changed", "Updated" )
+	write_source( path, changed )
+	assert vbfilter.filter_text( changed, "frm" ) == filtered( path, opts )
+
+def test_ir_is_cached( source_dir, tmp_path, no_filter ):
+	opts = vbfilter.FilterOptions( cache = str( tmp_path / "cache" ) )
+	path = str( source_dir / "Module1.bas" )
+	module = vbfilter.parse_file( path, opts )
+	no_filter()
+	again = vbfilter.parse_file( path, opts )
+	assert module is not again
+	out = io.StringIO()
+	vbfilter.emit( again, out )
+	assert vbfilter.filter_text( module_source, "bas" ) == out.getvalue()
+
+def test_broken_entry_is_filtered_again( source_dir, tmp_path ):
+	cache = tmp_path / "cache"
+	opts = vbfilter.FilterOptions( cache = str(cache) )
+	path = str( source_dir / "Module1.bas" )
+	vbfilter.parse_file( path, opts )
+	for entry in entries( cache / "ir" ): entry.write_bytes( b"broken" )
+	out = io.StringIO()
+	vbfilter.emit( vbfilter.parse_file( path, opts ), out )
+	assert vbfilter.filter_text( module_source, "bas" ) == out.getvalue()
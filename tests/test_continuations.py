@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+#
+# " _" continued lines: joined as one logical line, in linear time
+
+import pytest
+
+import vbfilter
+
+one_line = '''Attribute VB_Name = "M"
+'' doc
+Public Const S As String = "a ' b" & "c" '< back
+Public Function F(ByVal a As Long, Optional b As Long = 2) As Long
+End Function
+'''
+
+# the same lines continued, the first fragment ending inside a literal
+# holding a "'", and blanks after some "_" ( continued as VB does )
+continued = '''Attribute VB_Name = "M"
+'' doc
+Public Const S As String = "a ' b" & _
+    "c" '< back
+Public Function F(ByVal a As Long, _ 
+    Optional b As Long = 2) _\t
+    As Long
+End Function
+'''
+
+def test_continued_lines_are_joined():
+	assert vbfilter.filter_text( one_line, "bas" ) == vbfilter.filter_text( continued, "bas" )
+
+@pytest.mark.parametrize( "s, at", [
+	( "a _\n", 2 ),
+	( "a _ \t\n", 2 ),
+	( "a _", -1 ),
+	( "a_\n", -1 ),
+	( "a _ b\n", -1 ),
+] )
+def test_continued_at( s, at ):
+	assert at == vbfilter.continuedAt( s )
+
+# a function of n continued arguments
+def arguments( n ):
+	return 'Attribute VB_Name = "M"\nPublic Function F(' + "".join( "ByVal a%d As Long, _\n" % i for i in range(n) ) + "ByVal z As Long) As Long\nEnd Function\n"
+
+def test_many_fragments():
+	out = vbfilter.filter_text( arguments( 100 ), "bas" )
+	assert "public: Long F( ByVal  Long a0 , ByVal  Long a1 , " in out
+	assert " ByVal  Long a99 , ByVal  Long z ){" in out
+
+# the fragments are scanned once each, and the line they make once: the
+# chars scanned grow as the source, however many fragments are continued
+def test_linear( monkeypatch ):
+	scanned = [ 0 ]
+	scanComment, Line = vbfilter.scanComment, vbfilter.Line
+	def counting( s, pos = 0, quoted = False ):
+		scanned[0] += len(s) - pos
+		return scanComment( s, pos, quoted )
+	class CountingLine( Line ):
+		__slots__ = ()
+		def __init__(self, s):
+			scanned[0] += len(s)
+			Line.__init__( self, s )
+	monkeypatch.setattr( vbfilter, "scanComment", counting )
+	monkeypatch.setattr( vbfilter, "Line", CountingLine )
+	for n in ( 2000, 20000 ):
+		source = arguments( n )
+		scanned[0] = 0
+		out = vbfilter.filter_text( source, "bas" )
+		assert " ByVal  Long a%d , ByVal  Long z ){" % ( n - 1 ) in out
+		assert scanned[0] <= 3 * len(source)
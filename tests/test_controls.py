@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+#
+# the controls of a form ( the "C" option ): the properties put, the control
+# arrays written as one member and the containers kept in the IR
+
+import subprocess
+import sys
+
+import vbfilter
+from conftest import form_source, top
+
+def controls( text, **kw ):
+	return vbfilter.filter_text( text, "frm", vbfilter.FilterOptions( controls = True, **kw ) )
+
+# a form of the given designer lines
+def form( *lines ):
+	return "VERSION 5.00\nBegin VB.Form Form1\n" + "".join( s + "\n" for s in lines ) + "End\nAttribute VB_Name = \"Form1\"\n"
+
+def test_control_array():
+	out = controls( form_source )
+	assert "public:VB.CommandButton\tcmdX[2];\n" in out
+	assert "/**\n@details\t-         Caption         =   \"A\"\n-         Index           =   0 To 1\n**/\npublic:VB.CommandButton\tcmdX[2];\n" in out
+	assert 1 == out.count( "cmdX[" )
+	# the others are not arrays
+	assert "public:VB.Frame\tfraMain;\n" in out
+	assert "/**\n@details\t-      TabIndex        =   2\n**/\npublic:VB.TextBox\ttxtName;\n" in out
+	assert "public:VB.Form\tForm1;\n" in out
+
+def test_array_with_gaps():
+	out = controls( form(
+		"   Begin VB.Label lbl", "      Index           =   0", "   End",
+		"   Begin VB.Label lbl", "      Index           =   2", "   End" ) )
+	assert "-      Index           =   0, 2\n**/\npublic:VB.Label\tlbl[3];\n" in out
+
+def test_arrays_are_per_container_and_kind():
+	out = controls( form(
+		"   Begin VB.Frame fra1",
+		"      Begin VB.Label lbl", "         Index           =   0", "      End",
+		"   End",
+		"   Begin VB.Frame fra2",
+		"      Begin VB.Label lbl", "         Index           =   1", "      End",
+		"   End",
+		"   Begin VB.TextBox txt", "      Index           =   0", "   End",
+		"   Begin VB.Label txt", "      Index           =   1", "   End" ) )
+	assert 2 == out.count( "public:VB.Label\tlbl[" )
+	assert "public:VB.Label\tlbl[1];\n" in out and "public:VB.Label\tlbl[2];\n" in out
+	assert "public:VB.TextBox\ttxt[1];\n" in out and "public:VB.Label\ttxt[2];\n" in out
+
+def test_index_of_a_property_is_not_the_control_index():
+	out = controls( form(
+		"   Begin VB.Label lbl",
+		"      BeginProperty Font",
+		"         Index           =   5",
+		"      EndProperty",
+		"   End" ) )
+	assert "public:VB.Label\tlbl;\n" in out
+
+def test_control_properties():
+	out = controls( form_source, control_properties = frozenset(( "Caption", )) )
+	assert "/**\n@details\t-         Caption         =   \"A\"\n**/\npublic:VB.CommandButton\tcmdX[2];\n" in out
+	assert "**/\npublic:VB.TextBox" not in out
+	assert "public:VB.TextBox\ttxtName;\n" in out
+	# the default is the global control_properties
+	assert controls( form_source ) == controls( form_source, control_properties = vbfilter.control_properties )
+
+def test_control_properties_option( source_dir ):
+	path = str( source_dir / "Form1.frm" )
+	out = subprocess.run( [ sys.executable, "vbfilter.py", "-C", "--control-properties", "Caption", path ], cwd = top, stdout = subprocess.PIPE, check = True ).stdout
+	assert controls( form_source, control_properties = frozenset(( "Caption", )) ) == out.decode("utf-8").replace( "\r\n", "\n" )
+
+def test_containers():
+	module = vbfilter.parse_text( form_source, "frm", vbfilter.FilterOptions( controls = True ) )
+	assert [ ( "VB.CommandButton", "cmdX", [ 0, 1 ], "fraMain" ), ( "VB.Frame", "fraMain", None, "Form1" ), ( "VB.TextBox", "txtName", None, "Form1" ), ( "VB.Form", "Form1", None, None ) ] == [
+		( c.kind, c.name, c.indexes, c.container ) for c in module.controls ]
+
+def test_no_controls_without_the_option():
+	out = vbfilter.filter_text( form_source, "frm" )
+	assert "Form Controls" not in out and "cmdX[" not in out
+	assert vbfilter.parse_text( form_source, "frm" ).controls is None
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#
+# sources read through a text file in their encoding, and the encodings of
+# bytes_encodings, in which SplitFile cuts the raw lines: the same output as
+# the decoded text
+
+import codecs
+import io
+
+import pytest
+
+import vbfilter
+from conftest import samples
+
+@pytest.mark.parametrize( "encoding", [ "cp932", "utf-8", "utf-16", "euc_jp" ] )
+@pytest.mark.parametrize( "newline", [ "\r\n", "\n", "\r" ] )
+@pytest.mark.parametrize( "name", sorted(samples) )
+def test_same_as_text( tmp_path, name, encoding, newline ):
+	path = tmp_path / name
+	with open( path, "w", encoding = encoding, newline = newline ) as f:
+		f.write( samples[name] )
+	out = io.StringIO()
+	vbfilter.filter_file( str(path), out, vbfilter.FilterOptions( controls = True, encoding = encoding ) )
+	assert vbfilter.filter_text( samples[name], name, vbfilter.FilterOptions( controls = True ) ) == out.getvalue()
+
+# chunks end at the end of a line, so no character is cut
+def test_raw_chunks():
+	raw = "".join( "'' 名前 %d\r\nPublic 値%d As Long\r\n" % ( i, i ) for i in range(20000) ).encode("cp932")
+	chunks = list( vbfilter.rawChunks( io.BytesIO(raw) ) )
+	assert 1 < len(chunks)
+	assert raw == b"".join(chunks)
+	assert all( b"\n" == chunk[-1:] for chunk in chunks )
+
+def test_large_file( tmp_path ):
+	text = samples["Module1.bas"] + "".join( "'' 名前 %d\r\nPublic 値%d As Long\r\n" % ( i, i ) for i in range(20000) )
+	( tmp_path / "Big.bas" ).write_bytes( text.encode("cp932") )
+	out = io.StringIO()
+	vbfilter.filter_file( str( tmp_path / "Big.bas" ), out )
+	assert vbfilter.filter_text( text, "bas" ) == out.getvalue()
+
+def test_lines_of_a_raw_line():
+	decoder = codecs.getdecoder( "cp932" )
+	assert ( "a\n", ) == vbfilter.decodeLines( b"a\r\n", decoder )
+	assert [ "名\n", "b\n", "c" ] == list( vbfilter.decodeLines( "名\rb\rc".encode("cp932"), decoder ) )
+
+@pytest.mark.parametrize( "encoding, expected", [ ( "cp932", True ), ( "sjis", True ), ( "UTF8", True ), ( "utf-16", False ), ( "no such encoding", False ) ] )
+def test_is_bytes_encoding( encoding, expected ):
+	assert expected == vbfilter.isBytesEncoding( encoding )
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+#
+# the sources in golden/ ( cp932 and CRLF ) and their output by the original
+# vbfilter.py, the one before the keyword dispatch of the declarations:
+# identifiers starting with a keyword, Japanese names, lines continued in
+# procedure bodies and End lines with a comment. Folded.bas is in utf-8, for
+# the letters which re.I folds onto ascii ones ( "ſ" is "s" ), which cp932 lacks
+
+import io
+import os
+
+import pytest
+
+import vbfilter
+
+golden = os.path.join( os.path.dirname(os.path.abspath(__file__)), "golden" )
+sources = sorted( name for name in os.listdir(golden) if not name.endswith(".out") )
+encodings = { "Folded.bas": "utf-8" }
+
+def expected( name ):
+	with open( os.path.join( golden, os.path.splitext(name)[0] + ".out" ), encoding = "utf-8", newline = "" ) as f:
+		return f.read()
+
+@pytest.mark.parametrize( "name", sources )
+def test_same_as_the_original( name ):
+	out = io.StringIO()
+	vbfilter.filter_file( os.path.join( golden, name ), out, vbfilter.FilterOptions( encoding = encodings.get( name, "cp932" ) ) )
+	assert expected( name ) == out.getvalue()
+
+@pytest.mark.parametrize( "name", sources )
+def test_text( name ):
+	with open( os.path.join( golden, name ), encoding = encodings.get( name, "cp932" ) ) as f:
+		text = f.read()
+	assert expected( name ) == vbfilter.filter_text( text, name )
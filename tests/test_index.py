@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+#
+# the symbol index in SQLite ( vbfilter_index, --index, --find ): files parsed
+# again only when their hash changed
+
+import os
+import subprocess
+import sys
+
+import vbfilter
+import vbfilter_index
+from conftest import module_source, top
+
+def test_update( source_dir, tmp_path, write_source ):
+	db = str( tmp_path / "symbols.db" )
+	with vbfilter_index.SymbolIndex( db ) as index:
+		assert ( ( 3, 0, 0 ), [] ) == index.update( [ str(source_dir) ] )
+		assert ( ( 0, 3, 0 ), [] ) == index.update( [ str(source_dir) ] )
+	
+	write_source( str(source_dir / "Module1.bas"), module_source.replace( "Hello", "Bye" ) )
+	os.unlink( source_dir / "Class1.cls" )
+	with vbfilter.SymbolIndex( db ) as index:
+		assert ( ( 1, 1, 1 ), [] ) == index.update( [ str(source_dir) ] )
+		assert [] == index.find( "Hello" )
+		assert 1 == len( index.find( "Bye" ) )
+		assert [] == index.find( kind = "event", module = "Class1" )
+		assert [ ( 2, ) ] == index.query( "SELECT count(*) FROM files" )
+
+def test_find( source_dir, tmp_path ):
+	with vbfilter_index.SymbolIndex( str( tmp_path / "symbols.db" ) ) as index:
+		index.update( [ str( source_dir / "Project1.vbp" ) ] )
+		path = str( source_dir / "Module1.bas" )
+		add = ( "Add", "function", "public", "Function Add(ByVal a As Long, Optional ByRef b As Long = 1) As Long", "Module1", "Module1", path, 17, "adds a and b\n@param a first" )
+		assert [ add ] == index.find( "add" )
+		assert [ "Changed", "Changed" ] == [ row[0] for row in index.find( kind = "event" ) ]
+		assert [ ( "Red", "Module1.EColor" ), ( "Green", "Module1.EColor" ) ] == [ ( row[0], row[4] ) for row in index.find( kind = "enumerator" ) ]
+		args = index.query( 'SELECT a.position, a.name, a.passing, a.optional, a.type, a."default" FROM args a JOIN symbols s ON s.id = a.symbol WHERE s.name = ? ORDER BY a.position', ( "Add", ) )
+		assert [ ( 0, "a", "ByVal", 0, "Long", None ), ( 1, "b", "ByRef", 1, "Long", "1" ) ] == args
+
+def test_failures_are_reported( source_dir, tmp_path ):
+	( source_dir / "Bad.bas" ).write_bytes( b'Attribute VB_Name = "Bad"\r\nPublic A As Long \x82\r\n' )
+	with vbfilter_index.SymbolIndex( str( tmp_path / "symbols.db" ) ) as index:
+		counts, failures = index.update( [ str(source_dir) ] )
+	assert ( 3, 0, 0 ) == counts
+	assert [ str( source_dir / "Bad.bas" ) ] == [ path for path, message in failures ]
+
+def test_options( source_dir, tmp_path ):
+	script = os.path.join( top, "vbfilter.py" )
+	db = str( tmp_path / "symbols.db" )
+	p = subprocess.run( [ sys.executable, script, "--index", db, str(source_dir) ], stderr = subprocess.PIPE, universal_newlines = True, check = True )
+	assert "3 files parsed, 0 unchanged, 0 removed, 0 failed\n" == p.stderr
+	p = subprocess.run( [ sys.executable, script, "--index", db, "--find", "Count" ], stdout = subprocess.PIPE, universal_newlines = True, env = dict( os.environ, PYTHONIOENCODING = "utf-8" ), check = True )
+	assert "%s:4: Module1\tvariable\tCount As Long\n" % ( source_dir / "Module1.bas" ) == p.stdout
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+#
+# the input read as a stream of lines: any iterator of lines, stdin with "-",
+# and the code output held back until the module header is complete
+
+import io
+import os
+import subprocess
+import sys
+
+import vbfilter
+from conftest import class_source, module_source, top
+
+def test_lines_of_any_iterator():
+	out = io.StringIO()
+	vbfilter.filterLines( iter( io.StringIO( class_source ).readlines() ), out, "cls" )
+	assert vbfilter.filter_text( class_source, "cls" ) == out.getvalue()
+
+def test_held_output_spills_to_a_file( monkeypatch ):
+	monkeypatch.setattr( vbfilter.HeldOutput, "limit", 64 )
+	held = vbfilter.HeldOutput()
+	for i in range(100): held.write( "line %d\n" % i )
+	assert held.spill is not None
+	out = io.StringIO()
+	held.copyTo( out )
+	assert "".join( "line %d\n" % i for i in range(100) ) == out.getvalue()
+	assert held.spill is None
+
+# the code is held until the end of the file ( a global comment may still
+# come ), the output does not change when it spills
+def test_output_is_the_same_when_held_output_spills( monkeypatch ):
+	expected = vbfilter.filter_text( module_source, "bas" )
+	monkeypatch.setattr( vbfilter.HeldOutput, "limit", 16 )
+	assert expected == vbfilter.filter_text( module_source, "bas" )
+
+def test_stdin( source_dir ):
+	script = os.path.join( top, "vbfilter.py" )
+	path = str( source_dir / "Module1.bas" )
+	env = dict( os.environ, PYTHONIOENCODING = "utf-8" )
+	expected = subprocess.run( [ sys.executable, script, path ], stdout = subprocess.PIPE, env = env, check = True ).stdout
+	with open( path, "rb" ) as f:
+		assert expected == subprocess.run( [ sys.executable, script, "--kind", "bas", "-" ], stdin = f, stdout = subprocess.PIPE, env = env, check = True ).stdout
+	assert vbfilter.filter_text( module_source, "bas" ).replace( "\n", os.linesep ).encode("utf-8") == expected
+
+def test_stdin_needs_a_kind():
+	p = subprocess.run( [ sys.executable, os.path.join( top, "vbfilter.py" ), "-" ], stdin = subprocess.DEVNULL, stderr = subprocess.PIPE, universal_newlines = True )
+	assert 1 == p.returncode
+	assert "--kind is needed" in p.stderr
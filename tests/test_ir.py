@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+#
+# the intermediate representation: parse_text / parse_file, emit, and the
+# marshal round-trip of dumps_ir / loads_ir
+
+import io
+import marshal
+
+import pytest
+
+import vbfilter
+from conftest import module_source, samples
+
+def emitted( module, opts = None ):
+	out = io.StringIO()
+	vbfilter.emit( module, out, opts )
+	return out.getvalue()
+
+@pytest.mark.parametrize( "controls", [ False, True ] )
+@pytest.mark.parametrize( "name", sorted(samples) )
+def test_emit_gives_the_output( name, controls ):
+	opts = vbfilter.FilterOptions( controls = controls )
+	assert vbfilter.filter_text( samples[name], name, opts ) == emitted( vbfilter.parse_text( samples[name], name, opts ), opts )
+
+def test_records():
+	module = vbfilter.parse_text( module_source, "bas" )
+	assert ( "bas", "Module1" ) == ( module.kind, module.name )
+	declarations = [ item for item in module.items if not isinstance( item, vbfilter.DocComment ) ]
+	assert [ ( "Count", 4 ), ( "EColor", 6 ), ( "TPoint", 11 ), ( "Add", 17 ), ( "Hello", 22 ), ( "Name", 26 ) ] == [ ( item.name, item.line ) for item in declarations ]
+	add = declarations[3]
+	assert ( "Function", "Public ", "Long", True ) == ( add.kind, add.access, add.type, add.closed )
+	assert [ vbfilter.Arg( None, "ByVal ", "a", False, "Long", None ), vbfilter.Arg( "Optional ", "ByRef ", "b", False, "Long", "1" ) ] == list( add.args )
+	assert [ "X", "Y" ] == [ field.name for field in declarations[2].items ]
+
+def test_parse_file( source_dir ):
+	for name in samples:
+		assert vbfilter.parse_text( samples[name], name ) == vbfilter.parse_file( str(source_dir / name) )
+
+def test_not_a_module():
+	with pytest.raises( ValueError ):
+		vbfilter.parse_text( "a\n", "txt" )
+
+@pytest.mark.parametrize( "name", sorted(samples) )
+def test_round_trip( name ):
+	opts = vbfilter.FilterOptions( controls = True )
+	module = vbfilter.parse_text( samples[name], name, opts )
+	data = vbfilter.dumps_ir( module )
+	assert isinstance( data, bytes )
+	again = vbfilter.loads_ir( data )
+	assert module == again
+	assert module is not again
+	assert emitted( module, opts ) == emitted( again, opts )
+
+def test_ir_of_another_version_or_layout():
+	module = vbfilter.parse_text( module_source, "bas" )
+	version, packed = marshal.loads( vbfilter.dumps_ir( module ) )
+	with pytest.raises( ValueError ):
+		vbfilter.loads_ir( marshal.dumps( ( "0", packed ) ) )
+	with pytest.raises( ValueError ):
+		vbfilter.loads_ir( marshal.dumps( ( version, packed[:-1] ) ) )
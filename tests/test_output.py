@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+#
+# OutputSink: the output encoded in large blocks, its lines ended as in a
+# file opened "w"
+
+import io
+import os
+
+import vbfilter
+from conftest import module_source
+
+class Writes(io.BytesIO):
+	
+	def __init__(self):
+		io.BytesIO.__init__(self)
+		self.writes = 0
+	
+	def write(self, data):
+		self.writes += 1
+		return io.BytesIO.write(self, data)
+
+def test_writes_in_blocks():
+	raw = Writes()
+	with vbfilter.OutputSink( raw, "utf-8", newline = None ) as out:
+		for i in range(100000): out.write( "line %d\n" % i )
+	assert "".join( "line %d\n" % i for i in range(100000) ).encode("utf-8") == raw.getvalue()
+	assert raw.writes <= len( raw.getvalue() ) // vbfilter.OutputSink.block_size + 1
+
+def test_encoding_and_errors():
+	raw = io.BytesIO()
+	with vbfilter.OutputSink( raw, "ascii", "replace", newline = None ) as out:
+		out.write( "名前 x\n" )
+	assert b"?? x\n" == raw.getvalue()
+	raw = io.BytesIO()
+	with vbfilter.OutputSink( raw, "cp932", newline = None ) as out:
+		out.write( "名前\n" )
+	assert "名前\n".encode("cp932") == raw.getvalue()
+
+def test_newline():
+	raw = io.BytesIO()
+	with vbfilter.OutputSink( raw, "utf-8", newline = "\r\n" ) as out:
+		out.write( "a\nb\n" )
+	assert b"a\r\nb\r\n" == raw.getvalue()
+
+# the default ends the lines with os.linesep, as "vbfilter.py file > output"
+def test_default_newline_is_the_one_of_text_files():
+	assert ( "\n" != os.linesep and os.linesep or None ) == vbfilter.text_newline
+	raw = io.BytesIO()
+	with vbfilter.OutputSink( raw ) as out:
+		out.write( "a\n" )
+	assert ( "a" + os.linesep ).encode("utf-8") == raw.getvalue()
+
+def test_the_files_written_end_their_lines_alike( source_dir, tmp_path ):
+	path = str( tmp_path / "Module1.txt" )
+	vbfilter.filter( str(source_dir / "Module1.bas"), path, vbfilter.FilterOptions( encoding = "cp932" ) )
+	with open( path, "rb" ) as f:
+		assert vbfilter.filter_text( module_source, "bas" ).replace( "\n", os.linesep ).encode("cp932") == f.read()
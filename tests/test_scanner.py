@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+#
+# the comment scanner ( Line, scanComment ) against the regular expression it
+# replaced, and the chars it looks at on the adversarial lines of
+# bench/scanner.py
+
+import pytest
+
+import vbfilter
+from bench import scanner
+
+def test_same_as_re_comments():
+	assert [] == scanner.compareRegex( 5000, seed = 7 )
+
+@pytest.mark.parametrize( "s, code, comment, kind", [
+	( "x = 1 ' one\n", "x = 1 ", " one", "'" ),
+	( 'x = "it\'s" \'\' doc\n', 'x = "it\'s" ', "' doc", "''" ),
+	( 'x = "a""\'b" \'< back\n', 'x = "a""\'b" ', "< back", "'<" ),
+	( "'! class\n", "", "! class", "'!" ),
+	( "'/** block\n", "", "/** block", "'/**" ),
+	( 'x = "\'unterminated\n', 'x = "\'unterminated\n', None, None ),
+] )
+def test_line( s, code, comment, kind ):
+	line = vbfilter.Line( s )
+	assert ( code, comment, kind ) == ( line.code, line.comment, line.kind )
+
+def test_scan_comment_across_lines():
+	# the literal opened on the line before ends at the first single "
+	assert ( 6, False ) == vbfilter.scanComment( 'a""b" \' c', 0, True )
+	assert ( -1, True ) == vbfilter.scanComment( 'x = "a ""\' _', 0, False )
+
+# a line whose find() counts the chars it looks at
+class CountingLine(str):
+	
+	def find(self, sub, start = 0):
+		i = str.find( self, sub, start )
+		self.visited += ( len(self) if i == -1 else i + 1 ) - start
+		return i
+
+# each char is looked at a bounded number of times, however long the line
+# ( the old expression grew quadratically or worse on these lines ). the
+# times are measured by bench/scanner.py
+@pytest.mark.parametrize( "name", [ name for name, s in scanner.adversarial(10) ] )
+def test_linear( name ):
+	for n in ( 2000, 200000 ):
+		s = CountingLine( dict( scanner.adversarial( n ) )[name] )
+		s.visited = 0
+		vbfilter.scanComment( s )
+		assert s.visited <= 3 * len(s)
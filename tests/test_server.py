@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+#
+# the filter server ( vbfilter_server ) and its client ( vbfilter_client.py )
+
+import io
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+import vbfilter
+import vbfilter_client
+import vbfilter_protocol
+import vbfilter_server
+from conftest import module_source, top
+
+def request( path, controls = b"0", encoding = b"utf-8", errors = b"strict" ):
+	return vbfilter_protocol.packRequest( [ controls, encoding, errors, os.fsencode(path) ] )
+
+# the output and the status of a served request, read from its frames
+def served( request, opts = None ):
+	wfile = io.BytesIO()
+	vbfilter_server.serveRequest( io.BytesIO( request ), wfile, opts or vbfilter.FilterOptions() )
+	rfile = io.BytesIO( wfile.getvalue() )
+	out = b""
+	while True:
+		head = rfile.readline()
+		if head[:1] != b"D": return out, head
+		out += rfile.read( int(head[1:]) )
+
+def test_serve_request( source_dir ):
+	out, end = served( request( source_dir / "Module1.bas" ) )
+	assert b"E0\t\n" == end
+	assert vbfilter.filter_text( module_source, "bas" ).replace( "\n", os.linesep ).encode("utf-8") == out
+
+def test_serve_bad_request( source_dir ):
+	bad = ( b"E2\tvbfilter: bad request\n" )
+	assert ( b"", bad ) == served( b"GET / HTTP/1.0\n" )
+	assert ( b"", bad ) == served( b"" )
+	# the requests of the tab separated protocol, and cut or oversized fields
+	assert ( b"", bad ) == served( b"VBF1\t0\tutf-8\tstrict\t" + os.fsencode( source_dir / "Module1.bas" ) + b"\n" )
+	assert ( b"", bad ) == served( request( source_dir / "Module1.bas" )[:-3] )
+	assert ( b"", bad ) == served( b"VBF2\n1\n0" + b"%d\n" % ( 1 << 20 ) )
+
+# the fields are framed by their size: a path may hold tabs and newlines
+def test_serve_any_path( tmp_path, write_source ):
+	path = write_source( str( tmp_path / "a\tb\nc.bas" ), module_source )
+	out, end = served( request( path ) )
+	assert b"E0\t\n" == end
+	assert vbfilter.filter_text( module_source, "bas" ).replace( "\n", os.linesep ).encode("utf-8") == out
+
+def test_serve_missing_file( tmp_path ):
+	out, end = served( request( tmp_path / "none.bas" ) )
+	assert b"E1\t" == end[:3]
+
+def test_socket_path( monkeypatch ):
+	# one rule for the server and the client
+	assert vbfilter_server.socketPath is vbfilter_client.socketPath is vbfilter_protocol.socketPath
+	monkeypatch.setenv( "VBFILTER_SOCKET", "/x/s.sock" )
+	assert "/x/s.sock" == vbfilter_protocol.socketPath()
+	monkeypatch.delenv( "VBFILTER_SOCKET" )
+	monkeypatch.setenv( "XDG_RUNTIME_DIR", "/run/user/1" )
+	assert "/run/user/1/vbfilter.sock" == vbfilter_protocol.socketPath()
+	monkeypatch.delenv( "XDG_RUNTIME_DIR" )
+	monkeypatch.setenv( "TMPDIR", "/t" )
+	assert "/t/vbfilter-%d/vbfilter.sock" % os.getuid() == vbfilter_protocol.socketPath()
+
+# the requests are served by processes of their own, not by threads of one
+@pytest.mark.skipif( not hasattr( os, "fork" ), reason = "no fork" )
+def test_server_forks():
+	import socketserver
+	assert issubclass( vbfilter_server.serverClass(), socketserver.ForkingMixIn )
+
+@pytest.mark.skipif( not hasattr( socket, "AF_UNIX" ), reason = "no unix domain sockets" )
+def test_socket_directory_of_others_is_refused( tmp_path ):
+	shared = tmp_path / "shared"
+	shared.mkdir()
+	shared.chmod( 0o777 )
+	with pytest.raises( OSError ):
+		vbfilter_server.socketDirectory( str( shared / "vbfilter.sock" ) )
+	own = tmp_path / "own" / "vbfilter.sock"
+	vbfilter_server.socketDirectory( str(own) )
+	assert 0o700 == os.stat( own.parent ).st_mode & 0o777
+	
+	# the client does not talk to a socket in a directory others can write to
+	for directory in ( shared, own.parent ):
+		path = str( directory / "vbfilter.sock" )
+		s = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+		s.bind( path )
+		s.close()
+		assert ( directory == own.parent ) == vbfilter_client.trusted( path )
+
+@pytest.mark.skipif( not hasattr( socket, "AF_UNIX" ), reason = "no unix domain sockets" )
+def test_client_and_server( source_dir, tmp_path ):
+	env = dict( os.environ, VBFILTER_SOCKET = str( tmp_path / "run" / "vbfilter.sock" ), PYTHONIOENCODING = "utf-8" )
+	path = str( source_dir / "Form1.frm" )
+	expected = subprocess.run( [ sys.executable, os.path.join( top, "vbfilter.py" ), path ], stdout = subprocess.PIPE, env = env, check = True ).stdout
+	
+	server = subprocess.Popen( [ sys.executable, os.path.join( top, "vbfilter.py" ), "--serve" ], stderr = subprocess.PIPE, env = env )
+	try:
+		for i in range(100):
+			if os.path.exists( env["VBFILTER_SOCKET"] ): break
+			time.sleep( 0.05 )
+		client = os.path.join( top, "vbfilter_client.py" )
+		assert expected == subprocess.run( [ sys.executable, client, path ], stdout = subprocess.PIPE, env = env, check = True ).stdout
+		# stdin is filtered by the client itself
+		with open( path, "rb" ) as f:
+			assert expected == subprocess.run( [ sys.executable, client, "--kind", "frm", "-" ], stdin = f, stdout = subprocess.PIPE, env = env, check = True ).stdout
+		
+		# a request is served while another one is still being sent
+		waiting = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+		waiting.connect( env["VBFILTER_SOCKET"] )
+		waiting.sendall( request( path )[:10] )
+		sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+		sock.settimeout( 10 )
+		sock.connect( env["VBFILTER_SOCKET"] )
+		sock.sendall( request( path ) )
+		with sock, sock.makefile("rb") as rfile:
+			data = rfile.read()
+		assert data.endswith( b"E0\t\n" )
+		waiting.sendall( request( path )[10:] )
+		waiting.settimeout( 10 )
+		with waiting, waiting.makefile("rb") as rfile:
+			assert data == rfile.read()
+	finally:
+		server.terminate()
+		server.communicate( timeout = 10 )
+	assert not os.path.exists( env["VBFILTER_SOCKET"] )
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+#
+# large files split between procedures and filtered by a process pool
+# ( --split-size ): the same output as the file filtered whole
+
+import io
+
+import pytest
+
+import vbfilter
+from bench import corpus
+
+def filtered( path, **changes ):
+	out = io.StringIO()
+	vbfilter.filter_file( path, out, vbfilter.FilterOptions( controls = True ).copy( **changes ) )
+	return out.getvalue()
+
+@pytest.mark.parametrize( "kind", corpus.kinds )
+@pytest.mark.parametrize( "jobs", [ 1, 3 ] )
+def test_same_as_whole( tmp_path, write_source, kind, jobs ):
+	path = write_source( str( tmp_path / ( "Big." + kind ) ), corpus.generate( kind, "Big", 3000, jobs ) )
+	assert filtered( path ) == filtered( path, split = 1, jobs = jobs )
+
+# a global comment after the code, and procedure ends which a chunk must
+# not be cut at ( continued, or not at the start of the line )
+@pytest.mark.parametrize( "newline", [ "\r\n", "\r" ] )
+def test_global_comments_and_odd_ends( tmp_path, newline, write_source ):
+	lines = corpus.generate( "bas", "Odd", 2000, 5 ).splitlines( True )
+	for i, s in ( ( 1500, "'! a global comment late in the file\n" ), ( 900, "x = 1 _\n" ), ( 901, "End Sub _\n" ), ( 600, "  End Function\n" ), ( 300, "'/** a global\n' block */\n" ) ):
+		lines.insert( i, s )
+	path = str( tmp_path / "Odd.bas" )
+	with open( path, "w", encoding = "cp932", newline = newline ) as f:
+		f.write( "".join(lines) )
+	whole = filtered( path )
+	for jobs in ( 1, 2, 4 ):
+		assert whole == filtered( path, split = 1, jobs = jobs )
+
+def test_small_files_are_not_split( tmp_path, write_source, monkeypatch ):
+	path = write_source( str( tmp_path / "Small.bas" ), corpus.generate( "bas", "Small", 200, 1 ) )
+	def fail( *args ): raise AssertionError( "split" )
+	monkeypatch.setattr( vbfilter, "filterModuleSplit", fail )
+	filtered( path, split = 1 << 20 )
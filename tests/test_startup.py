@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+#
+# the cold start of vbfilter: the script imports the filter from its cached
+# bytecode, and filtering a file loads none of the other modes. the times
+# against bench/startup_budget.json depend on the load of the machine, they
+# are checked only with VBFILTER_STARTUP_CHECK=1.
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+top = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.mark.skipif( not os.environ.get("VBFILTER_STARTUP_CHECK"), reason = "timing, set VBFILTER_STARTUP_CHECK=1" )
+def test_startup_budget():
+	p = subprocess.run( [ sys.executable, os.path.join( top, "bench", "startup.py" ), "--check", "--runs=10" ], stdout = subprocess.PIPE, stderr = subprocess.STDOUT, universal_newlines = True )
+	assert 0 == p.returncode, p.stdout
+
+# the second run of the script loads vbfilter_core from the bytecode of the first
+def test_script_uses_cached_bytecode( tmp_path ):
+	path = tmp_path / "M.bas"
+	path.write_text( 'Attribute VB_Name = "M"\nPublic A As Long\n' )
+	env = dict( os.environ, PYTHONPYCACHEPREFIX = str( tmp_path / "pycache" ) )
+	env.pop( "PYTHONDONTWRITEBYTECODE", None )
+	cmd = [ sys.executable, "-v", os.path.join( top, "vbfilter.py" ), str(path) ]
+	for i in range(2):
+		p = subprocess.run( cmd, stdout = subprocess.PIPE, stderr = subprocess.PIPE, env = env, universal_newlines = True, check = True )
+	assert "namespace M\n" in p.stdout
+	assert [ s for s in p.stderr.splitlines() if "code object from" in s and "vbfilter_core" in s ]
+
+# filtering a file loads none of the modules of the other modes
+def test_filter_loads_no_other_mode():
+	code = "\n".join( [
+		"import sys, vbfilter",
+		"vbfilter.filter_text( 'Attribute VB_Name = \"M\"\\nPublic A As Long\\n', 'bas' )",
+		"print( ' '.join( m for m in sys.modules if m.startswith('vbfilter_') and 'vbfilter_core' != m ) )",
+	] )
+	p = subprocess.run( [ sys.executable, "-c", code ], stdout = subprocess.PIPE, cwd = top, universal_newlines = True, check = True )
+	assert "" == p.stdout.strip()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+#
+# the statistics of the handlers and patterns ( vbfilter_stats, --stats )
+
+import json
+import os
+import subprocess
+import sys
+
+import vbfilter
+import vbfilter_stats
+from conftest import class_source, form_source, module_source, top
+
+def test_stats_count_and_restore():
+	expected = vbfilter.filter_text( module_source, "bas" )
+	before = dict( vars(vbfilter) )
+	feed = vbfilter.CodeFilter.feed
+	with vbfilter_stats.Stats() as stats:
+		assert expected == vbfilter.filter_text( module_source, "bas" )
+		assert vbfilter.checkBlankLine is not before["checkBlankLine"]
+	
+	# every name is bound again to what it was
+	assert feed is vbfilter.CodeFilter.feed
+	for name, value in before.items():
+		if name.startswith(("check", "found", "process", "filter_")): assert value is vars(vbfilter)[name], name
+		if name.startswith("re_"): assert not isinstance( vars(vbfilter)[name], vbfilter_stats.TimedPattern ), name
+	
+	result = stats.result()
+	assert vbfilter.__version__ == result["version"]
+	assert 0 < result["handlers"]["foundFunction"]["calls"]
+	assert 1 == result["handlers"]["foundFunction"]["hits"]
+	assert 0 < result["patterns"]["re_function"]["calls"]
+	assert "<text>" == result["slowest"][0]["file"]
+
+# every pattern the filter uses is counted, whichever of its methods is called
+def test_every_pattern_used_is_counted( monkeypatch ):
+	samples = [ ( module_source, "bas" ), ( class_source, "cls" ), ( form_source, "frm" ) ]
+	opts = vbfilter.FilterOptions( controls = True )
+	
+	# the patterns used, found by a proxy of each
+	class Used(object):
+		def __init__(self, name, pattern, used):
+			self.name, self.pattern, self.used = name, pattern, used
+		def __getattr__(self, attr):
+			self.used.add( self.name )
+			return getattr( self.pattern, attr )
+	used = set()
+	with monkeypatch.context() as m:
+		m.setattr( vbfilter, "translations", vbfilter.TranslationCache() )
+		for name, value in list( vars(vbfilter).items() ):
+			if isinstance( value, vbfilter.LazyPattern ): value = value.compile()
+			if name.startswith("re_"): m.setattr( vbfilter, name, Used( name, value, used ) )
+		for text, kind in samples: vbfilter.filter_text( text, kind, opts )
+	assert "re_arg" in used
+	
+	monkeypatch.setattr( vbfilter, "translations", vbfilter.TranslationCache() )
+	with vbfilter_stats.Stats() as stats:
+		for text, kind in samples: vbfilter.filter_text( text, kind, opts )
+	patterns = stats.result()["patterns"]
+	assert used <= set( patterns )
+	assert 0 < patterns["re_arg"]["hits"]
+
+def test_timed_pattern():
+	import re
+	count = [ 0, 0, 0.0 ]
+	timed = vbfilter_stats.TimedPattern( re.compile( r"a" ), count, vbfilter_stats.Stats().perf )
+	assert [ "a", "a" ] == [ m.group(0) for m in timed.finditer( "bab a" ) ]
+	assert list( timed.finditer( "b" ) ) == []
+	assert timed.search( "ba" ) and timed.fullmatch( "a" ) and not timed.match( "b" )
+	assert ( "xbx", 2 ) == timed.subn( "x", "aba" )
+	assert [ "", "b" ] == timed.split( "ab" ) and [ "a" ] == timed.findall( "ab" )
+	assert [ 8, 6 ] == count[:2]
+
+def test_write_stats( tmp_path ):
+	path = str( tmp_path / "stats.jsonl" )
+	for i in range(2):
+		with vbfilter_stats.Stats() as stats: vbfilter.filter_text( class_source, "cls" )
+		vbfilter_stats.writeStats( stats, path )
+	with open( path, encoding = "utf-8" ) as f:
+		lines = [ json.loads(s) for s in f ]
+	assert 2 == len(lines)
+	assert 0 < lines[1]["handlers"]["foundSub"]["calls"]
+
+def test_stats_file_option( source_dir, tmp_path ):
+	path = str( tmp_path / "stats.jsonl" )
+	p = subprocess.run( [ sys.executable, os.path.join( top, "vbfilter.py" ), "--stats-file", path, str(source_dir / "Module1.bas") ], stdout = subprocess.PIPE, env = dict( os.environ, PYTHONIOENCODING = "utf-8" ), check = True )
+	assert vbfilter.filter_text( module_source, "bas" ).replace( "\n", os.linesep ).encode("utf-8") == p.stdout
+	with open( path, encoding = "utf-8" ) as f:
+		result = json.loads( f.read() )
+	assert str(source_dir / "Module1.bas") == result["slowest"][0]["file"]
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+#
+# the streaming API ( vbfilter_stream ): StreamFilter fed chunks of any size,
+# afilter and afilter_to on asyncio streams
+
+import asyncio
+
+import pytest
+
+import vbfilter
+import vbfilter_stream
+from conftest import samples
+
+def chunked( data, size ):
+	return [ data[i:i + size] for i in range( 0, len(data), size ) ]
+
+# cut inside multibyte characters and between "\r" and "\n"
+@pytest.mark.parametrize( "size", [ 1, 7, 4096 ] )
+@pytest.mark.parametrize( "name", sorted(samples) )
+def test_bytes_in_chunks( name, size ):
+	opts = vbfilter.FilterOptions( controls = True )
+	stream = vbfilter_stream.StreamFilter( name, opts )
+	out = [ stream.feed( data ) for data in chunked( samples[name].replace( "\n", "\r\n" ).encode("cp932"), size ) ]
+	out.append( stream.close() )
+	assert vbfilter.filter_text( samples[name], name, opts ) == "".join(out)
+
+def test_text_in_chunks():
+	stream = vbfilter_stream.StreamFilter( "bas" )
+	out = [ stream.feed( s ) for s in chunked( samples["Module1.bas"], 10 ) ]
+	assert vbfilter.filter_text( samples["Module1.bas"], "bas" ) == "".join(out) + stream.close()
+
+def test_unknown_kind_is_dumped():
+	stream = vbfilter_stream.StreamFilter( "txt" )
+	assert ".a\n" == stream.feed( b"a\r\nb" )
+	assert ".b" == stream.close()
+
+class Writer(object):
+	
+	def __init__(self):
+		self.data = []
+		self.drains = 0
+	
+	def write(self, data):
+		self.data.append( data )
+	
+	async def drain(self):
+		self.drains += 1
+
+def reader( data ):
+	stream = asyncio.StreamReader()
+	stream.feed_data( data )
+	stream.feed_eof()
+	return stream
+
+def test_afilter():
+	source = samples["Form1.frm"]
+	async def run():
+		return [ out async for out in vbfilter_stream.afilter( reader( source.encode("cp932") ), "frm", size = 64 ) ]
+	out = asyncio.run( run() )
+	assert vbfilter.filter_text( source, "frm" ) == "".join(out)
+
+def test_afilter_of_an_async_iterable():
+	source = samples["Class1.cls"]
+	async def chunks():
+		for data in chunked( source.encode("cp932"), 100 ): yield data
+	async def run():
+		return "".join( [ out async for out in vbfilter.afilter( chunks(), "cls" ) ] )
+	assert vbfilter.filter_text( source, "cls" ) == asyncio.run( run() )
+
+def test_afilter_to():
+	source = samples["Module1.bas"]
+	writer = Writer()
+	async def run():
+		await vbfilter.afilter_to( writer, reader( source.encode("cp932") ), "bas", encoding = "utf-16" )
+	asyncio.run( run() )
+	assert vbfilter.filter_text( source, "bas" ).encode("utf-16") == b"".join( writer.data )
+	assert len( writer.data ) == writer.drains
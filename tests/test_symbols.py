@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+#
+# the symbol sinks ( JsonSymbols, CtagsSymbols, --symbols, --tags ) written
+# in the same pass as the output
+
+import io
+import json
+import os
+import subprocess
+import sys
+
+import vbfilter
+import vbfilter_batch
+from conftest import form_source, module_source, top
+
+# the output and the symbols of the files at paths ( JSON lines, tags )
+def symbols( paths, opts = None ):
+	opts = opts or vbfilter.FilterOptions()
+	json_file, tags_file = io.StringIO(), io.StringIO()
+	sinks = [ vbfilter.JsonSymbols( json_file ), vbfilter.CtagsSymbols( tags_file ) ]
+	outputs = []
+	for path in paths:
+		out = io.StringIO()
+		vbfilter.filter_file( path, out, opts, sinks = sinks )
+		outputs.append( out.getvalue() )
+	for sink in sinks: sink.close()
+	return outputs, [ json.loads(s) for s in json_file.getvalue().splitlines() ], tags_file.getvalue().splitlines()
+
+def test_json_symbols( source_dir ):
+	path = str( source_dir / "Module1.bas" )
+	outputs, found, tags = symbols( [ path ] )
+	assert [ vbfilter.filter_text( module_source, "bas" ) ] == outputs
+	assert [ ( "Count", "variable", 4 ), ( "EColor", "enum", 6 ), ( "Red", "enumerator", 7 ), ( "Green", "enumerator", 8 ),
+		( "TPoint", "type", 11 ), ( "X", "field", 12 ), ( "Y", "field", 13 ), ( "Add", "function", 17 ), ( "Hello", "sub", 22 ), ( "Name", "property get", 26 ) ] == [ ( s["name"], s["kind"], s["line"] ) for s in found ]
+	add = found[7]
+	assert {
+		"name": "Add", "kind": "function", "access": "public",
+		"signature": "Function Add(ByVal a As Long, Optional ByRef b As Long = 1) As Long",
+		"scope": "Module1", "module": "Module1", "file": path, "line": 17, "doc": "adds a and b\n@param a first" } == add
+	assert "Module1.EColor" == found[2]["scope"]
+	assert "red" == found[2]["doc"]
+
+def test_ctags( source_dir ):
+	paths = [ str( source_dir / "Module1.bas" ), str( source_dir / "Form1.frm" ) ]
+	outputs, found, tags = symbols( paths )
+	assert "!_TAG_FILE_SORTED\t1\t/0=unsorted, 1=sorted, 2=foldcase/" in tags
+	entries = [ s for s in tags if not s.startswith("!_TAG_") ]
+	assert sorted(entries) == entries
+	assert len(found) == len(entries)
+	assert paths[0] + '\t17;"\tf\tline:17\tnamespace:Module1\taccess:public\tsignature:(ByVal a As Long, Optional ByRef b As Long = 1)' in [ s.split("\t", 1)[1] for s in entries if s.startswith("Add\t") ]
+	assert "Changed\t" + paths[1] + '\t24;"\tE\tline:24\tclass:Form1\taccess:public\tsignature:(ByVal value As Long)' in entries
+
+def test_symbols_of_the_cached_ir( source_dir, tmp_path ):
+	paths = [ str( source_dir / "Form1.frm" ) ]
+	expected = symbols( paths )
+	opts = vbfilter.FilterOptions( cache = str( tmp_path / "cache" ) )
+	assert expected == symbols( paths, opts )
+	assert expected == symbols( paths, opts )
+
+def test_batch_symbols_in_the_order_of_the_sources( source_dir, tmp_path ):
+	json_file = io.StringIO()
+	sink = vbfilter.JsonSymbols( json_file )
+	assert [] == vbfilter_batch.filter_batch( [ str( source_dir / "Project1.vbp" ) ], str( tmp_path / "out" ), jobs = 2, out_encoding = "utf-8", sinks = [ sink ] )
+	sink.close()
+	modules = [ json.loads(s)["module"] for s in json_file.getvalue().splitlines() ]
+	assert [ "Form1", "Module1", "Class1" ] == sorted( set(modules), key = modules.index )
+
+def test_options( source_dir, tmp_path ):
+	path = str( source_dir / "Form1.frm" )
+	p = subprocess.run( [ sys.executable, os.path.join( top, "vbfilter.py" ), "--symbols", str( tmp_path / "s.jsonl" ), "--tags", str( tmp_path / "tags" ), path ], stdout = subprocess.PIPE, env = dict( os.environ, PYTHONIOENCODING = "utf-8" ), check = True )
+	outputs, found, tags = symbols( [ path ] )
+	assert vbfilter.filter_text( form_source, "frm" ).replace( "\n", os.linesep ).encode("utf-8") == p.stdout
+	with open( str( tmp_path / "s.jsonl" ), encoding = "utf-8" ) as f:
+		assert found == [ json.loads(s) for s in f ]
+	with open( str( tmp_path / "tags" ), encoding = "utf-8", newline = "" ) as f:
+		assert "\n".join( tags ) + "\n" == f.read()
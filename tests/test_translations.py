@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+#
+# the cache of translations ( TranslationCache ) shared by the files filtered
+# in a process
+
+import threading
+
+import vbfilter
+from conftest import class_source, form_source, module_source
+
+def test_least_recently_used_is_dropped():
+	cache = vbfilter.TranslationCache( 2 )
+	cache.put( "a", 1 )
+	cache.put( "b", 2 )
+	assert 1 == cache.get( "a" )
+	cache.put( "c", 3 )
+	assert [ "a", "c" ] == list( cache.entries )
+	assert cache.get( "b" ) is None
+	assert 3 == cache.get( "c" )
+	assert ( 2, 1 ) == cache.counts()
+	# a get makes the entry the most recently used
+	assert [ "a", "c" ] == list( cache.entries )
+
+def test_clear():
+	cache = vbfilter.TranslationCache()
+	cache.put( "a", 1 )
+	cache.get( "a" )
+	cache.get( "b" )
+	cache.clear()
+	assert ( 0, 0 ) == cache.counts()
+	assert cache.get( "a" ) is None
+
+def test_threads():
+	cache = vbfilter.TranslationCache( 64 )
+	def run( n ):
+		for i in range( 2000 ):
+			key = ( n + i ) % 100
+			if cache.get( key ) is None: cache.put( key, key )
+	threads = [ threading.Thread( target = run, args = ( n, ) ) for n in range( 8 ) ]
+	for t in threads: t.start()
+	for t in threads: t.join()
+	assert 64 == len( cache.entries )
+	assert 8 * 2000 == sum( cache.counts() )
+	assert all( key == value for key, value in cache.entries.items() )
+
+def test_indented_members_share_an_entry( monkeypatch ):
+	cache = vbfilter.TranslationCache()
+	monkeypatch.setattr( vbfilter, "translations", cache )
+	first = vbfilter.matchMember( "Public Count As Long" )
+	assert first is not None
+	assert first is vbfilter.matchMember( "    Public Count As Long" )
+	assert first is vbfilter.matchMember( "\tPublic Count As Long" )
+	assert ( 2, 1 ) == cache.counts()
+	# other spacing is another entry, as the output keeps it
+	assert first is not vbfilter.matchMember( "Public  Count As Long" )
+
+def test_output_is_the_same_with_the_cache( monkeypatch ):
+	opts = vbfilter.FilterOptions( controls = True )
+	sources = [ ( module_source, "bas" ), ( class_source, "cls" ), ( form_source, "frm" ) ]
+	cold = []
+	for text, kind in sources:
+		monkeypatch.setattr( vbfilter, "translations", vbfilter.TranslationCache() )
+		cold.append( vbfilter.filter_text( text, kind, opts ) )
+
+	cache = vbfilter.TranslationCache()
+	monkeypatch.setattr( vbfilter, "translations", cache )
+	for i in range( 2 ):
+		assert cold == [ vbfilter.filter_text( text, kind, opts ) for text, kind in sources ]
+	assert 0 < cache.counts()[0]
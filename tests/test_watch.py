@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+#
+# the watch mode ( vbfilter_watch, --watch ): the files changed filtered again
+# once the changes are quiet for the debounce time
+
+import os
+import time
+
+import pytest
+
+import vbfilter
+import vbfilter_watch
+from conftest import class_source, module_source
+
+def output( path ):
+	with open( path, encoding = "utf-8", newline = None ) as f:
+		return f.read()
+
+@pytest.fixture
+def watched( source_dir, tmp_path ):
+	watched = vbfilter_watch.SourceWatch( [ str(source_dir) ], str( tmp_path / "out" ), vbfilter.FilterOptions(), "utf-8" )
+	yield watched
+	if watched.watcher is not None: watched.watcher.close()
+
+# stamps which change after the given scans
+class Scans(object):
+	
+	def __init__(self, *changes):
+		self.calls = 0
+		self.changes = changes
+	
+	def __call__(self):
+		self.calls += 1
+		return { "a": sum( 1 for n in self.changes if n < self.calls ) }
+
+def test_polling_returns_after_the_timeout():
+	watcher = vbfilter_watch.PollingWatcher( Scans(), 10.0 )
+	t = time.perf_counter()
+	assert set() == watcher.wait( 0.05 )
+	assert time.perf_counter() - t < 1.0
+
+def test_polling_waits_for_a_change():
+	scans = Scans( 3 )
+	watcher = vbfilter_watch.PollingWatcher( scans, 0.01 )
+	assert { "a" } == watcher.wait( None )
+	assert 4 == scans.calls
+
+# a burst of changes is applied once, when no change came for debounce seconds
+def test_debounce( watched ):
+	class Burst(object):
+		def __init__(self):
+			self.waits = [ { "a" }, { "a", "b" }, { "a" }, set(), { "c" }, set() ]
+			self.timeouts = []
+		def wait(self, timeout):
+			self.timeouts.append( timeout )
+			if not self.waits: raise KeyboardInterrupt
+			return self.waits.pop(0)
+		def close(self):
+			pass
+	applied = []
+	watched.watcher = Burst()
+	watched.apply = lambda paths: applied.append( paths )
+	with pytest.raises( KeyboardInterrupt ):
+		watched.run()
+	assert [ { "a", "b" }, { "c" } ] == applied
+	d = watched.debounce
+	assert [ None, d, d, d, None, d, None ] == watched.watcher.timeouts
+
+def test_changes_are_applied( watched, source_dir, tmp_path, write_source ):
+	out = tmp_path / "out"
+	work = watched.stale()
+	assert 3 == len(work)
+	for src, dst in work: watched.filterOne( src, dst )
+	assert [] == watched.stale()
+	assert vbfilter.filter_text( module_source, "bas" ) == output( out / "Module1.bas" )
+	
+	# changed, removed and created files
+	changed = module_source.replace( "Hello", "Bye" )
+	write_source( str( source_dir / "Module1.bas" ), changed )
+	os.utime( source_dir / "Module1.bas", ( time.time() + 5, time.time() + 5 ) )
+	os.unlink( source_dir / "Class1.cls" )
+	write_source( str( source_dir / "sub" / "Class2.cls" ), class_source )
+	watched.apply( { str( source_dir / "Module1.bas" ), str( source_dir / "Class1.cls" ), str( source_dir / "sub" ) } )
+	assert vbfilter.filter_text( changed, "bas" ) == output( out / "Module1.bas" )
+	assert not ( out / "Class1.cls" ).exists()
+	assert vbfilter.filter_text( class_source, "cls" ) == output( out / "sub" / "Class2.cls" )
+	
+	# a directory removed takes its outputs along
+	os.unlink( source_dir / "sub" / "Class2.cls" )
+	os.rmdir( source_dir / "sub" )
+	watched.apply( { str( source_dir / "sub" ) } )
+	assert not ( out / "sub" ).exists()
+
+def test_a_failed_file_keeps_its_output( watched, source_dir, tmp_path ):
+	src, dst = str( source_dir / "Module1.bas" ), str( tmp_path / "out" / "Module1.bas" )
+	watched.filterOne( src, dst )
+	( source_dir / "Module1.bas" ).write_bytes( b'Attribute VB_Name = "M"\r\nPublic A As Long \x82\r\n' )
+	watched.filterOne( src, dst )
+	assert vbfilter.filter_text( module_source, "bas" ) == output( dst )
+	# nor a temporary file
+	assert [ "Module1.bas" ] == os.listdir( tmp_path / "out" )
+
+# the empty directories are removed up to outdir, which stays with its parents
+def test_removed_keeps_outdir( tmp_path, write_source ):
+	src = write_source( str( tmp_path / "src" / "sub" / "deep" / "Module1.bas" ), module_source )
+	outdir = tmp_path / "a" / "b" / "out"
+	watched = vbfilter_watch.SourceWatch( [ str( tmp_path / "src" ) ], str(outdir), vbfilter.FilterOptions(), "utf-8" )
+	for s, dst in watched.stale(): watched.filterOne( s, dst )
+	assert ( outdir / "sub" / "deep" / "Module1.bas" ).exists()
+	
+	os.unlink( src )
+	watched.apply( { src } )
+	assert [] == os.listdir( str(outdir) )
+	assert [ "out" ] == os.listdir( str( tmp_path / "a" / "b" ) )
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+#
+# Amalgamation of vbfilter ("vbfilter.py --amalgamate"): the sources
+# filtered into one file or a few shards. Imported only for --amalgamate.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+import codecs          # encoder of the output
+import io              # in-memory files
+import os.path         # paths of the shards
+import sys             # output and stuff
+
+from vbfilter_core import FilterOptions, filter_file, text_newline
+from vbfilter_batch import find_sources
+
+## amalgamation ##
+####################
+#
+# "vbfilter.py --amalgamate out source..." filters every Module, Class and
+# Form of the sources into the one file out, or into shards of about
+# --shard-size bytes ( out.1.ext, out.2.ext... ), so doxygen opens a few
+# files instead of one per source. the output of each file is preceded by a
+# comment naming the source, and is never cut between shards. a file whose
+# output the encoding cannot write fails alone, as a file which cannot be
+# filtered. the files of an earlier run which are not written again ( out
+# when there are shards, the shards when there are fewer or none ) are
+# removed.
+
+# the output of the file at path, as ( text, error message or None )
+def amalgamateOne( path, options ):
+	outFile = io.StringIO()
+	try:
+		filter_file( path, outFile, options )
+	except Exception as e:
+		return None, "%s: %s" % ( type(e).__name__, e )
+	return outFile.getvalue(), None
+
+# the outputs of the files, in order, filtered by jobs processes ( at most
+# a few per process ahead of what was written )
+def amalgamateOutputs( paths, options, jobs ):
+	
+	if 1 == jobs:
+		for path in paths: yield amalgamateOne( path, options )
+		return
+	
+	import collections
+	from concurrent.futures import ProcessPoolExecutor
+	
+	with ProcessPoolExecutor( jobs ) as pool:
+		ahead = 4 * ( jobs or os.cpu_count() or 1 )
+		futures = collections.deque()
+		for path in paths:
+			futures.append( pool.submit( amalgamateOne, path, options ) )
+			if ahead <= len(futures): yield futures.popleft().result()
+		while futures: yield futures.popleft().result()
+
+# the file of shard number n of out ( 0 when not sharded )
+def shardPath( out, n ):
+	if 0 == n: return out
+	root, ext = os.path.splitext( out )
+	return "%s.%d%s" % ( root, n, ext )
+
+# removes the files of an earlier run ( out or its shards ) which are not
+# in written, so doxygen does not read their symbols twice
+def removeShards( out, written ):
+	n = 0
+	while True:
+		path = shardPath( out, n )
+		if path not in written:
+			try:
+				os.unlink( path )
+			except FileNotFoundError:
+				if n: return
+		n += 1
+
+# a temporary file next to the shard at path, renamed to it by commitShard
+# once it is whole, so no run leaves a shard cut short
+def newShard( path ):
+	import tempfile
+	fd, tmp = tempfile.mkstemp( dir = os.path.dirname(os.path.abspath(path)), prefix = ".vbfilter" )
+	return open( fd, "wb" ), tmp
+
+def commitShard( shard, path ):
+	f, tmp = shard
+	f.close()
+	os.replace( tmp, path )
+
+# filters the files of the sources into out ( or shards of shard_size
+# bytes ), returns the files written and the failures ( path, message ).
+# the output of each file follows a comment with its path ( there is no
+# #line: the lines of the output are not those of the source )
+def amalgamate( sources, out, options = None, jobs = None, shard_size = None, out_encoding = None ):
+	
+	if options is None: options = FilterOptions()
+	if out_encoding is None: out_encoding = sys.stdout.encoding or options.encoding
+	
+	paths = [ path for source in sources for path, root in find_sources( source, options ) ]
+	quiet = options.copy( verbose = False )
+	encoder = codecs.getencoder( out_encoding )
+	
+	written = []
+	failures = []
+	shard = None	# ( file, temporary path ) of the last of written
+	size = 0
+	try:
+		for path, ( text, error ) in zip( paths, amalgamateOutputs( paths, quiet, jobs ) ):
+			if error is None:
+				text = "\n// -- vbfilter: " + path + " --\n" + text
+				if text_newline is not None: text = text.replace( "\n", text_newline )
+				try:
+					data = encoder( text )[0]
+				except UnicodeEncodeError as e:
+					error = "%s: %s" % ( type(e).__name__, e )
+			if error is not None:
+				failures.append( ( path, error ) )
+				sys.stderr.write( path + ": " + error + "\n" )
+				continue
+			
+			if shard is None or shard_size is not None and 0 < size and shard_size < size + len(data):
+				if shard is not None: commitShard( shard, written[-1] )
+				shard = None
+				written.append( shardPath( out, shard_size is not None and len(written) + 1 or 0 ) )
+				shard = newShard( written[-1] )
+				size = 0
+			shard[0].write( data )
+			size += len(data)
+		if shard is not None: commitShard( shard, written[-1] )
+		shard = None
+	finally:
+		if shard is not None:
+			shard[0].close()
+			os.unlink( shard[1] )
+	removeShards( out, written )
+	
+	if options.verbose:
+		sys.stderr.write( "%d files filtered into %d, %d failed\n" % ( len(paths) - len(failures), len(written), len(failures) ) )
+	return written, failures
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+# Batch mode of vbfilter ("vbfilter.py --batch"): the sources of directories
+# and .vbp projects, filtered in a pool of processes. Imported only for
+# --batch and the other modes which read whole source trees.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+import io              # in-memory files
+import os.path         # paths of the sources and outputs
+import sys             # output and stuff
+
+from vbfilter_core import FilterOptions, OutputSink, fileKind, filter_file, filters, translations
+
+## batch mode ##
+#################
+#
+# "vbfilter.py --batch outdir source..." filters every Module, Class and Form
+# of the given directories or .vbp projects in a pool of processes and writes
+# each result under outdir, mirroring the source tree, so doxygen can read the
+# filtered files without any INPUT_FILTER.
+
+# entries of a .vbp project which refer to source files
+vbp_sources = ( "module", "class", "form" )
+
+# yields the files ( path, root ) referenced by the .vbp project at path
+def projectSources( path, opts ):
+	
+	root = os.path.dirname(os.path.abspath(path))
+	with open( path, encoding = opts.encoding ) as vbp:
+		for s in vbp:
+			key, eq, value = s.partition("=")
+			if not eq or key.strip().lower() not in vbp_sources: continue
+			# "Module=Name; File.bas", "Class=Name; File.cls", "Form=File.frm"
+			name = value.split(";")[-1].strip().strip('"').replace("\\", os.sep)
+			if name: yield os.path.normpath(os.path.join( root, name )), root
+
+# yields the source files ( path, root ) of a directory or a .vbp project
+def find_sources( path, options = None ):
+	
+	if options is None: options = FilterOptions()
+	
+	if not os.path.isdir(path):
+		if "vbp" == fileKind(path): yield from projectSources( path, options )
+		else: yield os.path.abspath(path), os.path.dirname(os.path.abspath(path))
+		return
+	
+	root = os.path.abspath(path)
+	for dirpath, dirnames, filenames in os.walk(root):
+		dirnames.sort()
+		for name in sorted(filenames):
+			if fileKind(name) in filters: yield os.path.join( dirpath, name ), root
+
+# filters one file of a batch, returns an error message or None, what
+# the sinks of the given classes got ( see collect ) and the hits and
+# misses of translations while filtering it
+def batchOne( src, dst, options, out_encoding, sink_classes = () ):
+	
+	sinks = [ cls( io.StringIO() ) for cls in sink_classes ]
+	hits, misses = translations.counts()
+	try:
+		os.makedirs( os.path.dirname(dst), exist_ok = True )
+		with open( dst, "wb" ) as f, OutputSink( f, out_encoding ) as outFile:
+			filter_file( src, outFile, options, sinks = sinks )
+	except Exception as e:
+		# do not leave a partial output behind
+		if os.path.exists(dst): os.unlink(dst)
+		return "%s: %s" % ( type(e).__name__, e ), None, ( 0, 0 )
+	now = translations.counts()
+	return None, [ sink.collect() for sink in sinks ], ( now[0] - hits, now[1] - misses )
+
+# filters all the sources into outdir with jobs processes, and their
+# symbols to sinks in the order of the sources,
+# returns the list of the failures ( path, message )
+def filter_batch( sources, outdir, options = None, jobs = None, out_encoding = None, sinks = () ):
+	
+	if options is None: options = FilterOptions()
+	# same bytes as "vbfilter.py file > output"
+	if out_encoding is None: out_encoding = sys.stdout.encoding or options.encoding
+	
+	work = []
+	for source in sources:
+		files = list(find_sources( source, options ))
+		if not files: continue
+		base = sourceBase( files )
+		for path, root in files:
+			work.append( ( path, os.path.join( outdir, os.path.relpath( path, base ) ) ) )
+	return runBatch( work, options, jobs, out_encoding, sinks )
+
+# the directory whose tree the output of a source mirrors, the one common
+# to all its files ( path, root )
+def sourceBase( files ):
+	return os.path.commonpath( [ root for path, root in files ] + [ os.path.dirname(path) for path, root in files ] )
+
+# filters each src of work to its dst ( see filter_batch )
+def runBatch( work, options, jobs, out_encoding, sinks = () ):
+	
+	from concurrent.futures import ProcessPoolExecutor
+	
+	failures = []
+	translated = [ 0, 0 ]
+	quiet = options.copy( verbose = False )
+	with ProcessPoolExecutor( jobs ) as pool:
+		sink_classes = tuple( sink.__class__ for sink in sinks )
+		futures = [ ( src, pool.submit( batchOne, src, dst, quiet, out_encoding, sink_classes ) ) for src, dst in work ]
+		for src, future in futures:
+			try:
+				error, collected, counts = future.result()
+			except Exception as e:
+				error = "%s: %s" % ( type(e).__name__, e )
+			if error is None:
+				for sink, data in zip( sinks, collected ): sink.merge( data )
+				translated[0] += counts[0]
+				translated[1] += counts[1]
+			else:
+				failures.append( ( src, error ) )
+				sys.stderr.write( src + ": " + error + "\n" )
+	
+	if options.verbose:
+		sys.stderr.write( "%d files filtered, %d failed, translation cache: %d hits, %d misses\n" % ( len(work) - len(failures), len(failures), translated[0], translated[1] ) )
+	return failures
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#
+# Output cache of vbfilter ("vbfilter.py --cache dir"): the outputs and the
+# IR of the files stored under the hash of their bytes. Imported only when
+# the options have a cache.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+import io              # buffered reading of the hashed files
+import os.path         # paths of the entries
+
+from vbfilter_core import dumps_ir, filterDigest, filterLines, loads_ir, parseLines, sourceLines
+
+## output cache ##
+##################
+#
+# the output of a file is stored under a hash of its bytes, of the options
+# which change the output and of the filter itself. a manifest entry per
+# file ( size, mtime, hash ) skips even the hashing while the file does not
+# change. every entry is written to a temporary file which is then renamed,
+# so parallel filter processes can share one cache directory.
+
+class OutputCache(object):
+	
+	def __init__(self, directory, opts):
+		self.directory = directory
+		self.opts = opts
+		self.salt = ( opts.key() + "\t" + filterDigest() + "\n" ).encode("utf-8")
+	
+	def path(self, kind, name):
+		return os.path.join( self.directory, kind, name[:2], name )
+	
+	# a new entry: a temporary file, renamed into place by commit
+	def newEntry(self, mode = "wb", **kw):
+		import tempfile
+		os.makedirs( self.directory, exist_ok = True )
+		fd, tmp = tempfile.mkstemp( dir = self.directory, prefix = ".tmp" )
+		return tmp, os.fdopen( fd, mode, **kw )
+	
+	def commit(self, tmp, path):
+		os.makedirs( os.path.dirname(path), exist_ok = True )
+		os.replace( tmp, path )
+	
+	# writes data to the entry at path atomically
+	def store(self, path, data):
+		tmp, f = self.newEntry()
+		try:
+			with f:
+				f.write(data)
+			self.commit( tmp, path )
+		except BaseException:
+			os.unlink(tmp)
+			raise
+	
+	# copies the output stored under key to out, returns False if not cached
+	def copy(self, key, out):
+		import shutil
+		try:
+			f = open( self.path( "output", key ), encoding = "utf-8", newline = "" )
+		except FileNotFoundError:
+			return False
+		with f:
+			shutil.copyfileobj( f, out )
+		return True
+	
+	# filters the file at path to out
+	def filter(self, path, out, kind = None):
+		import hashlib
+		import time
+		
+		st = os.stat(path)
+		stamp = "%d %d" % ( st.st_size, st.st_mtime_ns )
+		manifest = self.path( "manifest", hashlib.sha1( self.salt + os.fsencode(os.path.abspath(path)) ).hexdigest() )
+		
+		# unchanged since the last run
+		try:
+			with open( manifest, encoding = "ascii" ) as f:
+				known, key = f.read().rsplit( " ", 1 )
+			if known == stamp and self.copy( key, out ): return
+		except (OSError, ValueError):
+			pass
+		
+		digest = hashlib.sha256( self.salt )
+		with open( path, "rb" ) as inFile:
+			for data in iter( lambda: inFile.read(1 << 20), b"" ): digest.update(data)
+		key = digest.hexdigest()
+		
+		if not self.copy( key, out ):
+			# filter to out and to a new entry, stored under the hash of what was read
+			digest = hashlib.sha256( self.salt )
+			tmp, entry = self.newEntry( "w", encoding = "utf-8", errors = "surrogatepass", newline = "" )
+			try:
+				with entry, open( path, "rb", buffering = 0 ) as raw:
+					inFile = sourceLines( io.BufferedReader(HashingReader( raw, digest )), self.opts.encoding )
+					filterLines( inFile, TeeWriter( out, entry ), kind or path, self.opts )
+				key = digest.hexdigest()
+				self.commit( tmp, self.path( "output", key ) )
+			except BaseException:
+				if os.path.exists(tmp): os.unlink(tmp)
+				raise
+		
+		# a file changed in the same tick as its mtime could change again unnoticed
+		if 2 * 10**9 < time.time_ns() - st.st_mtime_ns:
+			self.store( manifest, ( stamp + " " + key ).encode("ascii") )
+	
+	# the Module of the file at path, stored under the hash of its bytes
+	def parse(self, path, kind = None):
+		import hashlib
+		
+		with open( path, "rb" ) as f:
+			data = f.read()
+		entry = self.path( "ir", hashlib.sha256( self.salt + b"ir\n" + data ).hexdigest() )
+		try:
+			with open( entry, "rb" ) as f:
+				return loads_ir( f.read() )
+		except (OSError, ValueError, EOFError, TypeError):
+			pass
+		
+		module = parseLines( sourceLines( io.BytesIO(data), self.opts.encoding ), kind or path, self.opts )
+		self.store( entry, dumps_ir(module) )
+		return module
+
+# binary file updating a digest with what is read from it
+class HashingReader(io.RawIOBase):
+	
+	def __init__(self, raw, digest):
+		self.raw = raw
+		self.digest = digest
+	
+	def readable(self):
+		return True
+	
+	def readinto(self, b):
+		n = self.raw.readinto(b)
+		if n: self.digest.update( memoryview(b)[:n] )
+		return n
+
+# writes to two files at once
+class TeeWriter(object):
+	
+	def __init__(self, first, second):
+		self.first = first
+		self.second = second
+	
+	def write(self, s):
+		self.first.write(s)
+		self.second.write(s)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+#
+# Thin INPUT_FILTER client of the vbfilter server ("vbfilter.py --serve").
+# It only forwards the file name to the server and copies the filtered
+# output to stdout, so doxygen does not pay for starting the filter itself.
+# When no server is running, the file is filtered in this process.
+#
+# usage: vbfilter_client.py [C] filename
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+import os              # paths and environment
+import stat            # owner of the socket
+import sys             # output and stuff
+
+from vbfilter_protocol import packRequest, socketPath
+
+# whether the socket at path is the user's own, in a directory which no
+# other user can write to ( so its server is not another user's )
+def trusted( path ):
+	try:
+		st = os.lstat( path )
+		dst = os.stat( os.path.dirname(os.path.abspath(path)) )
+	except OSError:
+		return False
+	uid = os.getuid()
+	return stat.S_ISSOCK( st.st_mode ) and uid == st.st_uid and uid == dst.st_uid and not dst.st_mode & 0o022
+
+# filters the file in this process
+def fallback( argv ):
+	sys.path.insert( 0, os.path.dirname(os.path.abspath(__file__)) )
+	import vbfilter_core
+	return vbfilter_core.main( argv )
+
+def main( argv ):
+
+	# stdin is read by this process
+	if len(argv) == 0 or 2 < len(argv) or "-" == argv[-1]: return fallback( argv )
+	controls = 2 == len(argv) and argv[0] in ("C", "-C")
+
+	path = socketPath()
+	if not trusted( path ): return fallback( argv )
+	import socket      # talking to the server ( not loaded when there is none )
+	sock = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+	try:
+		sock.connect( path )
+	except OSError:
+		sock.close()
+		return fallback( argv )
+
+	sock.sendall( packRequest( [
+		controls and b"1" or b"0",
+		(sys.stdout.encoding or "utf-8").encode(),
+		(sys.stdout.errors or "strict").encode(),
+		os.fsencode(os.path.abspath(argv[-1])) ] ) )
+
+	rfile = sock.makefile("rb")
+	out = sys.stdout.buffer
+	status = 1
+	while True:
+		head = rfile.readline()
+		if head[:1] == b"D":
+			out.write( rfile.read(int(head[1:])) )
+		elif head[:1] == b"E":
+			status, message = head[1:].rstrip(b"\n").split(b"\t", 1)
+			if message: sys.stderr.write( message.decode("utf-8", "replace") + "\n" )
+			status = int(status)
+			break
+		else:
+			sys.stderr.write( "vbfilter_client: connection to the server lost\n" )
+			break
+
+	out.flush()
+	sock.close()
+	return status
+
+if __name__ == "__main__":
+	sys.exit(main(sys.argv[1:]))
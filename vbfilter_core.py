@@ -0,0 +1,2195 @@
+# -*- coding: utf-8 -*-
+#
+# The filter itself, imported by vbfilter.py ( which is the script doxygen
+# runs, and its history ). It is a module so that its bytecode is cached:
+# a script is compiled every time it is run, a module only when it changed.
+# "import vbfilter" gives this module.
+#
+# Copyright (C) 2005  Basti Grembowietz
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+import codecs          # incremental encoders
+import collections     # ordered entries of TranslationCache
+import _thread         # lock of TranslationCache ( threading is not loaded by a filter run )
+import io              # in-memory files
+import itertools       # slicing line iterators
+import os.path         # getting extension from file
+import sys             # output and stuff
+import re              # for regular expressions
+
+# version of the filter (part of the key of cached outputs)
+__version__ = "2026.10.18"
+
+# VB source encoding (added by R.S.)
+src_encoding = "cp932"
+
+# default "level" (private / public / protected) to take when not specified
+def_level = "public:"
+
+# options of one filter run (replaces the optC / def_level / src_encoding globals)
+#  controls : puts the controls of a form (the "C" option)
+#  level    : accessibility used when a declaration has none
+#  encoding : VB source encoding
+#  verbose  : reports progress to stderr
+#  cache    : directory of the output cache (see OutputCache)
+#  split    : files of at least this many bytes are split and filtered by
+#             a process pool (see SplitFile), None never splits
+#  jobs     : processes of that pool ( None for one per cpu )
+#  control_properties : the names of the properties of the controls which
+#             are put, None puts the default set: Index, Caption, MaxLength,
+#             IMEMode, Value, TabIndex, TabStop, Enabled, Visible,
+#             WindowList, BorderStyle, KeyPreview, MaxButton, StartUpPosition
+#             ( the global control_properties )
+class FilterOptions(object):
+	__slots__ = ("controls", "level", "encoding", "verbose", "cache", "split", "jobs", "control_properties")
+	
+	def __init__(self, controls = False, level = def_level, encoding = src_encoding, verbose = False, cache = None, split = None, jobs = None, control_properties = None):
+		self.controls = controls
+		self.level = level
+		self.encoding = encoding
+		self.verbose = verbose
+		self.cache = cache
+		self.split = split
+		self.jobs = jobs
+		self.control_properties = control_properties
+	
+	def __repr__(self):
+		return "FilterOptions(%s)" % ", ".join( "%s=%r" % ( name, getattr(self, name) ) for name in self.__slots__ )
+	
+	# returns a copy with some options changed
+	def copy(self, **changes):
+		opts = FilterOptions()
+		for name in self.__slots__: setattr( opts, name, changes.get( name, getattr(self, name) ) )
+		return opts
+	
+	# the options which change the output
+	def key(self):
+		key = "%s\t%r\t%s\t%s" % ( __version__, bool(self.controls), self.level, self.encoding )
+		if self.control_properties is not None: key += "\t" + ",".join( sorted(self.control_properties) )
+		return key
+
+# pattern compiled when it is first used, which then takes the place of the
+# LazyPattern in the module, so a run compiles only the patterns it needs
+class LazyPattern(object):
+	
+	def __init__(self, *args):
+		self.args = args
+	
+	def compile(self):
+		pattern = re.compile( *self.args )
+		g = globals()
+		for name, value in g.items():
+			if value is self:
+				g[name] = pattern
+				break
+		return pattern
+	
+	def __getattr__(self, name):
+		return getattr( self.compile(), name )
+
+# regular expression
+## comments are stripped by scanComment ( not by a regex, which backtracks
+## badly on long or unbalanced string literals )
+## re to search for VB objects and attributes
+re_VB_Obj    = LazyPattern(r"\s*BEGIN\s*([\w.]*)\s+(\w*)", re.I)
+re_VB_Obj_St = LazyPattern(r"\s*BEGIN\s+([\w.]*)\s+(\w*)", re.I)
+re_VB_Obj_Ed = LazyPattern(r"^\s*End$")
+re_VB_Obj_Pr = LazyPattern(r"^\s*(\w*)\s*=\s*[^\s].*$")
+re_VB_Name    = LazyPattern(r"\s*Attribute\s+VB_Name\s+=\s+\"(\w+)\"", re.I)
+re_VB_Attrib  = LazyPattern(r"\s*Attribute", re.I)
+
+## re to blank line (added by R.S.)
+re_blank_line = LazyPattern(r"^\s*$")
+
+## doxygen comments ( '! '/** '' '< ) are told apart by Line
+## re to search doxygen-block-comments
+re_doxy_block_proc = LazyPattern(r"(.*)'(.*)")
+re_doxy_block_ed = LazyPattern(r"(.*)\*/(.*)")
+## re to search for global variables members (used in bas-files)
+re_globals    = LazyPattern(r"\s*Global\s+(Const\s+)?([^']+)", re.I)
+## re to search for class-members (used in cls-files) (modified by R.S.)
+re_members    = LazyPattern(r"\s*(Public\s+|Friend\s+|Private\s+|Static\s+){0,1}(?:(Const\s+)?(?:WithEvents\s+)?(?:Dim\s+)?([\w]+(?:\([\w\s\(\)\+\-\*/\.]*\))?)\s+As\s+([\w.]+)\s*(?:=\s*(\"(?:[^\"]|\"\")*\"|[^']+))?|(?:Const\s+([\w\(\)]+)\s+=\s*(\"(?:[^\"]|\"\")*\"|[^']+)))", re.I)
+re_event	  = LazyPattern(r"\s*(Public\s+|Friend\s+|Private\s+|Static\s+){0,1}Event\s+(\w+)\s*(\([\w\s=,\(\)\+\-\*/\.\"]*\))", re.I)
+re_array      = LazyPattern(r"([\w]+)\(([\w\s\(\)\+\-\*/\.]*)\)", re.I)
+re_const_string	= LazyPattern(r"\"(?:[^\"]|\"\")*\"")
+re_backslash	= LazyPattern(r"\\")
+re_doublequote	= LazyPattern(r"(?=.)\"\"(?=.)")
+## re to search Propertys
+re_property     = LazyPattern(r"\s*(Public\s+|Friend\s+|Private\s+|Static\s+){0,1}(Property\s+(?:Get|Let|Set))\s+(\w+)\s*(\([\w\s=,\(\)\+\-\*/\.\"]*\))(?:\s+As\s+(\w+))?", re.I)
+re_endProperty  = LazyPattern(r"End\s+(?:Property)", re.I)
+## re to search Subs (modified by R.S.)
+re_sub        = LazyPattern(r"\s*(Public\s+|Friend\s+|Private\s+|Static\s+){0,1}(Sub)\s+(\w+)\s*(\([\w\s=,\(\)\+\-\*/\.\"]*\))", re.I)
+re_endSub  	  = LazyPattern(r"End\s+(?:Sub)", re.I)
+## re to search Functions (modified by R.S.)
+re_function = LazyPattern(r"\s*(Public\s+|Friend\s+|Private\s+|Static\s+){0,1}(Function)\s+(\w+)\s*(\([\w\s=,#\(\)\+\-\*/\.\"]*\))(?:\s+As\s+(\w+))?", re.I)
+re_endFunction = LazyPattern(r"End\s+(?:Function)", re.I)
+## re to search args (added by R.S.)
+re_arg      = LazyPattern(r"\s*(Optional\s+)?((?:ByVal\s+|ByRef\s+)?(?:ParamArray\s+)?)(\w+)(\(\s*\))?(?:\s+As\s+(\w+))?(?:\s*=\s*(\"(?:[^\"]|\"\")*\"|[^,\)]+))?", re.I)
+## re to search for type-statements
+re_type     = LazyPattern(r"\s*(Public\s+|Friend\s+|Private\s+|Static\s+){0,1}Type\s+(\w+)", re.I)
+## re to search for type-statements
+re_endType  = LazyPattern(r"End\s+Type", re.I)
+## re to search for enum  (added by R.S.)
+re_enum		= LazyPattern(r"\s*(Public\s+|Friend\s+|Private\s+|Static\s+){0,1}Enum\s+(\w+)", re.I)
+re_endEnum  = LazyPattern(r"End\s+Enum", re.I)
+
+# a line split once into its code and its comment, shared by all the handlers
+#  text    : the whole line
+#  code    : the line without its comment (what strip_comments returns)
+#  comment : what follows the "'" starting the comment, or None
+#  kind    : "''", "'!", "'<", "'/**" or "'" for the other comments, None without comment
+#  quoted  : the line contains a string literal
+#  number  : the physical line it starts at, set by CodeFilter
+class Line(object):
+	__slots__ = ("text", "code", "comment", "kind", "quoted", "number")
+	
+	def __init__(self, s):
+		self.text = s
+		self.quoted = '"' in s
+		if not self.quoted:
+			# no string literal, the first "'" starts the comment
+			code, quote, comment = s.partition("'")
+		else:
+			# skip the string literals, "" being a quote inside of them
+			apos = scanComment( s )[0]
+			if apos == -1: quote = ""
+			else: code, quote, comment = s[:apos], "'", s[apos+1:]
+		
+		if not quote:
+			self.code = s
+			self.comment = None
+			self.kind = None
+			return
+		
+		if comment[-1:] == "\n": comment = comment[:-1]
+		self.code = code
+		self.comment = comment
+		if comment[:1] == "'": self.kind = "''"
+		elif comment[:1] == "!": self.kind = "'!"
+		elif comment[:1] == "<": self.kind = "'<"
+		elif comment[:3] == "/**": self.kind = "'/**"
+		else: self.kind = "'"
+	
+	# text of a doxygen comment ( '' '! '< '/** )
+	def doxy(self):
+		if self.kind == "'/**": return self.comment[3:]
+		return self.comment[1:]
+
+# scans s from pos ( inside a string literal if quoted ) for the "'" starting
+# its comment, in one pass: returns ( position of the "'" or -1,
+# whether s ends inside a string literal )
+def scanComment( s, pos = 0, quoted = False ):
+	
+	apos = s.find("'", pos)
+	while True:
+		if quoted:
+			# "" is a double quote inside the literal, " ends it
+			q = s.find('"', pos)
+			while q != -1 and s[q+1:q+2] == '"': q = s.find('"', q + 2)
+			if q == -1: return -1, True
+			pos = q + 1
+		
+		if apos != -1 and apos < pos: apos = s.find("'", pos)
+		q = s.find('"', pos)
+		if q == -1 or (apos != -1 and apos < q): return apos, False
+		pos = q + 1
+		quoted = True
+
+# returns where the line continued by " _" is cut ( the "_" and what follows
+# it ), or -1 if ln is not continued. blanks may follow the "_".
+def continuedAt( ln ):
+	
+	if ln[-3:] == " _\n": return len(ln) - 2
+	if ln[-1:] != "\n" or not ln[-2:-1].isspace(): return -1
+	
+	code = ln.rstrip()
+	if code[-2:] != " _": return -1
+	return len(code) - 1
+
+# strips vb-style comments from string
+def strip_comments(str):
+	return Line(str).code
+
+# the text of the back comment ( '< ) of line, or None
+def backComment( line ):
+	if line.kind != "'<": return None
+	return line.doxy()
+
+# dumps the given file
+def dump( inFR, outFile ):
+	for s in inFR:
+		outFile.write("." + s)
+
+## intermediate representation ##
+#################################
+#
+# ModuleHeader, CodeFilter and the found* / process* handlers parse a module
+# into the records below and hand them to a target, in the order of the
+# source:
+#  begin( record ) : a Procedure, Type or Enum, whose lines follow
+#  add( record )   : a Member, Event or DocComment
+#  end( cls )      : the End of the Procedure, Type or Enum begun last
+# CppEmitter writes them out as the doxygen input, at once, ModuleBuilder
+# builds a Module of them. the fields keep the words of the source as they
+# are ( "Private " with its blanks, a value with its quotes ), the emitters
+# format them, so one Module gives the output of any options but encoding
+# and controls. the declarations keep the line they start at ( line ).
+
+# base of the records: equality and repr by their fields
+class Record(object):
+	__slots__ = ()
+	
+	def fields(self):
+		return tuple( getattr( self, name ) for name in self.__slots__ )
+	
+	def __eq__(self, other):
+		return self.__class__ is other.__class__ and self.fields() == other.fields()
+	
+	def __ne__(self, other):
+		return not self == other
+	
+	__hash__ = None
+	
+	def __repr__(self):
+		return "%s(%s)" % ( self.__class__.__name__, ", ".join( "%s=%r" % ( name, getattr(self, name) ) for name in self.__slots__ ) )
+
+# a Procedure, Type or Enum: the records between its begin and its end
+#  items  : the records inside of it
+#  closed : its End was read
+class Block(Record):
+	__slots__ = ()
+
+# a doxygen comment, or a blank line, which separates the comment blocks
+#  kind : "''" or "'!" ( /// text ), "'/**" ( /** text ), "*" ( a line of a
+#         block comment ), "*/" ( the end of the global block ) or "" ( a
+#         blank line )
+class DocComment(Record):
+	__slots__ = ("kind", "text")
+	
+	def __init__(self, kind, text = ""):
+		self.kind = kind
+		self.text = text
+
+blank_line = DocComment( "" )
+
+# an argument of a Procedure or an Event
+#  optional : "Optional " as written, or None
+#  passing  : "ByVal ", "ByRef ", "ParamArray " as written, or ""
+#  array    : "()" follows the name
+#  type     : the type after As, or None
+#  default  : the value after =, or None
+class Arg(Record):
+	__slots__ = ("optional", "passing", "name", "array", "type", "default")
+	
+	def __init__(self, optional, passing, name, array, type, default):
+		self.optional = optional
+		self.passing = passing
+		self.name = name
+		self.array = array
+		self.type = type
+		self.default = default
+
+# the same object for each of the few keywords and types repeated in the IR
+intern = sys.intern
+
+def words( s ):
+	if s is None: return None
+	return intern( s )
+
+# bounded cache of translations, the least recently used entry is dropped
+# when it is full. one is shared by all the files filtered in a process
+# ( a batch worker, a request of the server ), so the declarations
+# repeated over a project ( Form_Load, cmdOK_Click(), Declares... ) are
+# translated once. the keys are the text the translation depends on: the
+# argument lists as written ( the output keeps their spacing ) and the
+# member lines without their indent ( the case and the spacing after it
+# are kept in the output too ), so only those exact repeats are cached.
+# the entries do not depend on the options.
+class TranslationCache(object):
+	
+	def __init__(self, size = 4096):
+		self.size = size
+		self.entries = collections.OrderedDict()
+		self.lock = _thread.allocate_lock()
+		self.hits = 0
+		self.misses = 0
+	
+	# the value cached under key, or None
+	def get(self, key):
+		with self.lock:
+			value = self.entries.get( key )
+			if value is None:
+				self.misses += 1
+				return None
+			self.hits += 1
+			self.entries.move_to_end( key )
+			return value
+	
+	def put(self, key, value):
+		with self.lock:
+			entries = self.entries
+			entries[key] = value
+			if self.size < len(entries): entries.popitem( last = False )
+	
+	def clear(self):
+		with self.lock:
+			self.entries.clear()
+			self.hits = self.misses = 0
+	
+	# ( hits, misses )
+	def counts(self):
+		with self.lock:
+			return self.hits, self.misses
+
+translations = TranslationCache()
+
+# the arguments ( Arg ) of the argument list s, and the text around them
+# ( one more than the arguments: "(", ", ", ... ")" ). the tuples are
+# shared by the declarations with the same list, they are not changed
+def parseArgs( s ):
+	key = ( "args", s )
+	parsed = translations.get( key )
+	if parsed is not None: return parsed
+	
+	args = []
+	glue = []
+	pos = 0
+	for arg in re_arg.finditer( s ):
+		glue.append( intern( s[pos:arg.start()] ) )
+		args.append( Arg( arg.group(1), words(arg.group(2)), arg.group(3), arg.group(4) is not None, words(arg.group(5)), arg.group(6) ) )
+		pos = arg.end()
+	glue.append( intern( s[pos:] ) )
+	parsed = tuple(args), tuple(glue)
+	translations.put( key, parsed )
+	return parsed
+
+# a Function, Sub or Property
+#  kind   : "Function", "Sub" or "Property Get|Let|Set" as written
+#  access : "Public ", "Private "... as written, or None
+#  args   : its Args, glue the text around them ( see parseArgs )
+#  type   : the type after As, or None
+class Procedure(Block):
+	__slots__ = ("kind", "access", "name", "args", "glue", "type", "line", "items", "closed")
+	
+	def __init__(self, kind, access, name, args, glue, type, line = None):
+		self.kind = kind
+		self.access = access
+		self.name = name
+		self.args = args
+		self.glue = glue
+		self.type = type
+		self.line = line
+		self.items = []
+		self.closed = False
+
+# a variable or a constant of the module, a field of a Type or an item of
+# an Enum
+#  kind   : "member", "field" or "item" ( its name is the whole item )
+#  const  : declared Const
+#  bounds : the bounds of an array, or None
+#  type   : the type after As, or None ( a Const without As )
+#  value  : the value after =, or None
+#  doc    : the text of its back comment ( '< ), or None
+class Member(Record):
+	__slots__ = ("kind", "access", "const", "name", "bounds", "type", "value", "doc", "line")
+	
+	def __init__(self, kind, access, const, name, bounds = None, type = None, value = None, doc = None, line = None):
+		self.kind = kind
+		self.access = access
+		self.const = const
+		self.name = name
+		self.bounds = bounds
+		self.type = type
+		self.value = value
+		self.doc = doc
+		self.line = line
+
+# the Member of a match of re_members
+def parseMember( kind, member, line ):
+	if member.group(6) is not None:
+		# typeless const declaretion
+		return Member( kind, words(member.group(1)), True, member.group(6), None, None, member.group(7), backComment(line), line.number )
+	
+	name = member.group(3)
+	bounds = None
+	array = re_array.match( name )
+	if array is not None: name, bounds = array.group(1), array.group(2)
+	return Member( kind, words(member.group(1)), member.group(2) is not None, name, bounds, words(member.group(4)), member.group(5), backComment(line), line.number )
+
+class Type(Block):
+	__slots__ = ("access", "name", "line", "items", "closed")
+	
+	def __init__(self, access, name, line = None):
+		self.access = access
+		self.name = name
+		self.line = line
+		self.items = []
+		self.closed = False
+
+class Enum(Block):
+	__slots__ = ("access", "name", "line", "items", "closed")
+	
+	def __init__(self, access, name, line = None):
+		self.access = access
+		self.name = name
+		self.line = line
+		self.items = []
+		self.closed = False
+
+class Event(Record):
+	__slots__ = ("access", "name", "args", "glue", "doc", "line")
+	
+	def __init__(self, access, name, args, glue, doc, line = None):
+		self.access = access
+		self.name = name
+		self.args = args
+		self.glue = glue
+		self.doc = doc
+		self.line = line
+
+# a control of a form, or all the controls of a control array
+#  kind       : "VB.CommandButton"...
+#  properties : the lines of its properties which are put, as written ( of
+#               the first control of an array )
+#  indexes    : the Index of each control of an array, None for a control
+#  container  : the name of the control it is in, None for the form
+class Control(Record):
+	__slots__ = ("kind", "name", "properties", "indexes", "container")
+	
+	def __init__(self, kind, name, properties, indexes = None, container = None):
+		self.kind = kind
+		self.name = name
+		self.properties = properties
+		self.indexes = indexes
+		self.container = container
+
+# a module
+#  kind     : "bas", "cls" or "frm"
+#  name     : the VB_Name, or None
+#  base     : None for a module, "" or the base of the class from BEGIN
+#  comments : the global comments ( DocComment )
+#  controls : the Controls of a form, None without the "C" option
+#  items    : its declarations and comments
+class Module(Record):
+	__slots__ = ("kind", "name", "base", "comments", "controls", "items")
+	
+	def __init__(self, kind, name, base, comments, controls, items):
+		self.kind = kind
+		self.name = name
+		self.base = base
+		self.comments = comments
+		self.controls = controls
+		self.items = items
+
+# target building a Module
+class ModuleBuilder(object):
+	
+	def __init__(self):
+		self.kind = None
+		self.header = None
+		self.items = []
+		self.stack = []
+	
+	def begin(self, record):
+		self.items.append( record )
+		self.stack.append( self.items )
+		self.items = record.items
+	
+	def add(self, record):
+		self.items.append( record )
+	
+	def end(self, cls):
+		self.items = self.stack.pop()
+		self.items[-1].closed = True
+	
+	# ModuleFilter: the whole module is kept, nothing is held back
+	def start(self, kind):
+		self.kind = kind
+	
+	def hold(self):
+		return self
+	
+	def drop(self, held):
+		self.items = []
+		self.stack = []
+	
+	def writeHeader(self, header, held):
+		self.header = header
+		return self
+	
+	def finish(self, kind):
+		pass
+	
+	def release(self, held):
+		pass
+	
+	def module(self):
+		header = self.header
+		items = self.stack and self.stack[0] or self.items
+		return Module( self.kind, header.name, header.base, header.comments, header.controls, items )
+
+# the C++ declaration of the value of a member or of an argument
+def cppValue( value ):
+	if re_const_string.match( value ) is None: return value
+	return re_doublequote.sub( r"\\\"", re_backslash.sub( r"\\\\", value ) )
+
+def cppBack( doc ):
+	if doc is None: return ""
+	return "///<" + doc
+
+# the argument list of glue and args
+def cppArgs( args, glue ):
+	s = glue[0]
+	for arg, after in zip( args, glue[1:] ): s += rearrangeArg( arg ) + after
+	return s
+
+def cppDocComment( c, opts ):
+	if "''" == c.kind or "'!" == c.kind: return "/// " + c.text + "\n"
+	if "'/**" == c.kind: return "/** " + c.text + "\n"
+	if "*/" == c.kind: return "*/"
+	return c.text + "\n"
+
+def cppMember( m, opts ):
+	
+	back = m.doc is not None and "///<" + m.doc or ""
+	if "item" == m.kind: return m.name + ", " + back + "\n"
+	
+	initval_str = ""
+	if m.value is not None: initval_str = " = " + cppValue( m.value )
+	if m.type is None:
+		res_str = "const " + m.name + initval_str + ";"
+	else:
+		valname_str = m.name
+		if m.bounds is not None: valname_str = m.name + "[" + m.bounds + "]"
+		res_str = ( m.const and "const " or "" ) + " " + m.type + " " + valname_str + initval_str + ";"
+	
+	if "field" == m.kind: return res_str + back + "\n"
+	return getAccessibility( m.access, opts ) + " " + res_str + "\t" + back + "\n"
+
+def cppEvent( e, opts ):
+	return getAccessibility( e.access, opts ) + " Event " + e.name + cppArgs( e.args, e.glue ) + ";" + cppBack( e.doc ) + "\n"
+
+def cppProcedure( p, opts ):
+	if "Function" == p.kind:
+		return getAccessibility( p.access, opts ) + " " + ( p.type or "Variant" ) + " " + p.name + cppArgs( p.args, p.glue ) + "{\n"
+	if "Sub" == p.kind:
+		return getAccessibility( p.access, opts ) + " Sub " + p.name + cppArgs( p.args, p.glue ) + "{\n"
+	type_str = ""
+	if "Property Get" == p.kind: type_str = p.type or "Variant"
+	return getAccessibility( p.access, opts ) + " " + p.kind + " " + type_str + " " + p.name + cppArgs( p.args, p.glue ) + "{\n"
+
+def cppType( t, opts ):
+	return getAccessibility( t.access, opts ) + " struct " + t.name + " {\n"
+
+def cppEnum( e, opts ):
+	return getAccessibility( e.access, opts ) + " enum " + e.name + " {\n"
+
+# a control array is one member, of the size of the last Index + 1, with
+# the Indexes as its Index property
+def cppControl( control ):
+	properties = control.properties
+	name = control.name
+	if control.indexes is not None:
+		properties = [ indexLine( pr, control.indexes ) for pr in properties ]
+		name += "[%d]" % ( max(control.indexes) + 1 )
+	
+	s = ""
+	if 0 != len(properties):
+		s = "/**\n@details\t" + "".join( "-" + pr for pr in properties ) + "**/\n"
+	return s + "public:" + control.kind + "\t" + name + ";\n"
+
+# the line pr with the indexes of an array for value, if it is the Index
+def indexLine( pr, indexes ):
+	if "Index" != re_VB_Obj_Pr.match(pr).group(1): return pr
+	indexes = sorted( set(indexes) )
+	if indexes == list( range( indexes[0], indexes[-1] + 1 ) ) and 1 < len(indexes):
+		value = "%d To %d" % ( indexes[0], indexes[-1] )
+	else:
+		value = ", ".join( str(i) for i in indexes )
+	head, eq, tail = pr.partition("=")
+	return head + eq + tail[: len(tail) - len(tail.lstrip())] + value + "\n"
+
+# the C++ text of each kind of record
+cpp_text = { DocComment: cppDocComment, Member: cppMember, Event: cppEvent, Procedure: cppProcedure, Type: cppType, Enum: cppEnum }
+
+# target writing the records to outFile as C++ for doxygen
+class CppEmitter(object):
+	
+	def __init__(self, outFile, opts):
+		self.outFile = outFile
+		self.opts = opts
+	
+	def add(self, record):
+		self.outFile.write( cpp_text[record.__class__]( record, self.opts ) )
+	
+	begin = add
+	
+	def end(self, cls):
+		if cls is Procedure: self.outFile.write("}\n")
+		else: self.outFile.write("}; \n")
+	
+	# ModuleFilter: the code is held back until the header is written
+	def start(self, kind):
+		self.outFile.write("\n// -- processed by [" + module_names[kind] + "] --\n") 
+	
+	def hold(self):
+		return CppEmitter( HeldOutput(), self.opts )
+	
+	def drop(self, held):
+		held.outFile.clear()
+	
+	# writes the header ( a Module ) and what is held, returns the target of the code
+	def writeHeader(self, header, held):
+		outFile = self.outFile
+		outFile.write( "".join( cppDocComment( c, self.opts ) for c in header.comments ) )
+		
+		if self.opts.verbose:
+			sys.stderr.write("Searching for classname... " + (header.name is not None and "found!" or "") + " using " + (header.name or "dummy") + "\n")
+		
+		# ok, so let's start writing the pseudo-class
+		className = header.name or "dummy"
+		if header.base is None:
+			outFile.write("\nnamespace " + className + "\n{\n") 
+		elif header.base == "":
+			outFile.write("\nclass " + className + "\n{\n") 
+		else:
+			outFile.write("\nclass " + className + " : " + header.base + "\n{\n") 
+		
+		if header.controls is not None:
+			outFile.write( "///@name Form Controls\n///@{\n" )
+			for control in header.controls: outFile.write( cppControl( control ) )
+			outFile.write( "///@}\n" )
+		
+		if held is not None: held.outFile.copyTo( outFile )
+		return self
+	
+	def finish(self, kind):
+		self.outFile.write("}")
+		self.outFile.write("\n// -- [/" + module_names[kind] + "] --\n") 
+	
+	def release(self, held):
+		held.outFile.close()
+
+# hands a whole Module to the target out ( as ModuleFilter does )
+def emitModule( module, out ):
+	out.start( module.kind )
+	emitItems( module.items, out.writeHeader( module, None ) )
+	out.finish( module.kind )
+
+def emitItems( items, target ):
+	for record in items:
+		if isinstance( record, Block ):
+			target.begin( record )
+			emitItems( record.items, target )
+			if record.closed: target.end( record.__class__ )
+		else:
+			target.add( record )
+
+# target handing the records to each of targets
+class Targets(object):
+	
+	def __init__(self, targets):
+		self.targets = targets
+	
+	def begin(self, record):
+		for target in self.targets: target.begin( record )
+	
+	def add(self, record):
+		for target in self.targets: target.add( record )
+	
+	def end(self, cls):
+		for target in self.targets: target.end( cls )
+	
+	def start(self, kind):
+		for target in self.targets: target.start( kind )
+	
+	def hold(self):
+		return Targets( tuple( target.hold() for target in self.targets ) )
+	
+	def drop(self, held):
+		for target, h in zip( self.targets, held.targets ): target.drop( h )
+	
+	def writeHeader(self, header, held):
+		helds = held is None and ( None, ) * len(self.targets) or held.targets
+		return Targets( tuple( target.writeHeader( header, h ) for target, h in zip( self.targets, helds ) ) )
+	
+	def finish(self, kind):
+		for target in self.targets: target.finish( kind )
+	
+	def release(self, held):
+		for target, h in zip( self.targets, held.targets ): target.release( h )
+
+## symbols ##
+###############
+#
+# besides the C++ output, the declarations of the modules filtered can be
+# written for other tools, by sinks given to filter_file: JsonSymbols ( one
+# JSON object per line ) and CtagsSymbols ( a tags file ). each module is
+# handed to target( path ) of every sink in the same pass as its C++, so the
+# source is read and parsed once for all of them.
+
+## re to read the name and the value of an Enum item
+re_enum_item = LazyPattern(r"\s*(\w+|\[[^\]\n]*\])(?:\s*=\s*(.*\S))?")
+
+# the words of s, one blank between them
+def oneLine( s ):
+	return " ".join( s.split() )
+
+# the VB text of an argument list
+def vbArgs( args ):
+	return "(" + ", ".join( vbArg( arg ) for arg in args ) + ")"
+
+def vbArg( arg ):
+	s = oneLine( ( arg.optional or "" ) + arg.passing + arg.name )
+	if arg.array: s += "()"
+	if arg.type is not None: s += " As " + arg.type
+	if arg.default is not None: s += " = " + arg.default.strip()
+	return s
+
+# ( name, kind, access, signature, argument list or None ) of a declaration,
+# or None if it declares nothing ( a blank line in an Enum )
+def symbolOf( record ):
+	access = record.access and record.access.strip().lower() or None
+	cls = record.__class__
+	if cls is Member:
+		if "item" == record.kind:
+			item = re_enum_item.match( record.name )
+			if item is None: return None
+			name = item.group(1)
+			if item.group(2) is None: return name, "enumerator", None, name, None
+			return name, "enumerator", None, name + " = " + item.group(2), None
+		kind = record.kind == "field" and "field" or record.const and "const" or "variable"
+		s = record.const and "Const " + record.name or record.name
+		if record.bounds is not None: s += "(" + oneLine( record.bounds ) + ")"
+		if record.type is not None: s += " As " + record.type
+		if record.value is not None: s += " = " + record.value.strip()
+		return record.name, kind, access, s, None
+	if cls is Procedure:
+		kind = oneLine( record.kind )
+		args = vbArgs( record.args )
+		s = kind + " " + record.name + args
+		if record.type is not None: s += " As " + record.type
+		return record.name, kind.lower(), access, s, args
+	if cls is Event:
+		args = vbArgs( record.args )
+		return record.name, "event", access, "Event " + record.name + args, args
+	if cls is Type: return record.name, "type", access, "Type " + record.name, None
+	return record.name, "enum", access, "Enum " + record.name, None
+
+# the text of a doc comment line, without the "*/" ending a block
+def docText( c ):
+	text = c.text.strip()
+	if "*/" == text[-2:]: text = text[:-2].rstrip()
+	return text
+
+# target of a sink for one module: collects its symbols, ( name, kind,
+# access, signature, argument list, Type or Enum it is in, line, doc,
+# record ), and hands them to the sink ( if any ) when the module is complete
+class SymbolTarget(object):
+	
+	def __init__(self, sink, path):
+		self.sink = sink
+		self.path = path
+		self.kind = None
+		self.name = None	# the VB_Name
+		self.drop( None )
+	
+	def begin(self, record):
+		self.add( record )
+		self.blocks.append( record )
+	
+	def add(self, record):
+		if record.__class__ is DocComment:
+			# the comments before a declaration are its doc, as for doxygen
+			if "" == record.kind: self.doc = []
+			elif "*/" != record.kind: self.doc.append( docText( record ) )
+			return
+		
+		symbol = symbolOf( record )
+		if symbol is not None:
+			doc = self.doc
+			back = getattr( record, "doc", None )
+			if back is not None: doc = doc + [ back.strip() ]
+			block = self.blocks and self.blocks[-1] or None
+			self.symbols.append( symbol + ( block, record.line, "\n".join( doc ).strip() or None, record ) )
+		self.doc = []
+	
+	def end(self, cls):
+		if self.blocks: self.blocks.pop()
+		self.doc = []
+	
+	# the name of the scope of the symbols in block ( None: the module )
+	def scope(self, block):
+		if block is None: return self.name
+		if self.name is None: return block.name
+		return self.name + "." + block.name
+	
+	# ModuleFilter: nothing is written before the module is complete
+	def start(self, kind):
+		self.kind = kind
+	
+	def hold(self):
+		return self
+	
+	def drop(self, held):
+		self.symbols = []
+		self.blocks = []
+		self.doc = []
+	
+	def writeHeader(self, header, held):
+		self.name = header.name
+		return self
+	
+	def finish(self, kind):
+		if self.sink is not None: self.sink.write( self )
+	
+	def release(self, held):
+		pass
+
+# writes the symbols as JSON lines: name, kind, access, signature, scope,
+# module, file, line and doc ( null when there is none )
+class JsonSymbols(object):
+	
+	def __init__(self, outFile):
+		self.outFile = outFile
+	
+	def target(self, path):
+		return SymbolTarget( self, path )
+	
+	def write(self, module):
+		import json
+		encode = json.JSONEncoder( ensure_ascii = False ).encode
+		for name, kind, access, signature, args, block, line, doc, record in module.symbols:
+			self.outFile.write( encode( { "name": name, "kind": kind, "access": access, "signature": signature, "scope": module.scope(block), "module": module.name, "file": module.path, "line": line, "doc": doc } ) + "\n" )
+	
+	# what the sink of a batch process wrote, for merge
+	def collect(self):
+		return self.outFile.getvalue()
+	
+	def merge(self, data):
+		self.outFile.write( data )
+	
+	def close(self):
+		pass
+
+# the ctags kind of each kind of symbol
+ctags_kinds = { "function": "f", "sub": "s", "property get": "p", "property let": "p", "property set": "p", "event": "E", "type": "t", "enum": "g", "variable": "v", "const": "c", "field": "m", "enumerator": "e" }
+
+# writes the symbols as a tags file of ctags ( sorted, with line numbers
+# as addresses ), when it is closed
+class CtagsSymbols(object):
+	
+	def __init__(self, outFile):
+		self.outFile = outFile
+		self.tags = []
+	
+	def target(self, path):
+		return SymbolTarget( self, path )
+	
+	def write(self, module):
+		for name, kind, access, signature, args, block, line, doc, record in module.symbols:
+			tag = name + "\t" + module.path + "\t%d;\"\t" % line + ctags_kinds[kind] + "\tline:%d" % line
+			scope = module.scope( block )
+			if scope is not None:
+				if block is None: tag += "\t" + ( "bas" == module.kind and "namespace:" or "class:" ) + scope
+				else: tag += "\t" + ( block.__class__ is Type and "struct:" or "enum:" ) + scope
+			if access is not None: tag += "\taccess:" + access
+			if args is not None: tag += "\tsignature:" + args
+			self.tags.append( tag )
+	
+	def collect(self):
+		return self.tags
+	
+	def merge(self, data):
+		self.tags.extend( data )
+	
+	def close(self):
+		self.outFile.write( "!_TAG_FILE_FORMAT\t2\t/extended format/\n" )
+		self.outFile.write( "!_TAG_FILE_SORTED\t1\t/0=unsorted, 1=sorted, 2=foldcase/\n" )
+		self.outFile.write( "!_TAG_PROGRAM_NAME\tvbfilter\t//\n" )
+		self.outFile.write( "!_TAG_PROGRAM_VERSION\t" + __version__ + "\t//\n" )
+		for tag in sorted( self.tags ): self.outFile.write( tag + "\n" )
+		self.tags = []
+
+# header of a module, read in the same pass as its code:
+#  the global comments of the whole file ( '! and the first '/** block ),
+#  the class base from BEGIN, the class name from VB_Name
+#  and, with the "C" option, the controls of a form
+class ModuleHeader(object):
+	
+	def __init__(self, opts, controls = False):
+		self.opts = opts
+		# global comments
+		self.comments = []
+		self.in_block = False
+		self.comments_done = False
+		# class name
+		self.classBase = None
+		self.className = "dummy"
+		self.name_done = False
+		# form controls
+		self.controls = None
+		if controls: self.controls = ControlTree( opts.control_properties )
+	
+	def done(self):
+		return self.comments_done and self.name_done
+	
+	# reads the next line ( line is Line(s), or None when s has no "'" ),
+	# returns True if it ends the global block comment
+	def feed(self, s, line):
+		if not self.name_done:
+			if self.controls is not None: self.controls.feed(s)
+			self.classScan(s)
+		if not self.comments_done:
+			return self.globalComment(s, line)
+		return False
+	
+	def globalComment(self, s, line):
+		# we have to look for global comments first!
+		# they start with '!
+		if not self.in_block:
+			if line is None: return False
+			if line.kind == "'!":
+				# found global comment, write this comment to file
+				self.comments.append( DocComment( "'!", line.doxy() ) )
+			
+			elif line.kind == "'/**":
+				self.in_block = True
+				# found block comment, write this comment to file
+				self.comments.append( DocComment( "'/**", line.doxy() ) )
+			return False
+		
+		gcom = re_doxy_block_proc.match(s)
+		if gcom is not None:
+			s = gcom.group(1) + gcom.group(2)
+			if re_doxy_block_ed.match(s + "\n") is None:
+				self.comments.append( DocComment( "*", s ) )
+				return False
+		
+		self.comments.append( DocComment( "*/" ) )
+		self.comments_done = True
+		return True
+	
+	def classScan(self, s):
+		if self.classBase is None:
+			cname = re_VB_Obj.match(s)
+			if cname is not None:
+				self.classBase = ""
+				if cname.group(1) is not None:
+					self.classBase = cname.group(1)
+		
+		# now search for a class name
+		cname = re_VB_Name.match(s)
+		if cname is not None:
+			# ok, className is found, so save it...
+			self.className = cname.group(1)
+			# ...and leave searching
+			self.name_done = True
+	
+	# the global comments, the name and base of the class and the form
+	# controls, as a Module without kind and items
+	def module(self):
+		name = None
+		if self.name_done: name = self.className
+		controls = None
+		if self.controls is not None: controls = tuple(self.controls.controls)
+		return Module( None, name, self.classBase, tuple(self.comments), controls, None )
+
+# the properties of the controls put by default
+control_properties = frozenset(( "Index", "Caption", "MaxLength", "IMEMode", "Value", "TabIndex", "TabStop", "Enabled", "Visible", "WindowList", "BorderStyle", "KeyPreview", "MaxButton", "StartUpPosition" ))
+
+# a Begin of the designer whose End was not read yet
+#  properties : the lines of its properties which are put
+#  index      : its Index, None if it is not in a control array
+#  arrays     : the control arrays in it, by name ( the Control of the
+#               first of them, which the others are added to )
+class ControlFrame(object):
+	__slots__ = ("kind", "name", "properties", "index", "arrays")
+	
+	def __init__(self, kind, name):
+		self.kind = kind
+		self.name = name
+		self.properties = []
+		self.index = None
+		self.arrays = None
+
+# reads the controls of the designer of a form ( its Begin / End lines ),
+# in one pass: a Control is put at the End of each control, the controls of
+# an array into the Control of the first of them. only the controls which
+# are not ended are kept, with the arrays in them.
+class ControlTree(object):
+	
+	def __init__(self, properties = None):
+		if properties is None: properties = control_properties
+		self.whitelist = properties
+		self.controls = []
+		self.frames = []
+		self.nested = 0		# depth of BeginProperty
+	
+	def feed(self, s):
+		vb_ctrl = re_VB_Obj_Pr.match(s)
+		if vb_ctrl is not None:
+			if not self.frames: return
+			name = vb_ctrl.group(1)
+			if name in self.whitelist: self.frames[-1].properties.append(s)
+			if "Index" == name and 0 == self.nested:
+				try:
+					self.frames[-1].index = int( s.partition("=")[2] )
+				except ValueError:
+					pass
+			return
+		
+		if re_VB_Obj_Ed.match(s) is not None:
+			if self.frames: self.end( self.frames.pop() )
+			return
+		
+		vb_ctrl = re_VB_Obj_St.match(s)
+		if vb_ctrl is not None:
+			self.frames.append( ControlFrame( vb_ctrl.group(1), vb_ctrl.group(2) ) )
+			return
+		
+		# the properties of a BeginProperty are not those of the control
+		word = s.lstrip()[:13].lower()
+		if "beginproperty" == word: self.nested += 1
+		elif "endproperty" == word[:11] and 0 < self.nested: self.nested -= 1
+	
+	def end(self, frame):
+		container = self.frames and self.frames[-1] or None
+		if frame.index is not None and container is not None:
+			if container.arrays is None: container.arrays = {}
+			array = container.arrays.get( frame.name )
+			if array is not None and array.kind == frame.kind:
+				array.indexes.append( frame.index )
+				return
+			control = Control( frame.kind, frame.name, tuple(frame.properties), [ frame.index ], container.name )
+			container.arrays[frame.name] = control
+		else:
+			control = Control( frame.kind, frame.name, tuple(frame.properties), None, container and container.name )
+		self.controls.append( control )
+
+# pass blank lines to keep comment block separation
+# added by R.S.
+def checkBlankLine( target, line ):
+	
+	if re_blank_line.match(line.text) is None: return False
+		
+	target.add( blank_line )
+	return True
+
+def checkDoxyComment( target, line ):
+	
+	if line.kind != "''": return False
+	
+	target.add( DocComment( "''", line.doxy() ) )
+	
+	return True
+
+
+# the match of re_members of the code of a member line, or None. the code
+# without its indent, which re_members skips, is the key ( the other keys
+# are tuples )
+def matchMember( code ):
+	code = code.lstrip()
+	member = translations.get( code )
+	if member is None:
+		member = re_members.match( code )
+		if member is not None: translations.put( code, member )
+	return member
+
+# modified by R.S. for const, dim, array, initial value, and so on.
+def foundMember( target, line, opts ):
+	
+	member = matchMember( line.code )
+	if member is None: return False
+	
+	target.add( parseMember( "member", member, line ) )
+	
+	return True
+
+# added by R.S.
+# modify arglist: the C++ of an Arg
+def rearrangeArg(arg):
+	
+	# get type
+	type_str = "Variant"
+	if (arg.type is not None):
+		type_str = arg.type
+	# get arg name
+	if arg.array:
+		argname_str = arg.name + "[]"
+	else:
+		argname_str = arg.name
+	# get default value
+	dfltval_str = ""
+	if ((arg.optional is not None) and (arg.default is not None)):
+		dfltval_str = " = " + cppValue( arg.default )
+	return (arg.optional or "") + " " + arg.passing + " " + type_str + " " + argname_str + " " + dfltval_str
+
+def foundEvent( target, line, opts ):
+	
+	s_event = re_event.match( line.code )
+	if s_event is None: return False
+	
+	args, glue = parseArgs( s_event.group(3) )
+	target.add( Event( s_event.group(1), s_event.group(2), args, glue, backComment(line), line.number ) )
+	
+	return True
+
+# modified by R.S. for variant type, and for scan inside function
+def foundFunction( target, line, opts ):
+	
+	s_func = re_function.match( line.code )	 # s_func == start_of_a_function
+	if s_func is None: return False
+	
+	# modified by R.S. to rearrange arglist
+	args, glue = parseArgs( s_func.group(4) )
+	target.begin( Procedure( "Function", s_func.group(1), s_func.group(3), args, glue, s_func.group(5), line.number ) )
+	
+	return True
+	
+# added by R.S.	for scan inside function (now, only skip inside)
+def processFunction( target, line ):
+	
+	vbEndFunction = re_endFunction.match( line.code )
+	if vbEndFunction is None: return True
+	
+	target.end( Procedure ) #write end of function
+	
+	return False
+
+#  modified by R.S. for check inside sub
+def foundSub( target, line, opts ):
+	
+	s_sub = re_sub.match(line.code)
+	if (s_sub is None): return False
+	
+	# modified by R.S. to rearrange arglist
+	args, glue = parseArgs( s_sub.group(4) )
+	target.begin( Procedure( "Sub", s_sub.group(1), s_sub.group(3), args, glue, None, line.number ) )
+	
+	return True
+
+# added by R.S.	for scan inside sub (now, only skip inside)
+def processSub( target, line ):
+	
+	vbEndSub = re_endSub.match( line.code )
+	if (vbEndSub is not None): # found End Sub
+		target.end( Procedure ) #write end of function
+		return False
+		
+	else:
+		# inside Sub
+		return True
+
+def foundProperty( target, line, opts ):
+	
+	s_pro = re_property.match(line.code)
+	if s_pro is None: return False
+	
+	args, glue = parseArgs( s_pro.group(4) )
+	target.begin( Procedure( s_pro.group(2), s_pro.group(1), s_pro.group(3), args, glue, s_pro.group(5), line.number ) )
+	
+	return True
+
+def processProperty( target, line ):
+	
+	vbEndProperty = re_endProperty.match( line.code )
+	if (vbEndProperty is not None):
+		target.end( Procedure )
+		return False
+		
+	else:
+		return True
+
+def foundBlockComment( target, line ):
+	
+	if line.kind != "'/**": return False
+
+	# found block comment, write this comment to file
+	target.add( DocComment( "'/**", line.doxy() ) )
+		
+	return True
+
+def processBlockComment( target, line ):
+	
+	res = re_doxy_block_proc.match(line.text)
+	if res is None: return False
+		
+	target.add( DocComment( "*", res.group(1) + res.group(2) ) )
+	
+	res = re_doxy_block_ed.match(line.text)
+	if res is not None: return False
+	
+	return True
+
+# the C++ of the access keywords as written ( "Public ", "PRIVATE  "... ),
+# filled as they are met
+accessibilities = {}
+
+def getAccessibility(s, opts):
+	if s is None: return opts.level
+	try:
+		accessibility = accessibilities[s]
+	except KeyError:
+		accessibility = accessibilities[s] = { "private": "private:", "public": "public:", "friend": "friend ", "static": "static" }.get( s.strip().lower() )
+	return accessibility or opts.level
+
+# modified by R.S. for const, dim, array, initial value, and so on.
+def foundMemberOfType( target, line ):
+	
+	member = matchMember( line.code )
+	if member is None: return
+	
+	target.add( parseMember( "field", member, line ) )
+
+def foundType( target, line, opts ):
+	
+	vbType = re_type.match( line.code )
+	if vbType is None: return False
+	
+	target.begin( Type( vbType.group(1), vbType.group(2), line.number ) )
+	return True
+
+def processType( target, line ):
+	
+	vbEndType = re_endType.match( line.code )
+	if (vbEndType is not None): # found End Type
+		target.end( Type ) #write end of struct
+		return False
+		
+	else:
+		# match <var AS type>
+		# write <type var;>
+		foundMemberOfType( target, line )
+		return True
+
+# modified by R.S. for process enum
+def foundEnum( target, line, opts ):
+	
+	vbEnum = re_enum.match(line.code)
+	if vbEnum is None: return False
+	
+	target.begin( Enum( vbEnum.group(1), vbEnum.group(2), line.number ) )
+	
+	return True
+
+# modified by R.S. for process enum
+def processEnum( target, line ):
+	
+	vbEndEnum = re_endEnum.match( line.code )
+	if (vbEndEnum is not None):		# found End Enum
+		target.end( Enum )	#write end of enum
+		return False
+	
+	else:
+		doc = None
+		if line.kind == "'<": doc = line.doxy()
+		target.add( Member( "item", None, False, line.code, None, None, None, doc, line.number ) )
+		return True
+
+## keyword dispatch ##
+#
+# the first word of a declaration, after its access modifier, decides which
+# handlers can match it at all, so each line is tried only against those,
+# in the same order as the chain of found* calls they replace.
+# ( foundMember also matches words used as names, as in "Enum As Long" )
+
+## re to read the leading keyword of a line
+re_keyword  = LazyPattern(r"\s*(?:(?:Public|Friend|Private|Static)\s+)?(\w+)", re.I)
+
+# (re)builds the tables from the handlers now bound to the names ( Stats
+# binds timed handlers while it is installed )
+def buildHandlers():
+	global member_handlers, all_handlers, keyword_handlers, body_handlers
+	
+	member_handlers = ( ( foundMember, None ), )
+	all_handlers = ( ( foundType, processType ), ( foundMember, None ), ( foundEvent, None ), ( foundFunction, processFunction ), ( foundSub, processSub ), ( foundProperty, processProperty ), ( foundEnum, processEnum ) )
+	keyword_handlers = {
+		"type"		: ( ( foundType, processType ), ( foundMember, None ) ),
+		"event"		: ( ( foundEvent, None ), ( foundMember, None ) ),
+		"function"	: ( ( foundFunction, processFunction ), ( foundMember, None ) ),
+		"sub"		: ( ( foundSub, processSub ), ( foundMember, None ) ),
+		"property"	: ( ( foundProperty, processProperty ), ( foundMember, None ) ),
+		"enum"		: ( ( foundMember, None ), ( foundEnum, processEnum ) ),
+	}
+	# handlers of the procedure bodies, which are thrown away
+	body_handlers = frozenset(( processFunction, processSub, processProperty ))
+
+buildHandlers()
+
+# returns the handlers ( found*, process* ) which can match the line
+def lineHandlers( line ):
+	
+	keyword = re_keyword.match(line.code)
+	if keyword is None: return ()
+	
+	word = keyword.group(1)
+	# re.I also folds a few non-ascii letters onto ascii ones
+	if not word.isascii(): return all_handlers
+	return keyword_handlers.get( word.lower(), member_handlers )
+
+# filters the program code, fed line by line
+class CodeFilter(object):
+	
+	def __init__(self, target, opts, lineno = 0):
+		self.target = target	# of the records ( CppEmitter, ModuleBuilder )
+		self.opts = opts
+		self.inSearchFunction = None
+		self.lineno = lineno	# physical lines read
+		self.first = lineno		# physical line starting the logical line
+		self.frags = None		# fragments of a line continued by " _"
+		self.quoted = False		# the fragments end inside a string literal
+	
+	# whether the next line starts a new declaration, as in a new CodeFilter
+	def idle(self):
+		return self.inSearchFunction is None and self.frags is None
+	
+	# filters the next line ( line is Line(ln) when it is at hand )
+	def feed(self, ln, line = None):
+		target = self.target
+		self.lineno += 1
+		
+		if self.inSearchFunction in body_handlers and self.frags is None:
+			# only blank lines, comments, continued lines and lines which
+			# may be the End of the procedure are looked at in a body
+			if ln[:1] not in "Ee" and "'" not in ln and not ln.isspace() and continuedAt( ln ) < 0:
+				self.first = self.lineno
+				return
+		
+		if self.frags is not None:
+			# only the new fragment is scanned, from the state the others left
+			cut = continuedAt( ln )
+			if 0 <= cut:
+				comment, quoted = scanComment( ln, 0, self.quoted )
+				if comment < 0:
+					self.frags.append( ln[:cut] )
+					self.quoted = quoted
+					return
+			self.frags.append( ln )
+			ln = "".join( self.frags )
+			self.frags = None
+			line = Line(ln)
+		else:
+			self.first = self.lineno
+			if line is None: line = Line(ln)
+			if line.comment is None:
+				cut = continuedAt( ln )
+				if 0 <= cut:
+					self.frags = [ ln[:cut] ]
+					self.quoted = line.quoted and scanComment( ln )[1]
+					return
+		line.number = self.first
+			
+		# added by R.S. for pass blank lines to separate each comment block
+		checkBlankLine( target, line )
+		if checkDoxyComment( target, line ):
+			return
+		
+		if self.inSearchFunction is not None:
+			if not self.inSearchFunction( target, line ): self.inSearchFunction = None
+			return
+		
+		if foundBlockComment( target, line ):
+			self.inSearchFunction = processBlockComment
+			return
+		
+		# type, member, event, function, sub, property or enum
+		for found, process in lineHandlers( line ):
+			if found( target, line, self.opts ):
+				self.inSearchFunction = process
+				return
+
+# filters the code lines of inFR from st_line on, returns the CodeFilter
+# ( the state the lines end in )
+def filterProgramCode( inFR, outFile, opts, st_line = 0 ):
+	
+	code = CodeFilter( CppEmitter( outFile, opts ), opts )
+	for ln in itertools.islice( inFR, st_line, None ):
+		code.feed( ln )
+	return code
+
+# output held back while the header is read,
+# moved to a temporary file when it grows large
+class HeldOutput(object):
+	
+	limit = 1 << 20
+	
+	def __init__(self):
+		self.buf = []
+		self.size = 0
+		self.spill = None
+	
+	def write(self, s):
+		self.buf.append(s)
+		self.size += len(s)
+		if self.limit < self.size: self.spillOver()
+	
+	def spillOver(self):
+		if self.spill is None:
+			import tempfile
+			self.spill = tempfile.TemporaryFile( "w+", encoding = "utf-8", errors = "surrogatepass", newline = "" )
+		self.spill.write( "".join(self.buf) )
+		self.buf = []
+		self.size = 0
+	
+	# writes what is held to outFile
+	def copyTo(self, outFile):
+		if self.spill is not None:
+			import shutil
+			self.spillOver()
+			self.spill.seek(0)
+			shutil.copyfileobj( self.spill, outFile )
+			self.close()
+		outFile.write( "".join(self.buf) )
+		self.buf = []
+	
+	def close(self):
+		if self.spill is not None:
+			self.spill.close()
+			self.spill = None
+	
+	# drops what is held
+	def clear(self):
+		self.close()
+		self.buf = []
+		self.size = 0
+
+# filters a module in one pass over its lines: the header and the code are
+# read together, the code output is held back until the header is complete
+# ( the global comments of the whole file come before the class ).
+# inFR may be any iterator of lines, nothing else of the file is kept.
+# targets are more targets of the records ( those of sinks )
+def filterModule( inFR, outFile, opts, kind, controls = False, targets = () ):
+	
+	out = CppEmitter( outFile, opts )
+	if targets: out = Targets( ( out, ) + tuple(targets) )
+	module = ModuleFilter( out, opts, kind, controls )
+	try:
+		feedModule( inFR, module )
+	finally:
+		module.release()
+
+# feeds all the lines of inFR to module
+def feedModule( inFR, module ):
+	if isinstance( inFR, SplitFile ):
+		filterModuleSplit( inFR, module )
+	else:
+		for s in inFR: module.feed( s )
+	module.close()
+
+# the header and the code of a module, fed line by line to the target out:
+#  start( kind )               : before the first line
+#  hold()                      : the target of the code until the header is
+#                                complete
+#  drop( held )                : drops what is held ( the code restarts )
+#  writeHeader( header, held ) : the header is complete ( a Module of
+#                                ModuleHeader ), returns the target of the
+#                                rest of the code
+#  finish( kind )              : after the last line
+#  release( held )             : frees what is held, after an error too
+class ModuleFilter(object):
+	
+	def __init__(self, out, opts, kind, controls = False):
+		self.out = out
+		self.opts = opts
+		self.kind = kind
+		self.header = ModuleHeader( opts, controls )
+		self.held = out.hold()
+		self.code = CodeFilter( self.held, opts )
+		out.start( kind )
+	
+	def feed(self, s):
+		line = None
+		header = self.header
+		if header is not None:
+			# only the global comments need the line split
+			if "'" in s: line = Line(s)
+			restart = header.feed( s, line )
+			if restart:
+				# the code starts after the global block comment
+				self.out.drop( self.held )
+				self.code = CodeFilter( self.held, self.opts, self.code.lineno + 1 )
+			if header.done():
+				# from now on the output follows the input
+				self.writeHeader()
+			if restart: return
+		
+		self.code.feed( s, line )
+	
+	# the header is complete: written, with the code held back after it
+	def writeHeader(self):
+		self.code.target = self.out.writeHeader( self.header.module(), self.held )
+		self.header = None
+	
+	def close(self):
+		if self.header is not None: self.writeHeader()
+		self.out.finish( self.kind )
+	
+	def release(self):
+		self.out.release( self.held )
+
+## split filtering ##
+#####################
+#
+# the code of a large module is cut into chunks after the lines which may
+# end a procedure ( End Sub, End Function or End Property at column 0 ),
+# filtered by a process pool from the state of a new CodeFilter and joined
+# in order. a chunk whose previous one does not end in that state ( the End
+# was in a Type, an Enum, a block comment or a continued line ) is filtered
+# again after it, so the output is that of filterModule line by line.
+
+# a file which filterModule filters in chunks of bytes, read by the
+# processes of the pool ( its encoding is one of bytes_encodings )
+class SplitFile(object):
+	
+	def __init__(self, path, size, opts):
+		self.path = path
+		self.size = size
+		self.opts = opts
+
+# whether the code line ln may end a procedure
+def endsProcedure( ln ):
+	if ln[:1] not in "Ee": return False
+	return re_endSub.match(ln) is not None or re_endFunction.match(ln) is not None or re_endProperty.match(ln) is not None
+
+# the ( offset, raw line ) of the lines of the binary file raw from the
+# first one starting at or after offset
+def rawLines( raw, offset ):
+	if 0 < offset:
+		raw.seek( offset - 1 )
+		if b"\n" != raw.read(1): offset += len( raw.readline() )
+	raw.seek( offset )
+	for b in raw:
+		yield offset, b
+		offset += len(b)
+
+# the decoded lines of a raw line
+def decodeLines( b, decoder ):
+	s = decoder( b )[0]
+	if "\r" in s: return crLines( s )
+	return ( s, )
+
+# the lines of a chunk of a SplitFile. the chunks are cut after the lines
+# which may end a procedure ( at column 0, and with no "\r" but that of
+# "\r\n" ): a chunk starts after the first of those starting at or after
+# offset a ( at a itself when a is first, where the code starts ) and ends
+# after the first of those starting at or after offset b, or at the end of
+# the file. start and end are its offsets once it is read
+class ChunkLines(object):
+	
+	def __init__(self, raw, encoding, first, a, b):
+		self.raw = raw
+		self.decoder = codecs.getdecoder( encoding )
+		self.first = first
+		self.a = a
+		self.b = b
+		self.start = self.end = None
+	
+	def __iter__(self):
+		decoder = self.decoder
+		lines = rawLines( self.raw, self.a )
+		pos = self.a
+		if self.first < self.a:
+			for pos, b in lines:
+				if self.ends( b ): break
+			else:
+				pos = self.b
+			if self.b <= pos:
+				# the end of the chunk is after the same line
+				self.start = self.end = self.b
+				return
+			pos += len(b)
+		self.start = pos
+		for pos, b in lines:
+			yield from decodeLines( b, decoder )
+			if self.b <= pos and self.ends( b ):
+				self.end = pos + len(b)
+				return
+		self.end = None		# the end of the file
+	
+	def ends(self, b):
+		if b[:1] not in b"Ee": return False
+		lines = decodeLines( b, self.decoder )
+		return 1 == len(lines) and endsProcedure( lines[0] )
+
+# the decoded lines of the file raw between the offsets start and end
+# ( None: the end of the file )
+def rangeLines( raw, decoder, start, end ):
+	for pos, b in rawLines( raw, start ):
+		if end is not None and end <= pos: return
+		yield from decodeLines( b, decoder )
+
+# filters a chunk of the file at path ( see ChunkLines ) in a process of the
+# pool, returns its output, the CodeFilter it ends with and its offsets
+def filterChunk( path, first, a, b, opts ):
+	with open( path, "rb" ) as raw:
+		lines = ChunkLines( raw, opts.encoding, first, a, b )
+		out = io.StringIO()
+		code = filterProgramCode( lines, out, opts )
+	code.target = None
+	return out.getvalue(), code, lines.start, lines.end
+
+# feeds the lines of the file raw to header until it is done, returns the
+# offset where the code starts ( after the global block comment ) and the
+# lines after it in the same raw line ( when lines end with "\r" alone ).
+# the block may be anywhere, so every line is read, but once the name is
+# found only the chunks with a '! or a '/** in them are decoded
+def scanHeader( raw, decoder, header ):
+	start = 0
+	rest = ()
+	offset = 0
+	for chunk in rawChunks( raw ):
+		if header.name_done and not header.in_block and b"'!" not in chunk and b"'/**" not in chunk:
+			offset += len(chunk)
+			continue
+		for b in io.BytesIO( chunk ):
+			lines = decodeLines( b, decoder )
+			offset += len(b)
+			for i, s in enumerate( lines ):
+				# only '! and '/** lines need the line split
+				line = None
+				if not header.in_block and ( "'!" in s or "'/**" in s ): line = Line(s)
+				if header.feed( s, line ): start, rest = offset, lines[i + 1:]
+				if header.done(): return start, rest
+	return start, rest
+
+def filterModuleSplit( split, module ):
+	
+	from concurrent.futures import ProcessPoolExecutor
+	
+	opts = split.opts
+	decoder = codecs.getdecoder( opts.encoding )
+	with open( split.path, "rb" ) as raw:
+		start, rest = scanHeader( raw, decoder, module.header )
+	module.writeHeader()
+	outFile = module.out.outFile
+	
+	# the code of the raw line of the end of the global block comment
+	code = None
+	if rest:
+		out = io.StringIO()
+		code = filterProgramCode( rest, out, opts )
+		outFile.write( out.getvalue() )
+	
+	jobs = opts.jobs or os.cpu_count() or 1
+	count = jobs * 4
+	offsets = [ start + k * ( split.size - start ) // count for k in range(count) ] + [ split.size ]
+	with ProcessPoolExecutor( jobs ) as pool:
+		# a few chunks per process ahead of what is written
+		ranges = iter( zip( offsets, offsets[1:] ) )
+		futures = collections.deque( pool.submit( filterChunk, split.path, start, a, b, opts ) for a, b in itertools.islice( ranges, 2 * jobs ) )
+		while futures:
+			text, ended, a, b = futures.popleft().result()
+			for r in itertools.islice( ranges, 1 ): futures.append( pool.submit( filterChunk, split.path, start, r[0], r[1], opts ) )
+			if a == b: continue
+			if code is not None and not code.idle():
+				# filtered again from where the previous chunk left
+				out = io.StringIO()
+				code.target = CppEmitter( out, opts )
+				with open( split.path, "rb" ) as raw:
+					for ln in rangeLines( raw, decoder, a, b ): code.feed( ln )
+				text, ended = out.getvalue(), code
+			outFile.write( text )
+			code = ended
+
+# filters .cls-files - VB-CLASS-FILES
+def filterCLS( inFR, outFile, opts ):
+	filterModule( inFR, outFile, opts, "cls" )
+
+# filters .bas-files
+def filterBAS( inFR, outFile, opts ):
+	filterModule( inFR, outFile, opts, "bas" )
+
+# filters .frm-files
+def filterFRM( inFR, outFile, opts ):
+	filterModule( inFR, outFile, opts, "frm", opts.controls )
+
+# filter of each kind of file
+filters = { "bas": filterBAS, "cls": filterCLS, "frm": filterFRM }
+# and its name in the output
+module_names = { "bas": "filterBAS", "cls": "filterCLS", "frm": "filterFRM" }
+
+# encodings in which "\n", "\r", "'" and '"' are never a part of a
+# multibyte character, so that SplitFile can cut the raw lines and look for
+# the End lines as bytes
+bytes_encodings = frozenset(( "cp932", "shift_jis", "euc_jp", "gbk", "big5", "cp949", "euc_kr", "utf-8", "ascii", "iso8859-1", "cp1252" ))
+
+# chunks of about size bytes, of whole lines, of the binary file raw
+def rawChunks( raw, size = 1 << 16 ):
+	read = raw.read
+	while True:
+		chunk = read(size)
+		if not chunk: return
+		if b"\n" != chunk[-1:]: chunk += raw.readline()
+		yield chunk
+
+# the lines of the decoded line s with "\r" in it ( "\r\n" and "\r" end
+# lines as in text files )
+def crLines( s ):
+	if "\r\n" == s[-2:] and "\r" not in s[:-2]: return ( s[:-2] + "\n", )
+	return io.StringIO( s, newline = None ).readlines()
+
+# whether the source encoding is one of bytes_encodings
+def isBytesEncoding( encoding ):
+	try:
+		return codecs.lookup( encoding ).name in bytes_encodings
+	except LookupError:
+		return False
+
+# lines of the binary file raw, read as a text file
+def sourceLines( raw, encoding ):
+	return io.TextIOWrapper( raw, encoding = encoding )
+
+# returns the kind ("bas", "cls", "frm", ...) of a file name, an extension or a kind
+def fileKind( name ):
+	root, ext = os.path.splitext(name)
+	return (ext or root).lstrip(".").lower()
+
+## filters the lines of one file ##
+##
+## this function decides whether the file is
+## (*) a bas file  - module
+## (*) a cls file  - class
+## (*) a frm file  - frame
+##
+## and calls the appropriate function
+## ( the records of a module go to targets too )
+def filterLines( inFR, outFile, kind, opts = None, targets = () ):
+	
+	if opts is None: opts = FilterOptions()
+	
+	kind = fileKind(kind)
+	func = filters.get(kind)
+	if func is None: dump( inFR, outFile )		## if it is an unknown extension, just dump it
+	elif targets: filterModule( inFR, outFile, opts, kind, "frm" == kind and opts.controls, targets )
+	else: func( inFR, outFile, opts )
+
+## output ##
+##############
+#
+# the filters make many small writes. OutputSink collects them and writes
+# them encoded to a binary file ( sys.stdout.buffer, a file opened "wb",
+# io.BytesIO, ... ) in large blocks. what is still collected is written by
+# flush( True ) or close(), which "with OutputSink(...)" calls on exit.
+# the lines end as in a file opened "w" ( os.linesep ), so every output
+# file has the bytes of "vbfilter.py file > output".
+
+# newline of OutputSink and of the other files written ( None: "\n" )
+text_newline = os.linesep != "\n" and os.linesep or None
+
+class OutputSink(object):
+	
+	block_size = 1 << 16
+	
+	#  raw      : binary file written to
+	#  encoding : encoding of the output
+	#  errors   : how characters the encoding lacks are handled
+	#  newline  : written for each "\n" ( None writes "\n" )
+	def __init__(self, raw, encoding = "utf-8", errors = "strict", newline = text_newline):
+		self.raw = raw
+		self.encoding = encoding
+		self.errors = errors
+		self.newline = newline
+		self.encoder = codecs.getincrementalencoder(encoding)(errors)
+		self.buf = []
+		self.size = 0
+	
+	def write(self, s):
+		self.buf.append(s)
+		self.size += len(s)
+		if self.block_size <= self.size: self.flush()
+	
+	# encodes and writes what is collected ( final at the end of the output )
+	def flush(self, final = False):
+		s = "".join(self.buf)
+		self.buf = []
+		self.size = 0
+		if self.newline is not None: s = s.replace( "\n", self.newline )
+		data = self.encoder.encode( s, final )
+		if data: self.emit(data)
+	
+	def emit(self, data):
+		self.raw.write(data)
+	
+	def close(self):
+		self.flush( True )
+		flush = getattr( self.raw, "flush", None )
+		if flush is not None: flush()
+	
+	def __enter__(self):
+		return self
+	
+	def __exit__(self, *exc):
+		self.close()
+
+# sink writing to stdout, in the encoding of stdout unless encoding is given
+def stdoutSink( encoding = None ):
+	sys.stdout.flush()
+	if encoding is not None: return OutputSink( sys.stdout.buffer, encoding )
+	return OutputSink( sys.stdout.buffer, sys.stdout.encoding or "utf-8", sys.stdout.errors or "strict" )
+
+## library API ##
+#################
+
+# filters VB source text of the given kind and returns the result
+def filter_text( source, kind, options = None ):
+	
+	outFile = io.StringIO()
+	filterLines( io.StringIO(source, newline = None), outFile, kind, options )
+	return outFile.getvalue()
+
+# filters the file at path ( "-" for stdin ) and writes the result to out
+# (stdout by default). kind defaults to the extension of path.
+# the symbols of the file are written to each of sinks ( JsonSymbols,
+# CtagsSymbols ) as well.
+def filter_file( path, out = None, options = None, kind = None, sinks = () ):
+	
+	if options is None: options = FilterOptions()
+	if out is None: out = sys.stdout
+	if kind is None: kind = path
+	targets = [ sink.target( path ) for sink in sinks ]
+	
+	if "-" == path:
+		inFile = sourceLines( sys.stdin.buffer, options.encoding )
+		try:
+			filterLines( inFile, out, kind, options, targets )
+		finally:
+			if isinstance( inFile, io.TextIOWrapper ): inFile.detach()
+	elif options.cache is not None:
+		from vbfilter_cache import OutputCache
+		if targets and fileKind(kind) in filters:
+			# the symbols need the IR, which is cached as well
+			emitModule( OutputCache( options.cache, options ).parse( path, kind ), Targets( [ CppEmitter( out, options ) ] + targets ) )
+		else:
+			OutputCache( options.cache, options ).filter( path, out, kind )
+	else:
+		with open( path, "rb" ) as raw:
+			# the chunks of a split file give no symbols
+			size = os.fstat( raw.fileno() ).st_size
+			if options.split is not None and options.split <= size and not targets and fileKind(kind) in filters and isBytesEncoding( options.encoding ):
+				inFile = SplitFile( path, size, options )
+			else:
+				inFile = sourceLines( raw, options.encoding )
+			filterLines( inFile, out, kind, options, targets )
+	
+	if options.verbose: sys.stderr.write("OK\n")
+
+# filters each of the files, yields ( path, result ) pairs
+def filter_files( paths, options = None ):
+	
+	if options is None: options = FilterOptions()
+	
+	for path in paths:
+		outFile = io.StringIO()
+		filter_file( path, outFile, options )
+		yield path, outFile.getvalue()
+
+# parses the lines of a module of the given kind into a Module
+def parseLines( inFR, kind, opts = None ):
+	
+	if opts is None: opts = FilterOptions()
+	kind = fileKind(kind)
+	if kind not in module_names: raise ValueError( "not a module: " + kind )
+	
+	builder = ModuleBuilder()
+	feedModule( inFR, ModuleFilter( builder, opts, kind, "frm" == kind and opts.controls ) )
+	return builder.module()
+
+# parses VB source text of the given kind into a Module
+def parse_text( source, kind, options = None ):
+	return parseLines( io.StringIO(source, newline = None), kind, options )
+
+# parses the file at path into a Module ( loaded from the cache of the
+# options while the file does not change )
+def parse_file( path, options = None, kind = None ):
+	
+	if options is None: options = FilterOptions()
+	if options.cache is not None:
+		from vbfilter_cache import OutputCache
+		return OutputCache( options.cache, options ).parse( path, kind )
+	with open( path, "rb" ) as raw:
+		return parseLines( sourceLines( raw, options.encoding ), kind or path, options )
+
+# writes the output of a Module to out, as filter_file writes it
+def emit( module, out = None, options = None ):
+	
+	if options is None: options = FilterOptions()
+	if out is None: out = sys.stdout
+	emitModule( module, CppEmitter( out, options ) )
+
+# the records as tuples of their index in ir_records and their fields
+# ( sequences as they are ), for marshal
+ir_records = ( Module, Procedure, Arg, Member, Type, Enum, Event, Control, DocComment )
+ir_index = dict( ( cls, i ) for i, cls in enumerate(ir_records) )
+
+def packIR( value ):
+	cls = value.__class__
+	if cls in ir_index: return ( ir_index[cls], ) + tuple( packIR( getattr( value, name ) ) for name in cls.__slots__ )
+	if cls is tuple or cls is list: return cls( packIR(v) for v in value )
+	return value
+
+def unpackIR( value ):
+	cls = value.__class__
+	if cls is tuple and value and value[0].__class__ is int:
+		cls = ir_records[value[0]]
+		if len(value) != len(cls.__slots__) + 1: raise ValueError( "IR of another layout of " + cls.__name__ )
+		record = cls.__new__(cls)
+		for name, v in zip( cls.__slots__, value[1:] ): setattr( record, name, unpackIR(v) )
+		return record
+	if cls is tuple or cls is list: return cls( unpackIR(v) for v in value )
+	return value
+
+# a Module as bytes, and back
+def dumps_ir( module ):
+	import marshal
+	return marshal.dumps( ( __version__, packIR(module) ) )
+
+def loads_ir( data ):
+	import marshal
+	version, module = marshal.loads( data )
+	if version != __version__: raise ValueError( "IR of vbfilter " + version )
+	return unpackIR( module )
+
+# digest of the filter source, so that any change of the filter invalidates the cache
+def filterDigest():
+	global filter_digest
+	if filter_digest is None:
+		import hashlib
+		try:
+			with open( __file__, "rb" ) as f:
+				filter_digest = hashlib.sha1( f.read() ).hexdigest()
+		except OSError:
+			filter_digest = __version__
+	return filter_digest
+
+filter_digest = None
+
+## main filter-function ##
+##
+## filters inFileName to outFileName, or to stdout, and its symbols to sinks
+def filter( inFileName, outFileName = None, options = None, sinks = () ):
+	
+	if options is None: options = FilterOptions()
+	
+	if outFileName is None:
+		with stdoutSink() as outFile:
+			filter_file( inFileName, outFile, options, sinks = sinks )
+		return
+	
+	with open( outFileName, "wb" ) as f, OutputSink( f, options.encoding ) as outFile:
+		filter_file( inFileName, outFile, options, sinks = sinks )
+
+## the other modes ##
+#####################
+#
+# the streaming API, the output cache, --stats, --batch, --amalgamate,
+# --watch, --index and --serve are in modules of their own ( vbfilter_*.py
+# next to this one ), which main imports only for their options, so filtering
+# a file does not load or compile them. their public names are still
+# attributes of this module, imported when first used.
+
+lazy_names = {
+	"StreamFilter": "vbfilter_stream",
+	"afilter": "vbfilter_stream",
+	"afilter_to": "vbfilter_stream",
+	"OutputCache": "vbfilter_cache",
+	"Stats": "vbfilter_stats",
+	"find_sources": "vbfilter_batch",
+	"filter_batch": "vbfilter_batch",
+	"amalgamate": "vbfilter_amalgamate",
+	"watch": "vbfilter_watch",
+	"SymbolIndex": "vbfilter_index",
+	"serve": "vbfilter_server",
+}
+
+def __getattr__( name ):
+	if name not in lazy_names: raise AttributeError( "module 'vbfilter' has no attribute '%s'" % name )
+	return getattr( __import__( lazy_names[name] ), name )
+
+def usage():
+	print( "usage: ", os.path.basename(sys.argv[0]), " [option] filename" )
+	print( "option: C	Puts Control of Form" )
+	print( "        --control-properties name,...	properties of the controls written with C (default: Caption, Index, TabIndex, Enabled, Visible...)" )
+	print( "        --kind bas|cls|frm	kind of the file (needed when filename is - for stdin)" )
+	print( "        --serve [--socket path]	runs the filter server for vbfilter_client.py" )
+	print( "        --batch outdir [-j jobs] dir|project.vbp...	filters whole source trees into outdir" )
+	print( "        --cache dir	reuses the outputs of unchanged files (or VBFILTER_CACHE=dir)" )
+	print( "        --output-encoding enc	encoding of the output (default: the encoding of stdout)" )
+	print( "        --split-size bytes [-j jobs]	filters files of at least that size in parallel chunks" )
+	print( "        --amalgamate out [--shard-size bytes] [-j jobs] dir|project.vbp...	filters the sources into one file (or shards)" )
+	print( "        --watch outdir [-j jobs] [--interval seconds] dir|project.vbp...	filters the sources into outdir, then each file changed" )
+	print( "        --index db [--find name] [dir|project.vbp...]	updates the symbol index of the sources, looks up a name" )
+	print( "        --symbols path | --tags path	writes the symbols as JSON lines or as a ctags file too (also with --batch)" )
+	print( "        --stats | --stats-file path	times the handlers and patterns, writes JSON to stderr or appends it to path (or VBFILTER_STATS=path)" )
+
+## main-entry ##
+################
+def main( argv = None ):
+	
+	if argv is None: argv = sys.argv[1:]
+	
+	# getopt ( and gettext, which it imports ) is loaded only for options
+	opts, args = [], argv
+	if any( "-" == a[:1] and "-" != a for a in argv ):
+		import getopt
+		try:
+			opts, args = getopt.getopt( argv, "Cj:", ["serve", "socket=", "batch=", "jobs=", "cache=", "kind=", "output-encoding=", "split-size=", "stats", "stats-file=", "symbols=", "tags=", "index=", "find=", "watch=", "interval=", "amalgamate=", "shard-size=", "control-properties="] )
+		except getopt.GetoptError as e:
+			sys.stderr.write( str(e) + "\n" )
+			usage()
+			return 1
+	
+	options = FilterOptions( verbose = True, cache = os.environ.get("VBFILTER_CACHE") or None )
+	server = False
+	socket = None
+	outdir = None
+	jobs = None
+	kind = None
+	out_encoding = None
+	stats = os.environ.get("VBFILTER_STATS") or None
+	symbols = None
+	tags = None
+	index = None
+	find = None
+	watchdir = None
+	interval = 1.0
+	amalgam = None
+	shard_size = None
+	for o, a in opts:
+		if o == "-C": options.controls = True
+		elif o == "--serve": server = True
+		elif o == "--socket": socket = a
+		elif o == "--batch": outdir = a
+		elif o in ("-j", "--jobs"): jobs = int(a)
+		elif o == "--cache": options.cache = a
+		elif o == "--kind": kind = a
+		elif o == "--output-encoding": out_encoding = a
+		elif o == "--split-size": options.split = int(a)
+		elif o == "--stats": stats = "-"
+		elif o == "--stats-file": stats = a
+		elif o == "--symbols": symbols = a
+		elif o == "--tags": tags = a
+		elif o == "--index": index = a
+		elif o == "--find": find = a
+		elif o == "--watch": watchdir = a
+		elif o == "--interval": interval = float(a)
+		elif o == "--amalgamate": amalgam = a
+		elif o == "--shard-size": shard_size = int(a)
+		elif o == "--control-properties": options.control_properties = frozenset( p.strip() for p in a.split(",") if p.strip() )
+	
+	if server:
+		options.verbose = False
+		try:
+			from vbfilter_server import serve
+			serve( socket, options )
+		except OSError as e:
+			sys.stderr.write( str(e) + "\n" )
+			return 1
+		return 0
+	
+	if index is not None:
+		from vbfilter_index import indexMain
+		return indexMain( index, args, find, options )
+	
+	if amalgam is not None:
+		if len(args) == 0:
+			usage()
+			return 1
+		options.split = None
+		from vbfilter_amalgamate import amalgamate
+		try:
+			written, failures = amalgamate( args, amalgam, options, jobs, shard_size, out_encoding )
+		except (OSError, LookupError) as e:
+			sys.stderr.write( str(e) + "\n" )
+			return 1
+		return failures and 1 or 0
+	
+	if watchdir is not None:
+		if len(args) == 0:
+			usage()
+			return 1
+		options.split = None
+		from vbfilter_watch import watch
+		try:
+			watch( args, watchdir, options, jobs, out_encoding, interval )
+		except KeyboardInterrupt:
+			pass
+		except OSError as e:
+			sys.stderr.write( str(e) + "\n" )
+			return 1
+		return 0
+	
+	if outdir is not None:
+		if len(args) == 0:
+			usage()
+			return 1
+		# the batch keeps every process busy with whole files
+		options.split = None
+		from vbfilter_batch import filter_batch
+		try:
+			with SymbolFiles( symbols, tags ) as sinks:
+				return filter_batch( args, outdir, options, jobs, out_encoding, sinks ) and 1 or 0
+		except OSError as e:
+			sys.stderr.write( str(e) + "\n" )
+			return 1
+	
+	if len(args) == 0 or 2 < len(args):
+		usage()
+		return 1
+	
+	# the old style option ("vbfilter.py C filename")
+	if 2 == len(args) and "C" == args[0]: options.controls = True
+	
+	if "-" == args[-1] and kind is None:
+		sys.stderr.write( "vbfilter: --kind is needed to filter stdin\n" )
+		return 1
+	
+	options.jobs = jobs
+	
+	# Filter the specified file and print the result to stdout
+	if stats is not None:
+		# the statistics are of this process only
+		options.split = None
+		from vbfilter_stats import Stats, writeStats
+		stats, stats_path = Stats(), stats
+	try:
+		with SymbolFiles( symbols, tags ) as sinks, stdoutSink( out_encoding ) as outFile:
+			if stats is None:
+				filter_file( args[-1], outFile, options, kind, sinks )
+			else:
+				with stats:
+					filter_file( args[-1], outFile, options, kind, sinks )
+	except (OSError, LookupError) as e:
+		sys.stderr.write( str(e) + "\n" )
+		return 1
+	finally:
+		if stats is not None: writeStats( stats, stats_path )
+	
+	return 0
+
+# the sinks of the --symbols and --tags files ( None: not written ),
+# written and closed on exit
+class SymbolFiles(list):
+	
+	def __init__(self, symbols, tags):
+		list.__init__(self)
+		try:
+			if symbols is not None: self.append( JsonSymbols( open( symbols, "w", encoding = "utf-8" ) ) )
+			if tags is not None: self.append( CtagsSymbols( open( tags, "w", encoding = "utf-8", newline = "\n" ) ) )
+		except OSError:
+			self.__exit__( *sys.exc_info() )
+			raise
+	
+	def __enter__(self):
+		return self
+	
+	def __exit__(self, *exc):
+		for sink in self:
+			try:
+				if not exc or exc[0] is None: sink.close()
+			finally:
+				sink.outFile.close()
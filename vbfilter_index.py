@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+#
+# Symbol index of vbfilter ("vbfilter.py --index"): the symbols of the
+# sources kept in SQLite. Imported only for --index, or when
+# vbfilter.SymbolIndex is first used.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+import io              # in-memory files
+import os.path         # paths of the sources
+import sys             # output and stuff
+
+from vbfilter_core import FilterOptions, ModuleFilter, SymbolTarget, feedModule, fileKind, filterDigest, filters, oneLine, sourceLines, usage
+from vbfilter_batch import find_sources
+
+## symbol index ##
+####################
+#
+# "vbfilter.py --index db source..." keeps the symbols of the Modules,
+# Classes and Forms of the sources ( as --batch finds them ) in a SQLite
+# database: the symbols as JsonSymbols writes them, and the arguments of the
+# procedures and events. a file is parsed again only when the hash of its
+# content changed, and its rows are replaced in one transaction.
+
+index_schema = """
+CREATE TABLE IF NOT EXISTS files (
+	id INTEGER PRIMARY KEY,
+	path TEXT NOT NULL UNIQUE,
+	hash TEXT NOT NULL,
+	kind TEXT NOT NULL,
+	module TEXT COLLATE NOCASE
+);
+CREATE TABLE IF NOT EXISTS symbols (
+	id INTEGER PRIMARY KEY,
+	file INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+	name TEXT NOT NULL COLLATE NOCASE,
+	kind TEXT NOT NULL,
+	access TEXT,
+	signature TEXT NOT NULL,
+	scope TEXT COLLATE NOCASE,
+	module TEXT COLLATE NOCASE,
+	line INTEGER,
+	doc TEXT
+);
+CREATE TABLE IF NOT EXISTS args (
+	symbol INTEGER NOT NULL REFERENCES symbols(id) ON DELETE CASCADE,
+	position INTEGER NOT NULL,
+	name TEXT NOT NULL COLLATE NOCASE,
+	passing TEXT NOT NULL,
+	optional INTEGER NOT NULL,
+	array INTEGER NOT NULL,
+	type TEXT,
+	"default" TEXT
+);
+CREATE INDEX IF NOT EXISTS symbols_name ON symbols(name);
+CREATE INDEX IF NOT EXISTS symbols_kind ON symbols(kind);
+CREATE INDEX IF NOT EXISTS symbols_module ON symbols(module);
+CREATE INDEX IF NOT EXISTS symbols_file ON symbols(file);
+CREATE INDEX IF NOT EXISTS args_symbol ON args(symbol);
+"""
+
+class SymbolIndex(object):
+	
+	def __init__(self, path, options = None):
+		import sqlite3
+		
+		if options is None: options = FilterOptions()
+		self.opts = options
+		# a new filter or other options parse every file again
+		self.salt = ( options.key() + "\t" + filterDigest() + "\n" ).encode("utf-8")
+		self.db = sqlite3.connect( path )
+		self.db.execute( "PRAGMA foreign_keys = ON" )
+		self.db.executescript( index_schema )
+	
+	def close(self):
+		self.db.close()
+	
+	def __enter__(self):
+		return self
+	
+	def __exit__(self, *exc):
+		self.close()
+	
+	# indexes the files of sources ( files, directories, .vbp projects ) and
+	# forgets those which no longer exist, returns the counts of the files
+	# ( parsed, unchanged, removed ) and the list of the failures ( path, message )
+	def update(self, sources):
+		parsed = unchanged = 0
+		failures = []
+		for source in sources:
+			for path, root in find_sources( source, self.opts ):
+				if fileKind(path) not in filters: continue
+				try:
+					if self.updateFile( path ): parsed += 1
+					else: unchanged += 1
+				except Exception as e:
+					failures.append( ( path, "%s: %s" % ( type(e).__name__, e ) ) )
+		
+		removed = 0
+		for id, path in self.db.execute( "SELECT id, path FROM files" ).fetchall():
+			if not os.path.exists(path):
+				with self.db:
+					self.db.execute( "DELETE FROM files WHERE id = ?", ( id, ) )
+				removed += 1
+		return ( parsed, unchanged, removed ), failures
+	
+	# parses the file at path if it changed, returns whether it did
+	def updateFile(self, path):
+		import hashlib
+		
+		path = os.path.abspath(path)
+		with open( path, "rb" ) as f:
+			data = f.read()
+		digest = hashlib.sha256( self.salt + data ).hexdigest()
+		known = self.db.execute( "SELECT hash FROM files WHERE path = ?", ( path, ) ).fetchone()
+		if known is not None and known[0] == digest: return False
+		
+		kind = fileKind(path)
+		symbols = SymbolTarget( None, path )
+		feedModule( sourceLines( io.BytesIO(data), self.opts.encoding ), ModuleFilter( symbols, self.opts, kind, "frm" == kind and self.opts.controls ) )
+		self.replace( symbols, digest )
+		return True
+	
+	# replaces the rows of the file of module ( a SymbolTarget )
+	def replace(self, module, digest):
+		with self.db:
+			db = self.db
+			db.execute( "DELETE FROM files WHERE path = ?", ( module.path, ) )
+			file = db.execute( "INSERT INTO files ( path, hash, kind, module ) VALUES ( ?, ?, ?, ? )", ( module.path, digest, module.kind, module.name ) ).lastrowid
+			for name, kind, access, signature, args, block, line, doc, record in module.symbols:
+				symbol = db.execute( "INSERT INTO symbols ( file, name, kind, access, signature, scope, module, line, doc ) VALUES ( ?, ?, ?, ?, ?, ?, ?, ?, ? )",
+					( file, name, kind, access, signature, module.scope(block), module.name, line, doc ) ).lastrowid
+				if args is not None:
+					db.executemany( 'INSERT INTO args ( symbol, position, name, passing, optional, array, type, "default" ) VALUES ( ?, ?, ?, ?, ?, ?, ?, ? )',
+						[ ( symbol, i, arg.name, oneLine( arg.passing ), arg.optional is not None, arg.array, arg.type, arg.default and arg.default.strip() ) for i, arg in enumerate( record.args ) ] )
+	
+	# the symbols of the given name, kind and module ( None: any ), as
+	# ( name, kind, access, signature, scope, module, path, line, doc )
+	def find(self, name = None, kind = None, module = None):
+		where = []
+		params = []
+		for column, value in ( ( "s.name", name ), ( "s.kind", kind ), ( "s.module", module ) ):
+			if value is not None:
+				where.append( column + " = ?" )
+				params.append( value )
+		sql = "SELECT s.name, s.kind, s.access, s.signature, s.scope, s.module, f.path, s.line, s.doc FROM symbols s JOIN files f ON f.id = s.file"
+		if where: sql += " WHERE " + " AND ".join( where )
+		return self.db.execute( sql + " ORDER BY f.path, s.line", params ).fetchall()
+	
+	# the rows of any query ( on files, symbols and args )
+	def query(self, sql, params = ()):
+		return self.db.execute( sql, params ).fetchall()
+
+# "--index db [--find name] source..."
+def indexMain( path, sources, find, options ):
+	import sqlite3
+	
+	if not sources and find is None:
+		usage()
+		return 1
+	
+	try:
+		with SymbolIndex( path, options ) as index:
+			failures = []
+			if sources:
+				counts, failures = index.update( sources )
+				for src, error in failures: sys.stderr.write( src + ": " + error + "\n" )
+				sys.stderr.write( "%d files parsed, %d unchanged, %d removed, %d failed\n" % ( counts + ( len(failures), ) ) )
+			if find is not None:
+				for name, kind, access, signature, scope, module, src, line, doc in index.find( find ):
+					print( "%s:%d: %s\t%s\t%s" % ( src, line, scope or "", kind, signature ) )
+	except (OSError, sqlite3.Error) as e:
+		sys.stderr.write( str(e) + "\n" )
+		return 1
+	return failures and 1 or 0
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#
+# What vbfilter_server and vbfilter_client.py share: the path of the socket
+# and the frames of a request. Kept small, the client imports it on each run.
+#
+# request  : "VBF2 <LF>", then the fields controls, encoding, errors and path,
+#            each as "<size> <LF> <size bytes>" ( a path may hold any byte )
+# response : any number of "D<size> <LF> <size bytes of output>" frames,
+#            then "E<exit status> <TAB> message <LF>"
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+import os              # paths and environment
+
+request_head = b"VBF2\n"
+request_fields = 4
+field_limit = 1 << 16
+
+# path of the server socket (VBFILTER_SOCKET overrides the default): in
+# $XDG_RUNTIME_DIR, or else in a directory of the user alone in $TMPDIR, so
+# no other user can put a socket of theirs in its place
+def socketPath():
+	path = os.environ.get("VBFILTER_SOCKET")
+	if path: return path
+	runtime = os.environ.get("XDG_RUNTIME_DIR")
+	if runtime: return os.path.join( runtime, "vbfilter.sock" )
+	return os.path.join( os.environ.get("TMPDIR") or "/tmp", "vbfilter-%d" % os.getuid(), "vbfilter.sock" )
+
+# the request of the fields ( bytes )
+def packRequest( fields ):
+	return request_head + b"".join( b"%d\n" % len(field) + field for field in fields )
+
+# the fields of the request read from rfile, None if it is not one
+def readRequest( rfile ):
+	if request_head != rfile.readline( len(request_head) ): return None
+	fields = []
+	for i in range(request_fields):
+		size = rfile.readline( 8 )
+		if not size.endswith(b"\n") or not size[:-1].isdigit() or field_limit < int(size): return None
+		field = rfile.read( int(size) )
+		if len(field) != int(size): return None
+		fields.append( field )
+	return fields
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+#
+# Filter server of vbfilter ("vbfilter.py --serve"), which vbfilter_client.py
+# talks to. Imported only for --serve.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+import os              # paths and environment
+import sys             # output and stuff
+
+import vbfilter_core   # its patterns are compiled before the first fork
+from vbfilter_core import FilterOptions, LazyPattern, OutputSink, filter_file
+from vbfilter_protocol import readRequest, socketPath
+
+## filter server ##
+###################
+#
+# "vbfilter.py --serve" keeps the compiled patterns and the filters warm and
+# filters the files named by its clients (vbfilter_client.py) over a unix
+# domain socket. each request is served by a process forked from the server
+# ( a thread where there is no fork ), so the clients doxygen runs at once
+# ( NUM_PROC_THREADS ) are filtered in parallel, each with the warm state.
+# the frames of the requests are in vbfilter_protocol.
+
+# makes the directory of the socket at path ( 0700 ) if it is missing and
+# checks that it is owned by the user and that no other can write to it
+def socketDirectory( path ):
+	import stat
+	
+	directory = os.path.dirname( os.path.abspath(path) )
+	try:
+		os.mkdir( directory, 0o700 )
+	except FileExistsError:
+		pass
+	st = os.lstat( directory )
+	if not stat.S_ISDIR( st.st_mode ) or st.st_uid != os.getuid() or st.st_mode & 0o022:
+		raise OSError( "vbfilter: %s is not a directory which only this user can write to" % directory )
+
+# sink sending what is written to it in D frames
+class FrameWriter(OutputSink):
+	
+	def emit(self, data):
+		self.raw.write( b"D%d\n" % len(data) + data )
+
+# serves one request read from rfile, answers to wfile
+def serveRequest( rfile, wfile, opts ):
+	
+	fields = readRequest( rfile )
+	if fields is None:
+		wfile.write( b"E2\tvbfilter: bad request\n" )
+		return
+	
+	controls, encoding, errors, path = fields
+	options = opts.copy( controls = b"1" == controls, verbose = False )
+	status, message = 0, ""
+	try:
+		out = FrameWriter( wfile, encoding.decode(), errors.decode() )
+		filter_file( os.fsdecode(path), out, options )
+		out.flush( True )
+	except (OSError, LookupError, ValueError) as e:
+		status, message = 1, str(e)
+	
+	wfile.write( b"E%d\t" % status + message.replace("\n", " ").encode("utf-8", "replace") + b"\n" )
+
+# compiles the patterns, which the forked processes then share
+def warmUp():
+	for value in list( vars(vbfilter_core).values() ):
+		if isinstance( value, LazyPattern ): value.compile()
+
+# the class of the server: a process is forked for each request, or a
+# thread is started where there is no fork
+def serverClass():
+	import socketserver
+	
+	mixin = socketserver.ThreadingMixIn
+	if hasattr( os, "fork" ): mixin = socketserver.ForkingMixIn
+	class Server(mixin, socketserver.UnixStreamServer):
+		daemon_threads = True
+	return Server
+
+# runs the filter server until it is interrupted
+def serve( path = None, opts = None ):
+	
+	import signal
+	import socket
+	import socketserver
+	
+	if path is None: path = socketPath()
+	if opts is None: opts = FilterOptions()
+	socketDirectory( path )
+	
+	class Handler(socketserver.StreamRequestHandler):
+		def handle(self):
+			try:
+				serveRequest( self.rfile, self.wfile, opts )
+			except (BrokenPipeError, ConnectionResetError):
+				pass	# the client has gone
+	
+	# remove the socket of a server which is not running any more
+	if os.path.exists(path):
+		probe = socket.socket( socket.AF_UNIX, socket.SOCK_STREAM )
+		try:
+			probe.connect(path)
+		except OSError:
+			os.unlink(path)
+		else:
+			raise OSError( "vbfilter server already running on " + path )
+		finally:
+			probe.close()
+	
+	warmUp()
+	server = serverClass()( path, Handler )
+	signal.signal( signal.SIGTERM, lambda signum, frame: sys.exit(0) )
+	sys.stderr.write( "vbfilter: serving on " + path + "\n" )
+	try:
+		server.serve_forever()
+	except KeyboardInterrupt:
+		pass
+	finally:
+		server.server_close()
+		os.unlink(path)
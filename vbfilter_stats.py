@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+#
+# Statistics of vbfilter ("vbfilter.py --stats"): the calls, hits and time
+# of the handlers and patterns. Imported only for --stats.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+import re              # the patterns replaced
+import sys             # output and stuff
+
+import vbfilter_core   # the handlers and patterns replaced are its globals
+from vbfilter_core import CodeFilter, LazyPattern, ModuleHeader, __version__, buildHandlers, translations
+
+## statistics ( --stats ) ##
+##############################
+#
+# while a Stats is installed, the handlers ( check*, found*, process* ), the
+# re_* patterns and the line feeds are replaced by timed ones, which count
+# their calls, their hits ( a true result, a match, a substitution ) and the
+# seconds spent in them, and keep the slowest lines. nothing is timed when
+# no Stats is installed.
+
+class Stats(object):
+	
+	slowest_count = 20
+	
+	def __init__(self):
+		import time
+		self.perf = time.perf_counter
+		self.handlers = {}		# name : [ calls, hits, seconds ]
+		self.patterns = {}
+		self.slowest = []		# heap of ( seconds, file, line, text )
+		self.file = None
+		self.started = None
+		self.seconds = 0.0
+		self.saved = None
+		self.translated = ( 0, 0 )	# hits and misses of translations
+	
+	def install(self):
+		g = vars(vbfilter_core)
+		self.saved = {}
+		for name, value in list(g.items()):
+			if isinstance(value, LazyPattern): value = value.compile()
+			if name.startswith("re_") and isinstance(value, re.Pattern):
+				wrapper = TimedPattern( value, self.patterns.setdefault( name, [0, 0, 0.0] ), self.perf )
+			elif re.match( r"(check|found|process)[A-Z]", name ) and callable(value):
+				wrapper = self.timedHandler( name, value )
+			elif name in ("filter_file", "filter_text"):
+				wrapper = self.naming( value, "filter_text" == name )
+			else: continue
+			self.saved[name] = value
+			g[name] = wrapper
+		self.feeds = ( CodeFilter.feed, ModuleHeader.feed )
+		CodeFilter.feed = self.timedFeed( CodeFilter.feed )
+		ModuleHeader.feed = self.timedHandler( "ModuleHeader.feed", ModuleHeader.feed )
+		buildHandlers()
+		self.translated = translations.counts()
+		self.started = self.perf()
+	
+	def uninstall(self):
+		vars(vbfilter_core).update( self.saved )
+		CodeFilter.feed, ModuleHeader.feed = self.feeds
+		buildHandlers()
+		self.saved = None
+		self.seconds = self.perf() - self.started
+		hits, misses = translations.counts()
+		self.translated = ( hits - self.translated[0], misses - self.translated[1] )
+	
+	def __enter__(self):
+		self.install()
+		return self
+	
+	def __exit__(self, *exc):
+		self.uninstall()
+	
+	def timedHandler(self, name, func):
+		count = self.handlers.setdefault( name, [0, 0, 0.0] )
+		perf = self.perf
+		def handler(*args):
+			t = perf()
+			result = func(*args)
+			count[2] += perf() - t
+			count[0] += 1
+			if result: count[1] += 1
+			return result
+		return handler
+	
+	# CodeFilter.feed keeping the slowest lines
+	def timedFeed(self, feed):
+		import heapq
+		perf = self.perf
+		slowest = self.slowest
+		def timed(code, ln, line = None):
+			t = perf()
+			feed( code, ln, line )
+			t = perf() - t
+			if len(slowest) < self.slowest_count or slowest[0][0] < t:
+				item = ( t, self.file or "-", code.first, ln.rstrip()[:120] )
+				if len(slowest) < self.slowest_count: heapq.heappush( slowest, item )
+				else: heapq.heapreplace( slowest, item )
+		return timed
+	
+	# filter_file / filter_text telling the name of what is filtered
+	def naming(self, func, text):
+		def named(source, *args, **kw):
+			self.file = text and "<text>" or source
+			return func( source, *args, **kw )
+		return named
+	
+	def result(self):
+		def table(counts):
+			return dict( ( name, { "calls": c[0], "hits": c[1], "seconds": c[2] } ) for name, c in sorted(counts.items()) if c[0] )
+		return {
+			"version": __version__,
+			"seconds": self.seconds,
+			"handlers": table( self.handlers ),
+			"patterns": table( self.patterns ),
+			"translations": { "hits": self.translated[0], "misses": self.translated[1] },
+			"slowest": [ { "seconds": t, "file": f, "line": n, "text": s } for t, f, n, s in sorted( self.slowest, reverse = True ) ],
+		}
+	
+	# writes the result as one line of JSON
+	def dump(self, outFile):
+		import json
+		outFile.write( json.dumps( self.result(), ensure_ascii = False ) + "\n" )
+
+# compiled pattern counting its calls, hits and time, in each of its
+# matching methods ( a hit: a match, a substitution, a split )
+class TimedPattern(object):
+	
+	def __init__(self, pattern, count, perf):
+		self.pattern = pattern
+		self.count = count
+		self.perf = perf
+	
+	def match(self, *args):
+		t = self.perf()
+		m = self.pattern.match(*args)
+		self.tally( t, m is not None )
+		return m
+	
+	def search(self, *args):
+		t = self.perf()
+		m = self.pattern.search(*args)
+		self.tally( t, m is not None )
+		return m
+	
+	def fullmatch(self, *args):
+		t = self.perf()
+		m = self.pattern.fullmatch(*args)
+		self.tally( t, m is not None )
+		return m
+	
+	def sub(self, repl, string, count = 0):
+		t = self.perf()
+		s, n = self.pattern.subn( repl, string, count )
+		self.tally( t, 0 < n )
+		return s
+	
+	def subn(self, repl, string, count = 0):
+		t = self.perf()
+		s, n = self.pattern.subn( repl, string, count )
+		self.tally( t, 0 < n )
+		return s, n
+	
+	def split(self, *args):
+		t = self.perf()
+		parts = self.pattern.split(*args)
+		self.tally( t, 1 < len(parts) )
+		return parts
+	
+	def findall(self, *args):
+		t = self.perf()
+		found = self.pattern.findall(*args)
+		self.tally( t, 0 < len(found) )
+		return found
+	
+	# one call, timed while its matches are taken
+	def finditer(self, *args):
+		self.count[0] += 1
+		return self.timedMatches( self.pattern.finditer(*args) )
+	
+	def timedMatches(self, matches):
+		count = self.count
+		perf = self.perf
+		hit = False
+		t = perf()
+		for m in matches:
+			count[2] += perf() - t
+			if not hit:
+				count[1] += 1
+				hit = True
+			yield m
+			t = perf()
+		count[2] += perf() - t
+	
+	def tally(self, t, hit):
+		count = self.count
+		count[2] += self.perf() - t
+		count[0] += 1
+		if hit: count[1] += 1
+	
+	def __getattr__(self, name):
+		return getattr( self.pattern, name )
+
+# writes the statistics to stderr ( path "-" ) or appends them to the file at path
+def writeStats( stats, path ):
+	if "-" == path:
+		stats.dump( sys.stderr )
+		return
+	with open( path, "a", encoding = "utf-8" ) as f:
+		stats.dump( f )
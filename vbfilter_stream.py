@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#
+# Streaming API of vbfilter: StreamFilter, fed a source in chunks, and the
+# async afilter and afilter_to over it. Imported when vbfilter.StreamFilter,
+# vbfilter.afilter or vbfilter.afilter_to is first used.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+import codecs          # incremental decoders and encoders
+import io              # newline decoder
+
+from vbfilter_core import CppEmitter, FilterOptions, ModuleFilter, fileKind, module_names
+
+# filters a source pushed to it in chunks of any size ( bytes in the
+# encoding of the options, or text ), as filterLines filters its lines.
+# feed() and close() return the output made so far.
+class StreamFilter(object):
+	
+	def __init__(self, kind, options = None):
+		if options is None: options = FilterOptions()
+		self.options = options
+		self.buf = []
+		self.decoder = None
+		self.rest = ""
+		self.module = None
+		kind = fileKind(kind)
+		if kind in module_names: self.module = ModuleFilter( CppEmitter( self, options ), options, kind, "frm" == kind and options.controls )
+	
+	def write(self, s):
+		self.buf.append(s)
+	
+	# the output written since the last call
+	def output(self):
+		s = "".join(self.buf)
+		self.buf = []
+		return s
+	
+	def feedLine(self, s):
+		if self.module is not None: self.module.feed( s )
+		else: self.write( "." + s )
+	
+	# feeds the next chunk, the lines it completes are filtered
+	def feed(self, data, final = False):
+		if self.decoder is None:
+			# "\r\n" and "\r" end lines as in text files, even across chunks
+			decoder = not isinstance( data, str ) and codecs.getincrementaldecoder( self.options.encoding )() or None
+			self.decoder = io.IncrementalNewlineDecoder( decoder, True )
+			self.empty = data[:0]
+		lines = ( self.rest + self.decoder.decode( data, final ) ).split("\n")
+		self.rest = lines.pop()
+		for s in lines: self.feedLine( s + "\n" )
+		return self.output()
+	
+	# filters the last line, which has no "\n", and ends the output
+	def close(self):
+		if self.decoder is not None: self.rest += self.decoder.decode( self.empty, True )
+		if self.rest: self.feedLine( self.rest )
+		self.rest = ""
+		if self.module is not None:
+			try:
+				self.module.close()
+			finally:
+				self.module.release()
+		return self.output()
+
+## async API ##
+###############
+#
+# afilter and afilter_to filter a source read from an asyncio stream ( or any
+# async iterable of chunks ) without blocking the event loop: each chunk is
+# filtered by a StreamFilter in executor ( None for the default executor of
+# the loop ), and the next chunk is read only once the output of the last
+# one is taken, so a slow consumer slows the reading down.
+
+# yields the chunks of reader: await reader.read(size) until it is empty,
+# or async for when reader has no read
+async def readChunks( reader, size ):
+	read = getattr( reader, "read", None )
+	if read is None:
+		async for data in reader: yield data
+		return
+	while True:
+		data = await read( size )
+		if not data: return
+		yield data
+
+# yields the output ( text ) of the source of the given kind read from
+# reader, as it is made
+async def afilter( reader, kind, options = None, executor = None, size = 1 << 16 ):
+	
+	import asyncio
+	
+	loop = asyncio.get_running_loop()
+	stream = StreamFilter( kind, options )
+	async for data in readChunks( reader, size ):
+		out = await loop.run_in_executor( executor, stream.feed, data )
+		if out: yield out
+	out = await loop.run_in_executor( executor, stream.close )
+	if out: yield out
+
+# writes the output of the source read from reader to the asyncio stream
+# writer, in encoding, waiting for it to drain after each chunk
+async def afilter_to( writer, reader, kind, options = None, executor = None, encoding = "utf-8", errors = "strict" ):
+	
+	encoder = codecs.getincrementalencoder( encoding )( errors )
+	async for out in afilter( reader, kind, options, executor ):
+		writer.write( encoder.encode( out ) )
+		await writer.drain()
+	data = encoder.encode( "", True )
+	if data:
+		writer.write( data )
+		await writer.drain()
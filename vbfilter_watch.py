@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+#
+# Watch mode of vbfilter ("vbfilter.py --watch"): the sources filtered
+# again as they change. Imported only for --watch.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+
+import os.path         # paths of the sources and outputs
+import sys             # output and stuff
+
+from vbfilter_core import FilterOptions, OutputSink, fileKind, filter_file, filters
+from vbfilter_batch import find_sources, runBatch, sourceBase
+
+## watch mode ##
+##################
+#
+# "vbfilter.py --watch outdir source..." filters the sources into outdir as
+# --batch does ( only the files newer than their output ), then stays up and
+# filters each file changed again, removes the output of those deleted or
+# renamed away and filters those created or renamed in. the changes are
+# read from inotify where it is available, or else from the stat of the
+# files every interval, and applied once no change came for debounce
+# seconds, so a burst of saves filters each file once.
+
+# events of inotify read: IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_FROM,
+# IN_MOVED_TO, IN_CREATE, IN_DELETE, IN_DELETE_SELF, IN_MOVE_SELF
+inotify_mask = 0x2 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x800
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+
+# changes of the directories watched, by inotify ( through ctypes, linux only )
+class InotifyWatcher(object):
+	
+	def __init__(self):
+		import ctypes
+		import ctypes.util
+		
+		libc = ctypes.CDLL( ctypes.util.find_library("c"), use_errno = True )
+		self.add_watch = libc.inotify_add_watch
+		self.add_watch.argtypes = ( ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32 )
+		self.fd = libc.inotify_init1( os.O_CLOEXEC )
+		if self.fd < 0:
+			errno = ctypes.get_errno()
+			raise OSError( errno, os.strerror(errno) )
+		self.errno = ctypes.get_errno
+		self.dirs = {}		# watch descriptor: ( directory, recursive )
+	
+	def close(self):
+		os.close( self.fd )
+	
+	# watches directory, and the directories below it if recursive
+	def follow(self, directory, recursive = True):
+		dirs = [ directory ]
+		if recursive: dirs += [ os.path.join( d, name ) for d, names, files in os.walk(directory) for name in names ]
+		for d in dirs:
+			wd = self.add_watch( self.fd, os.fsencode(d), inotify_mask )
+			if wd < 0:
+				errno = self.errno()
+				raise OSError( errno, os.strerror(errno), d )
+			self.dirs[wd] = ( d, recursive )
+	
+	# waits up to timeout seconds ( None: until one comes ) for changes,
+	# returns the paths changed, or None if changes were lost
+	def wait(self, timeout):
+		import select
+		import struct
+		
+		if not select.select( [ self.fd ], [], [], timeout )[0]: return set()
+		data = os.read( self.fd, 1 << 16 )
+		paths = set()
+		pos = 0
+		while pos < len(data):
+			wd, mask, cookie, size = struct.unpack_from( "iIII", data, pos )
+			name = data[pos+16:pos+16+size].rstrip(b"\0")
+			pos += 16 + size
+			if mask & IN_Q_OVERFLOW: return None
+			if wd not in self.dirs: continue
+			directory, recursive = self.dirs[wd]
+			if mask & IN_IGNORED:
+				del self.dirs[wd]
+				continue
+			path = name and os.path.join( directory, os.fsdecode(name) ) or directory
+			if mask & IN_ISDIR and mask & 0x180 and recursive:
+				# a directory created or moved in
+				try:
+					self.follow( path )
+				except OSError:
+					pass
+			paths.add( path )
+		return paths
+
+# changes of the files of scan(), by their stat every interval seconds
+class PollingWatcher(object):
+	
+	def __init__(self, scan, interval):
+		self.scan = scan
+		self.interval = interval
+		self.stamps = scan()
+	
+	def close(self):
+		pass
+	
+	def follow(self, directory, recursive = True):
+		pass
+	
+	# scans the files every interval seconds until one changes ( timeout
+	# None ), or once after timeout seconds, and returns the paths changed
+	# ( none: the files were quiet for timeout seconds, as with inotify )
+	def wait(self, timeout):
+		import time
+		
+		while True:
+			time.sleep( timeout is None and self.interval or timeout )
+			stamps = self.scan()
+			paths = set( path for path in stamps.keys() | self.stamps.keys() if stamps.get(path) != self.stamps.get(path) )
+			self.stamps = stamps
+			if paths or timeout is not None: return paths
+
+# the stat of a file which changes when it is written, or None
+def fileStamp( path ):
+	try:
+		st = os.stat(path)
+	except OSError:
+		return None
+	return st.st_size, st.st_mtime_ns
+
+def isBelow( path, directory ):
+	return path.startswith( os.path.join( directory, "" ) )
+
+# the sources of a watch, their files and outputs
+class SourceWatch(object):
+	
+	debounce = 0.2
+	
+	def __init__(self, sources, outdir, options, out_encoding):
+		self.outdir = outdir
+		self.opts = options.copy( verbose = False )
+		self.verbose = options.verbose
+		self.out_encoding = out_encoding
+		self.trees = []		# ( source, base ) of the directories
+		self.projects = {}	# base of each .vbp project or single file source
+		self.work = {}		# output of each file ( src: dst )
+		self.owner = {}		# the project of each file which is not in a tree
+		self.stamps = {}	# stamp of each file when it was filtered
+		self.watcher = None
+		for source in sources:
+			source = os.path.abspath(source)
+			if os.path.isdir(source):
+				self.trees.append( ( source, source ) )
+				for path, root in find_sources( source, self.opts ): self.work[path] = self.destination( path )
+			else:
+				files = list(find_sources( source, self.opts ))
+				self.projects[source] = files and sourceBase( files ) or os.path.dirname(source)
+				for path, root in files: self.own( path, source )
+	
+	# the output of the file at path of a tree, None if it is not a source
+	def destination(self, path):
+		if fileKind(path) not in filters: return None
+		for source, base in self.trees:
+			if isBelow( path, source ): return os.path.join( self.outdir, os.path.relpath( path, base ) )
+		return None
+	
+	def own(self, path, project):
+		base = self.projects[project]
+		if not isBelow( path, base ):
+			sys.stderr.write( "vbfilter: %s is out of %s, not watched\n" % ( path, base ) )
+			return
+		self.work[path] = os.path.join( self.outdir, os.path.relpath( path, base ) )
+		self.owner[path] = project
+		if self.watcher is not None: self.watcher.follow( os.path.dirname(path), False )
+	
+	# stamps of the files and the projects
+	def scan(self):
+		stamps = {}
+		for source, base in self.trees:
+			for path, root in find_sources( source, self.opts ): stamps[path] = fileStamp( path )
+		for project in self.projects:
+			stamps[project] = fileStamp( project )
+			if "vbp" == fileKind(project):
+				for path, root in find_sources( project, self.opts ): stamps[path] = fileStamp( path )
+		return stamps
+	
+	# the files whose output is missing or older, filtered at start
+	def stale(self):
+		work = []
+		for src, dst in sorted( self.work.items() ):
+			st = fileStamp( src )
+			if st is None: continue
+			out = fileStamp( dst )
+			if out is None or out[1] < st[1]: work.append( ( src, dst ) )
+			self.stamps[src] = st
+		return work
+	
+	def start(self, interval):
+		try:
+			watcher = InotifyWatcher()
+			for source, base in self.trees: watcher.follow( source )
+			for project in self.projects:
+				watcher.follow( os.path.dirname(project), False )
+			for path in self.owner: watcher.follow( os.path.dirname(path), False )
+		except (OSError, AttributeError) as e:
+			# no inotify ( or too few watches )
+			if self.verbose: sys.stderr.write( "vbfilter: polling the files every %g seconds (%s)\n" % ( interval, e ) )
+			watcher = PollingWatcher( self.scan, interval )
+		self.watcher = watcher
+	
+	# applies the changes, once none came for debounce seconds
+	def run(self):
+		pending = set()
+		while True:
+			paths = self.watcher.wait( pending and self.debounce or None )
+			if paths is None:
+				# inotify lost changes: every file is looked at
+				paths = set( self.scan() ) | set( self.work )
+			if paths:
+				pending |= paths
+				continue
+			self.apply( pending )
+			pending = set()
+	
+	def apply(self, paths):
+		for path in sorted(paths):
+			if path in self.projects:
+				self.project( path )
+			elif os.path.isdir(path):
+				# created or moved in
+				for d, names, files in os.walk(path):
+					for name in sorted(files): self.changed( os.path.join( d, name ) )
+			elif os.path.exists(path):
+				self.changed( path )
+			else:
+				# deleted or moved away, a directory with all its files
+				self.removed( path )
+				for src in [ src for src in self.work if isBelow( src, path ) ]: self.removed( src )
+	
+	# the files of a project may have changed
+	def project(self, project):
+		if not os.path.exists(project): files = []
+		else: files = [ path for path, root in find_sources( project, self.opts ) ]
+		for path in [ path for path, p in self.owner.items() if p == project and path not in files ]: self.removed( path )
+		for path in files:
+			if path not in self.work: self.own( path, project )
+			if path in self.work: self.changed( path )
+	
+	def changed(self, src):
+		dst = self.work.get( src ) or self.destination( src )
+		if dst is None: return
+		stamp = fileStamp( src )
+		if stamp is None or stamp == self.stamps.get( src ): return
+		self.work[src] = dst
+		self.stamps[src] = stamp
+		self.filterOne( src, dst )
+	
+	def removed(self, src):
+		dst = self.work.pop( src, None )
+		self.stamps.pop( src, None )
+		self.owner.pop( src, None )
+		if dst is None: return
+		try:
+			os.unlink( dst )
+		except OSError:
+			pass
+		# the directories left empty, below outdir only ( not outdir itself )
+		directory = os.path.dirname(dst)
+		while isBelow( directory, self.outdir ):
+			try:
+				os.rmdir( directory )
+			except OSError:
+				break
+			directory = os.path.dirname(directory)
+		if self.verbose: sys.stderr.write( "vbfilter: removed %s\n" % dst )
+	
+	# filters src to a new file, which replaces dst ( the old output stays
+	# if src fails )
+	def filterOne(self, src, dst):
+		import tempfile
+		import time
+		
+		t = time.perf_counter()
+		try:
+			os.makedirs( os.path.dirname(dst), exist_ok = True )
+			fd, tmp = tempfile.mkstemp( dir = os.path.dirname(dst), prefix = ".vbfilter" )
+			try:
+				with open( fd, "wb" ) as f, OutputSink( f, self.out_encoding ) as outFile:
+					filter_file( src, outFile, self.opts )
+				os.replace( tmp, dst )
+			except BaseException:
+				os.unlink( tmp )
+				raise
+		except Exception as e:
+			sys.stderr.write( "%s: %s: %s\n" % ( src, type(e).__name__, e ) )
+			return
+		if self.verbose: sys.stderr.write( "vbfilter: filtered %s (%.0f ms)\n" % ( src, ( time.perf_counter() - t ) * 1000 ) )
+
+# filters the sources into outdir, and again each file changed, until
+# interrupted
+def watch( sources, outdir, options = None, jobs = None, out_encoding = None, interval = 1.0 ):
+	
+	if options is None: options = FilterOptions()
+	if out_encoding is None: out_encoding = sys.stdout.encoding or options.encoding
+	
+	watched = SourceWatch( sources, outdir, options, out_encoding )
+	watched.start( interval )
+	try:
+		runBatch( watched.stale(), options, jobs, out_encoding )
+		watched.run()
+	finally:
+		watched.watcher.close()